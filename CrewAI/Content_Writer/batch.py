@@ -0,0 +1,126 @@
+# pylint: disable=C0114
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from main import (configure_environment, build_crew, kickoff, kickoff_sections,
+                  extract_output_text, save_output)
+from utils.crew_pool import CrewPool
+from utils.run_outputs import RunDirectory
+from utils.task_cache import TaskOutputCache
+
+
+def read_topics(path):
+    """
+    Reads one topic per line, skipping blank lines and '#' comments.
+    """
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f
+                if line.strip() and not line.lstrip().startswith("#")]
+
+
+def slugify(topic):
+    """
+    Turns a topic into a filename-safe slug.
+    """
+    slug = re.sub(r"[^a-z0-9]+", "_", topic.lower()).strip("_")
+    return slug[:60] or "topic"
+
+
+def run_topic(pool, index, topic, output_dir, plan_cache=None, sections=False):
+    """
+    Runs one topic on a pooled crew and saves its article in the topic's
+    own run directory.
+    """
+    with RunDirectory({"topic": topic}, root=output_dir,
+                      label=f"{index:03d}_{slugify(topic)}") as run_dir:
+        with pool.crew() as crew:
+            start = time.perf_counter()
+            if sections:
+                result = kickoff_sections(crew, {"topic": topic}, plan_cache)
+            else:
+                result = kickoff(crew, {"topic": topic}, plan_cache)
+            seconds = time.perf_counter() - start
+        run_dir.timing("kickoff", seconds)
+
+        output_text = extract_output_text(result)
+        output_file = save_output(output_text, run_dir)
+    return {
+        "index": index,
+        "topic": topic,
+        "seconds": seconds,
+        "chars": len(output_text),
+        "output_file": output_file,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write one article per topic using a pool of crews.")
+    parser.add_argument("topics_file",
+                        help="text file with one topic per line")
+    parser.add_argument("--concurrency", type=int,
+                        default=int(os.getenv("OLLAMA_NUM_PARALLEL", "1")),
+                        help="crews running at once; match the Ollama "
+                             "server's OLLAMA_NUM_PARALLEL (default: %(default)s)")
+    parser.add_argument("--output-dir", default="outputs")
+    parser.add_argument("--no-plan-cache", action="store_true",
+                        help="always regenerate the content plan")
+    parser.add_argument("--sections", action="store_true",
+                        help="write outline sections with concurrent LLM calls")
+    args = parser.parse_args()
+
+    configure_environment()
+
+    topics = read_topics(args.topics_file)
+    if not topics:
+        parser.error(f"no topics found in {args.topics_file}")
+
+    concurrency = max(1, min(args.concurrency, len(topics)))
+    pool = CrewPool(build_crew, concurrency)
+    plan_cache = None if args.no_plan_cache else TaskOutputCache(".cache/plan_cache.sqlite")
+
+    results, failures = [], []
+    batch_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(run_topic, pool, i, topic, args.output_dir,
+                            plan_cache, args.sections): topic
+            for i, topic in enumerate(topics, start=1)
+        }
+        for future in as_completed(futures):
+            topic = futures[future]
+            try:
+                stats = future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                failures.append((topic, exc))
+                print(f"❌ {topic}: {exc}")
+                continue
+            results.append(stats)
+            print(f"✅ {topic}: {stats['seconds']:.1f}s -> {stats['output_file']}")
+
+    wall = time.perf_counter() - batch_start
+
+    # --- Throughput report ---
+    print("\n" + "="*80)
+    print(f"📊 BATCH REPORT ({concurrency} concurrent crews)")
+    print("="*80)
+    for stats in sorted(results, key=lambda s: s["index"]):
+        print(f"{stats['seconds']:8.1f}s  {stats['chars']:7d} chars  {stats['topic']}")
+    busy = sum(s["seconds"] for s in results)
+    print("-"*80)
+    print(f"Topics:          {len(results)} ok, {len(failures)} failed")
+    print(f"Wall time:       {wall:.1f}s")
+    if results:
+        print(f"Mean per topic:  {busy / len(results):.1f}s")
+        print(f"Throughput:      {len(results) / wall * 60:.2f} articles/min")
+        print(f"Effective par.:  {busy / wall:.2f}x")
+    if plan_cache:
+        plan_cache.report("Plan cache")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    main()
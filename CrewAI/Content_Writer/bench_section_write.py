@@ -0,0 +1,72 @@
+# pylint: disable=C0114
+import argparse
+import statistics
+import time
+from main import (configure_environment, build_crew, build_llm, run_plan,
+                  agent_persona, _set_output, _resume)
+from utils.section_writer import parse_outline, write_sections
+from utils.task_cache import TaskOutputCache
+
+# Wall-clock comparison of the single-call `write` task against
+# section-parallel writing. Both modes start from the same (cached) plan,
+# so only the writing stage is timed. Requires the local Ollama server.
+
+
+def time_single_write(crew, inputs):
+    """
+    Runs the original `write` task on its own.
+    """
+    start = time.perf_counter()
+    _resume(crew, [crew.tasks[1]], inputs)
+    return time.perf_counter() - start, crew.tasks[1].output.raw
+
+
+def time_section_write(crew, inputs, plan_text, concurrency, llm):
+    """
+    Writes the same plan section by section with concurrent calls.
+    """
+    write = crew.tasks[1]
+    start = time.perf_counter()
+    sections = parse_outline(plan_text)
+    draft = write_sections(llm, sections, inputs["topic"], plan_text,
+                           agent_persona(write.agent, inputs),
+                           max_workers=concurrency)
+    return time.perf_counter() - start, draft, len(sections)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark single-call vs section-parallel writing.")
+    parser.add_argument("--topic", default="Artificial Intelligence")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    configure_environment()
+    crew = build_crew()
+    inputs = {"topic": args.topic}
+    plan_text = run_plan(crew, inputs, TaskOutputCache(".cache/plan_cache.sqlite"))
+    llm = build_llm()
+
+    single, parallel = [], []
+    for i in range(args.repeat):
+        _set_output(crew.tasks[0], plan_text, inputs)
+        seconds, text = time_single_write(crew, inputs)
+        single.append(seconds)
+        print(f"run {i + 1}: single-call write  {seconds:7.1f}s  {len(text):6d} chars")
+
+        seconds, text, n_sections = time_section_write(
+            crew, inputs, plan_text, args.concurrency, llm)
+        parallel.append(seconds)
+        print(f"run {i + 1}: {n_sections} sections x{args.concurrency:<2d}    "
+              f"{seconds:7.1f}s  {len(text):6d} chars")
+
+    print("\n" + "="*80)
+    print(f"single-call write:  median {statistics.median(single):.1f}s")
+    print(f"section-parallel:   median {statistics.median(parallel):.1f}s")
+    print(f"speedup:            {statistics.median(single) / statistics.median(parallel):.2f}x")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,23 @@
 # pylint: disable=C0114
+import argparse
 import warnings
 import os
-from datetime import datetime
-from crewai import Agent, Task, Crew
+import time
+from crewai import Agent, Task, Crew, LLM
+from crewai.tasks.task_output import TaskOutput
+from utils.incremental_editor import incremental_edit
+from utils.run_outputs import RunDirectory
+from utils.section_writer import parse_outline, write_sections
+from utils.streaming import StreamingMarkdownWriter
+from utils.task_cache import TaskOutputCache, render, task_cache_key
 #from IPython.display import Markdown
 #from utils.get_openai_api_key import get_openai_api_key
 
-# pylint: disable=C0114
-def main():
 
+def configure_environment():
+    """
+    Points CrewAI at the local Ollama server.
+    """
     warnings.filterwarnings('ignore')
 
     # Commented out to use Ollama locally so that no OpenAI API rate limits hit
@@ -22,7 +31,26 @@ def main():
     os.environ["OPENAI_MODEL_NAME"] = "llama3.2:3b"
 
 
+def build_llm(stream=False):
+    """
+    Same local model as the environment default, as an explicit LLM object.
+    """
+    return LLM(
+        model=f"openai/{os.environ['OPENAI_MODEL_NAME']}",
+        base_url=os.environ["OPENAI_API_BASE"],
+        api_key=os.environ["OPENAI_API_KEY"],
+        stream=stream
+    )
+
+
+def build_crew(stream=False):
+    """
+    Builds the planner -> writer -> editor crew for a {topic} input.
 
+    With stream=True only the editor's LLM streams, so every streamed chunk
+    belongs to the final task. Task contexts are explicit so the crew can be
+    resumed after the plan task (see kickoff).
+    """
     planner = Agent(
     role="Content Planner",
     goal="Plan engaging and factually accurate content on {topic}",
@@ -71,6 +99,7 @@ def main():
                 "when providing opinions or assertions, "
                 "and also avoids major controversial topics "
                 "or opinions when possible.",
+      llm=build_llm(stream=True) if stream else None,
       allow_delegation=False,
       verbose=True
     )
@@ -108,6 +137,7 @@ def main():
           "in markdown format, ready for publication, "
           "each section should have 2 or 3 paragraphs.",
       agent=writer,
+      context=[plan],
     )
 
     edit = Task(
@@ -117,50 +147,267 @@ def main():
       expected_output="A well-written blog post in markdown format, "
                       "ready for publication, "
                       "each section should have 2 or 3 paragraphs.",
-      agent=editor
+      agent=editor,
+      context=[plan, write],
     )
 
-    crew = Crew(
+    return Crew(
       agents=[planner, writer, editor],
       tasks=[plan, write, edit],
       verbose=True
     )
 
-    result = crew.kickoff(inputs={"topic": "Artificial Intelligence"})
-  #  Markdown(result)
 
-    # Safely extract the final text regardless of CrewAI version
-    output_text = None
-    if hasattr(result, "final_output"):
-        output_text = result.final_output
-    elif hasattr(result, "output_text"):
-        output_text = result.output_text
-    elif hasattr(result, "output"):
-        output_text = result.output
-    elif isinstance(result, dict):
-        output_text = result.get("final_output") or result.get("output") or str(result)
+def _set_output(task, raw, inputs):
+    """
+    Marks a task as already done so later tasks read raw through context.
+    """
+    task.output = TaskOutput(
+        description=render(task.description, inputs),
+        expected_output=render(task.expected_output, inputs),
+        raw=raw,
+        agent=task.agent.role,
+    )
+
+
+def _resume(crew, tasks, inputs):
+    """
+    Kicks off a crew made of only the given tasks.
+    """
+    resumed = Crew(
+      agents=[task.agent for task in tasks],
+      tasks=tasks,
+      verbose=crew.verbose
+    )
+    return resumed.kickoff(inputs=inputs)
+
+
+def _plan_key(plan, inputs):
+    model = getattr(plan.agent.llm, "model", None) or os.environ.get("OPENAI_MODEL_NAME")
+    return task_cache_key(plan, inputs, model)
+
+
+def kickoff(crew, inputs, plan_cache=None):
+    """
+    Runs the crew, skipping the plan task entirely when its output for these
+    inputs is already in plan_cache.
+    """
+    if plan_cache is None:
+        return crew.kickoff(inputs=inputs)
+
+    plan = crew.tasks[0]
+    key = _plan_key(plan, inputs)
+    cached_plan = plan_cache.get(key)
+
+    if cached_plan is None:
+        started = time.perf_counter()
+        timings = {}
+        previous_callback = plan.callback
+
+        def _plan_done(output):
+            timings["plan"] = time.perf_counter() - started
+            if previous_callback:
+                previous_callback(output)
+
+        plan.callback = _plan_done
+        try:
+            result = crew.kickoff(inputs=inputs)
+        finally:
+            plan.callback = previous_callback
+        plan_cache.put(key, plan.output.raw,
+                       compute_seconds=timings.get("plan", 0.0),
+                       label=f"plan: {inputs.get('topic', '')}")
+        return result
+
+    # Hand the cached plan to `write` through its explicit context
+    _set_output(plan, cached_plan, inputs)
+    return _resume(crew, crew.tasks[1:], inputs)
+
+
+def run_plan(crew, inputs, plan_cache=None):
+    """
+    Returns the content plan text, from plan_cache when possible.
+    """
+    plan = crew.tasks[0]
+    key = _plan_key(plan, inputs) if plan_cache is not None else None
+    cached_plan = plan_cache.get(key) if key else None
+    if cached_plan is not None:
+        _set_output(plan, cached_plan, inputs)
+        return cached_plan
+
+    started = time.perf_counter()
+    _resume(crew, [plan], inputs)
+    if key:
+        plan_cache.put(key, plan.output.raw,
+                       compute_seconds=time.perf_counter() - started,
+                       label=f"plan: {inputs.get('topic', '')}")
+    return plan.output.raw
+
+
+def agent_persona(agent, inputs):
+    """
+    System prompt equivalent to an agent's role, goal and backstory.
+    """
+    return (f"You are {render(agent.role, inputs)}. {render(agent.backstory, inputs)}\n"
+            f"Your personal goal is: {render(agent.goal, inputs)}")
+
+
+def kickoff_sections(crew, inputs, plan_cache=None, concurrency=4, llm=None):
+    """
+    Like kickoff, but the `write` task is replaced by one concurrent writer
+    call per outline section; the stitched draft then goes to the editor.
+    """
+    write = crew.tasks[1]
+    plan_text = run_plan(crew, inputs, plan_cache)
+
+    sections = parse_outline(plan_text)
+    draft = write_sections(llm or build_llm(), sections, inputs["topic"], plan_text,
+                           agent_persona(write.agent, inputs),
+                           max_workers=concurrency)
+    _set_output(write, draft, inputs)
+    if write.callback:
+        write.callback(write.output)
+
+    return _resume(crew, crew.tasks[2:], inputs)
+
+
+def kickoff_incremental(crew, inputs, plan_cache=None, sections=False,
+                        concurrency=4, llm=None):
+    """
+    Produces the draft as usual, then runs the editor only on the sections
+    that fail local checks. Returns (final_text, EditReport).
+    """
+    write, edit = crew.tasks[1], crew.tasks[2]
+    llm = llm or build_llm()
+    plan_text = run_plan(crew, inputs, plan_cache)
+
+    if sections:
+        draft = write_sections(llm, parse_outline(plan_text), inputs["topic"],
+                               plan_text, agent_persona(write.agent, inputs),
+                               max_workers=concurrency)
     else:
-        output_text = str(result)
+        _resume(crew, [write], inputs)
+        draft = write.output.raw
+
+    return incremental_edit(llm, draft,
+                            agent_persona(edit.agent, inputs),
+                            render(edit.description, inputs),
+                            expected_output=render(edit.expected_output, inputs),
+                            max_workers=concurrency)
+
+
+def extract_output_text(result):
+    """
+    Safely extract the final text regardless of CrewAI version.
+    """
+    if hasattr(result, "final_output"):
+        return result.final_output
+    if hasattr(result, "output_text"):
+        return result.output_text
+    if hasattr(result, "output"):
+        return result.output
+    if isinstance(result, dict):
+        return result.get("final_output") or result.get("output") or str(result)
+    return str(result)
+
+
+def save_output(output_text, run_dir, name="crew_output"):
+    """
+    Atomically saves the output as name.md in the run's own directory and
+    returns its path.
+    """
+    return run_dir.write(f"{name}.md", output_text)
+
+
+def run_streaming(crew, run, run_dir):
+    """
+    Calls run(crew) while streaming the editor's answer to stdout and to the
+    output file in run_dir as it is produced.
+    """
+    output_file = run_dir.file("crew_output.md")
+    writer = StreamingMarkdownWriter(output_file)
+    # The editor starts as soon as the writer's task completes
+    crew.tasks[-2].callback = writer.mark_final_task_started
 
-    # --- Print nicely formatted output ---
     print("\n" + "="*80)
-    print("🧠 FINAL OUTPUT:")
+    print("🧠 FINAL OUTPUT (streaming):")
     print("="*80 + "\n")
-    print(output_text)
+    with writer:
+        result = run(crew)
+        writer.finish(extract_output_text(result))
+    run_dir.record("crew_output.md")
     print("\n" + "="*80)
+    writer.report()
+    print(f"✅ Output saved to: {output_file}")
 
-    # --- Save output to Markdown file ---
-    output_dir = "outputs"
-    os.makedirs(output_dir, exist_ok=True)
 
-    # Optional: create a timestamped filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = os.path.join(output_dir, f"crew_output_{timestamp}.md")
+# pylint: disable=C0114
+def main():
+    parser = argparse.ArgumentParser(
+        description="Plan, write and edit a blog article with a crew.")
+    parser.add_argument("--topic", default="Artificial Intelligence")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream the editor's tokens to stdout and the "
+                             "output file as they arrive")
+    parser.add_argument("--no-plan-cache", action="store_true",
+                        help="always regenerate the content plan")
+    parser.add_argument("--sections", action="store_true",
+                        help="write each outline section with its own "
+                             "concurrent LLM call instead of one `write` task")
+    parser.add_argument("--section-concurrency", type=int, default=4)
+    parser.add_argument("--incremental-edit", action="store_true",
+                        help="only send sections that fail local checks "
+                             "to the editor")
+    args = parser.parse_args()
+    if args.stream and args.incremental_edit:
+        parser.error("--stream needs the editor task; drop --incremental-edit")
+
+    configure_environment()
+
+    crew = build_crew(stream=args.stream)
+    inputs = {"topic": args.topic}
+    plan_cache = None if args.no_plan_cache else TaskOutputCache(".cache/plan_cache.sqlite")
+
+    edit_report = None
+
+    def run(crew):
+        nonlocal edit_report
+        if args.incremental_edit:
+            text, edit_report = kickoff_incremental(
+                crew, inputs, plan_cache, args.sections, args.section_concurrency)
+            return text
+        if args.sections:
+            return kickoff_sections(crew, inputs, plan_cache, args.section_concurrency)
+        return kickoff(crew, inputs, plan_cache)
+
+    # Each kickoff writes into its own directory under outputs/, with a manifest
+    with RunDirectory(inputs, root="outputs", label=args.topic) as run_dir:
+        if args.stream:
+            with run_dir.timed("kickoff"):
+                run_streaming(crew, run, run_dir)
+            if plan_cache:
+                plan_cache.report("Plan cache")
+            return
+
+        with run_dir.timed("kickoff"):
+            result = run(crew)
+      #  Markdown(result)
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(output_text)
+        output_text = extract_output_text(result)
+        output_file = save_output(output_text, run_dir)
+
+    # --- Print nicely formatted output ---
+    print("\n" + "="*80)
+    print("🧠 FINAL OUTPUT:")
+    print("="*80 + "\n")
+    print(output_text)
+    print("\n" + "="*80)
 
     print(f"✅ Output saved to: {output_file}")
+    if edit_report:
+        edit_report.print()
+    if plan_cache:
+        plan_cache.report("Plan cache")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,31 @@
+# pylint: disable=C0114
+import queue
+from contextlib import contextmanager
+
+
+class CrewPool:
+    """
+    A fixed set of pre-built crews, each lent to one caller at a time.
+
+    A Crew keeps per-run state on its tasks, so it must not be kicked off
+    from two threads at once; the pool size is therefore the concurrency.
+    """
+
+    def __init__(self, factory, size):
+        if size < 1:
+            raise ValueError("CrewPool size must be at least 1")
+        self.size = size
+        self._crews = queue.Queue()
+        for _ in range(size):
+            self._crews.put(factory())
+
+    @contextmanager
+    def crew(self):
+        """
+        Borrows a crew, blocking until one is free.
+        """
+        crew = self._crews.get()
+        try:
+            yield crew
+        finally:
+            self._crews.put(crew)
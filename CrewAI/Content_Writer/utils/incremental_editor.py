@@ -0,0 +1,199 @@
+# pylint: disable=C0114
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # pylint: disable=broad-except
+    _ENCODING = None
+
+_HEADING = re.compile(r"^(#{1,6})[ \t]+(.*?)[ \t#]*$", re.MULTILINE)
+_PARAGRAPH_RULE = re.compile(r"(\d+)\s*(?:or|to|-)\s*(\d+)\s+paragraphs", re.IGNORECASE)
+_ARTIFACTS = re.compile(
+    r"^\s*(Final Answer:|Thought:)|\[insert|lorem ipsum|\bTODO\b",
+    re.IGNORECASE | re.MULTILINE)
+
+MAX_HEADING_WORDS = 12
+MIN_PARAGRAPH_WORDS = 20
+MAX_PARAGRAPH_WORDS = 250
+
+
+def count_tokens(text):
+    """
+    Counts tokens with tiktoken when installed, else ~4 characters/token.
+    """
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return max(1, len(text) // 4)
+
+
+def paragraph_bounds(expected_output, default=(2, 3)):
+    """
+    Reads the "2 or 3 paragraphs" rule out of a task's expected_output.
+    """
+    match = _PARAGRAPH_RULE.search(expected_output or "")
+    if not match:
+        return default
+    low, high = sorted((int(match.group(1)), int(match.group(2))))
+    return low, high
+
+
+def split_sections(markdown):
+    """
+    Splits a Markdown document at every heading. Each chunk keeps its exact
+    text, so "".join(split_sections(doc)) == doc.
+    """
+    starts = [m.start() for m in _HEADING.finditer(markdown)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    starts.append(len(markdown))
+    return [markdown[a:b] for a, b in zip(starts, starts[1:]) if b > a]
+
+
+def _heading(chunk):
+    match = _HEADING.match(chunk)
+    return (len(match.group(1)), match.group(2)) if match else (None, None)
+
+
+def _paragraphs(chunk):
+    body = _HEADING.sub("", chunk, count=1) if _HEADING.match(chunk) else chunk
+    return [p.strip() for p in re.split(r"\n\s*\n", body) if p.strip()]
+
+
+def check_section(chunk, paragraph_range=(2, 3), next_chunk=None):
+    """
+    Cheap local checks for one section. Returns a list of problems; an empty
+    list means the section can skip the LLM editor.
+    """
+    level, title = _heading(chunk)
+    paragraphs = _paragraphs(chunk)
+    problems = []
+
+    if level == 1 or level is None:
+        # Title or preamble: only flag leftover agent artifacts
+        if _ARTIFACTS.search(chunk):
+            problems.append("contains agent/placeholder artifacts")
+        return problems
+
+    next_level, _ = _heading(next_chunk) if next_chunk else (None, None)
+    is_container = not paragraphs and next_level is not None and next_level > level
+
+    if not title:
+        problems.append("empty heading")
+    elif len(title.split()) > MAX_HEADING_WORDS:
+        problems.append(f"heading longer than {MAX_HEADING_WORDS} words")
+    elif title.rstrip()[-1:] in ".,;:":
+        problems.append("heading ends with punctuation")
+    elif title.isupper() and len(title) > 4:
+        problems.append("heading in all caps")
+
+    if not is_container:
+        low, high = paragraph_range
+        if not low <= len(paragraphs) <= high:
+            problems.append(f"has {len(paragraphs)} paragraphs, expected {low} to {high}")
+        for i, paragraph in enumerate(paragraphs, start=1):
+            words = len(paragraph.split())
+            if paragraph.lstrip().startswith(("-", "*", "|", ">")) or re.match(r"\d+\.", paragraph):
+                continue  # lists, tables and quotes are not prose paragraphs
+            if words < MIN_PARAGRAPH_WORDS:
+                problems.append(f"paragraph {i} is only {words} words")
+            elif words > MAX_PARAGRAPH_WORDS:
+                problems.append(f"paragraph {i} is {words} words")
+
+    if _ARTIFACTS.search(chunk):
+        problems.append("contains agent/placeholder artifacts")
+    return problems
+
+
+class EditReport:
+    """
+    What the incremental editor did and roughly how many tokens it saved
+    compared with re-reading and rewriting the whole draft.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.skipped = 0
+        self.edited = 0
+        self.problems = {}
+        self.tokens_saved = 0
+        self.tokens_spent = 0
+
+    def print(self):
+        """
+        Prints a short summary.
+        """
+        print(f"✏️  Incremental edit: {self.edited}/{self.total} sections sent to the "
+              f"editor, {self.skipped} passed local checks unchanged")
+        for title, problems in self.problems.items():
+            print(f"   - {title}: {'; '.join(problems)}")
+        print(f"   ~{self.tokens_saved} tokens saved "
+              f"(~{self.tokens_spent} spent on edited sections)")
+
+
+def _edit_messages(chunk, problems, persona, instructions):
+    return [
+        {"role": "system", "content": persona},
+        {"role": "user", "content": (
+            f"{instructions}\n\n"
+            "You are editing ONE section of a larger blog post. "
+            "Fix these problems:\n"
+            + "\n".join(f"- {p}" for p in problems) +
+            "\n\nKeep the same heading level, keep the meaning, and return "
+            "only the corrected Markdown section without commentary.\n\n"
+            f"SECTION:\n{chunk.strip()}"
+        )},
+    ]
+
+
+def _clean_edit(edited, original):
+    edited = edited.strip()
+    if edited.lower().startswith("final answer:"):
+        edited = edited[len("final answer:"):].strip()
+    original_heading = _HEADING.match(original)
+    if original_heading and not _HEADING.match(edited):
+        edited = f"{original_heading.group(0)}\n\n{edited}"
+    # Keep the original spacing before the next section
+    trailing = original[len(original.rstrip()):] or "\n"
+    return edited + trailing
+
+
+def incremental_edit(llm, draft, persona, instructions, expected_output="",
+                     max_workers=4):
+    """
+    Sends only the sections that fail the local checks to the LLM; every
+    other section is passed through byte-for-byte. Returns (text, report).
+    """
+    paragraph_range = paragraph_bounds(expected_output)
+    chunks = split_sections(draft)
+    report = EditReport()
+    report.total = len(chunks)
+
+    failing = {}
+    for i, chunk in enumerate(chunks):
+        next_chunk = chunks[i + 1] if i + 1 < len(chunks) else None
+        problems = check_section(chunk, paragraph_range, next_chunk)
+        if problems:
+            failing[i] = problems
+            report.problems[_heading(chunk)[1] or "(preamble)"] = problems
+        else:
+            # The whole-draft editor would have read and rewritten it
+            report.tokens_saved += 2 * count_tokens(chunk)
+
+    def _edit(i):
+        messages = _edit_messages(chunks[i], failing[i], persona, instructions)
+        edited = llm.call(messages)
+        prompt_tokens = sum(count_tokens(m["content"]) for m in messages)
+        return i, _clean_edit(edited, chunks[i]), prompt_tokens + count_tokens(edited)
+
+    edited_chunks = list(chunks)
+    if failing:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for i, text, tokens in executor.map(_edit, sorted(failing)):
+                edited_chunks[i] = text
+                report.tokens_spent += tokens
+
+    report.edited = len(failing)
+    report.skipped = report.total - report.edited
+    return "".join(edited_chunks), report
@@ -0,0 +1,134 @@
+# pylint: disable=C0114
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+
+def atomic_write(path, data, encoding="utf-8"):
+    """
+    Writes text or bytes to path through a temp file in the same directory
+    and os.replace, so readers never see a partial file.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    mode = "wb" if isinstance(data, bytes) else "w"
+    try:
+        with open(tmp, mode, **({} if mode == "wb" else {"encoding": encoding})) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def file_digest(path):
+    """
+    Returns (sha256 hex, size in bytes) of a file.
+    """
+    digest, size = hashlib.sha256(), 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+            size += len(block)
+    return digest.hexdigest(), size
+
+
+class RunDirectory:
+    """
+    Output directory of a single kickoff.
+
+    Every run gets its own directory under root, named after the start time,
+    an optional label and a random suffix, so concurrent runs on one host
+    never share a file. Files are written atomically and listed with their
+    sha256 in manifest.json, together with the run's inputs, timings and
+    status. Use as a context manager; the manifest is written on exit and
+    the run is marked "failed" if an exception escapes.
+    """
+
+    def __init__(self, inputs=None, root="runs", label=None):
+        slug = re.sub(r"[^a-z0-9]+", "_", (label or "").lower()).strip("_")[:60]
+        self.run_id = "_".join(filter(None, [datetime.now().strftime("%Y%m%d_%H%M%S"), slug,
+                                             uuid.uuid4().hex[:8]]))
+        self.path = os.path.join(root, self.run_id)
+        os.makedirs(self.path)  # never reuse another run's directory
+        self.manifest = {
+            "run_id": self.run_id,
+            "inputs": inputs or {},
+            "started_at": time.time(),
+            "finished_at": None,
+            "status": "running",
+            "timings": {},
+            "files": {},
+        }
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, _tb):
+        self.close("failed" if exc_type else "ok", exc)
+        return False
+
+    def file(self, name):
+        """
+        Path of name inside the run directory (not written yet).
+        """
+        return os.path.join(self.path, name)
+
+    def write(self, name, data):
+        """
+        Atomically writes text or bytes to name and records its hash.
+        Returns the path.
+        """
+        path = atomic_write(self.file(name), data)
+        self.record(name)
+        return path
+
+    def record(self, name):
+        """
+        Adds a file already written into the run directory to the manifest.
+        """
+        sha256, size = file_digest(self.file(name))
+        with self._lock:
+            self.manifest["files"][name] = {"sha256": sha256, "bytes": size}
+
+    def timing(self, name, seconds):
+        """
+        Records a duration in the manifest.
+        """
+        with self._lock:
+            self.manifest["timings"][name] = round(seconds, 3)
+
+    @contextmanager
+    def timed(self, name):
+        """
+        Times the with-block as timings[name].
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timing(name, time.perf_counter() - start)
+
+    def close(self, status="ok", error=None):
+        """
+        Writes manifest.json with the final status.
+        """
+        with self._lock:
+            self.manifest["status"] = status
+            self.manifest["finished_at"] = time.time()
+            self.manifest["timings"]["total"] = round(
+                self.manifest["finished_at"] - self.manifest["started_at"], 3)
+            if error is not None:
+                self.manifest["error"] = repr(error)
+            manifest = json.dumps(self.manifest, indent=2, default=str)
+        atomic_write(self.file("manifest.json"), manifest)
@@ -0,0 +1,158 @@
+# pylint: disable=C0114
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# Planner sections that describe the article rather than belong in it
+_NON_CONTENT = re.compile(
+    r"audience|seo|keyword|resource|source|reference|trend|key player|"
+    r"news|outline|content plan",
+    re.IGNORECASE)
+_HEADING = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$")
+_NUMBERED = re.compile(r"^(\s*)(?:\d+|[IVXivx]+|[A-Za-z])[.)]\s+(.*\S)\s*$")
+_BULLET = re.compile(r"^\s*[-*+]\s+(.*\S)\s*$")
+_BOLD_LINE = re.compile(r"^\s*\*\*(.+?)\*\*:?\s*$")
+
+DEFAULT_SECTIONS = ["Introduction", "Key Points", "Conclusion"]
+
+
+class Section:
+    """
+    One outline entry: its title and the planner's notes for it.
+    """
+
+    def __init__(self, title, notes=None):
+        self.title = title
+        self.notes = notes or []
+
+    def __repr__(self):
+        return f"Section({self.title!r}, {len(self.notes)} notes)"
+
+
+def _clean_title(text):
+    text = re.sub(r"[*_`]", "", text).strip().rstrip(":").strip()
+    # "Introduction: Why AI matters" stays as is; "Section 1 - Intro" and
+    # "II. Body" lose their numbering
+    text = re.sub(r"^(section|part)\s+\d+\s*[-:.]\s*", "", text, flags=re.IGNORECASE)
+    return re.sub(r"^(?:\d+|[IVX]+)[.)]\s+", "", text)
+
+
+def _outline_block(lines):
+    """
+    Returns the lines under the plan's "Outline" heading, or None.
+    """
+    for i, line in enumerate(lines):
+        heading = _HEADING.match(line) or _BOLD_LINE.match(line)
+        if heading and "outline" in heading.groups()[-1].lower():
+            level = len(heading.group(1)) if _HEADING.match(line) else None
+            block = []
+            for nxt in lines[i + 1:]:
+                nxt_heading = _HEADING.match(nxt)
+                if nxt_heading and (level is None or len(nxt_heading.group(1)) <= level):
+                    break
+                nxt_bold = _BOLD_LINE.match(nxt)
+                if nxt_bold and _NON_CONTENT.search(nxt_bold.group(1)):
+                    break
+                block.append(nxt)
+            return block
+    return None
+
+
+def parse_outline(plan_text):
+    """
+    Parses the planner's content plan into an ordered list of Sections.
+
+    Prefers the items under an "Outline" heading (sub-headings and top-level
+    list items become sections, nested items become their notes). Falls
+    back to the plan's own headings minus audience/SEO/resources sections,
+    and finally to a minimal introduction/body/conclusion scaffold.
+    """
+    lines = plan_text.splitlines()
+    block = _outline_block(lines)
+    in_outline = bool(block)
+    candidates = block if in_outline else lines
+
+    sections = []
+    top_item = None  # (indent, is_numbered) of the first list item seen
+    under_heading = False  # list items under a heading are its notes
+    for line in candidates:
+        heading = _HEADING.match(line)
+        numbered = _NUMBERED.match(line)
+        bullet = _BULLET.match(line)
+        if heading and heading.group(1) != "#":
+            title = _clean_title(heading.group(2))
+            # Outside the outline, notes under audience/SEO headings are dropped
+            skip = not in_outline and _NON_CONTENT.search(title)
+            sections.append(None if skip else Section(title))
+            under_heading = True
+            continue
+        if numbered or bullet:
+            indent = len(line) - len(line.lstrip())
+            text = _clean_title(numbered.group(2) if numbered else bullet.group(1))
+            if under_heading:
+                if sections[-1] is not None:
+                    sections[-1].notes.append(text)
+                continue
+            if top_item is None and (in_outline or not sections):
+                top_item = (indent, bool(numbered))
+            if top_item == (indent, bool(numbered)) or (
+                    top_item and indent < top_item[0]):
+                sections.append(Section(text))
+            elif sections and sections[-1] is not None:
+                sections[-1].notes.append(text)
+        elif line.strip() and sections and sections[-1] is not None:
+            sections[-1].notes.append(_clean_title(line))
+
+    sections = [s for s in sections if s is not None and s.title]
+    if len(sections) < 2:
+        sections = [Section(title) for title in DEFAULT_SECTIONS]
+    return sections
+
+
+def _section_messages(section, index, total, topic, plan_text, persona):
+    notes = "\n".join(f"- {note}" for note in section.notes) or "- (no specific notes)"
+    position = ("the opening section" if index == 0 else
+                "the closing section" if index == total - 1 else
+                f"section {index + 1} of {total}")
+    return [
+        {"role": "system", "content": persona},
+        {"role": "user", "content": (
+            f"You are writing {position} of a blog post on {topic}.\n\n"
+            f"Full content plan for context:\n{plan_text}\n\n"
+            f"Write ONLY this section: {section.title}\n"
+            f"Planner notes for it:\n{notes}\n\n"
+            "Rules:\n"
+            "1. Start with the line '## " + section.title + "' "
+            "(you may rephrase the heading in an engaging manner).\n"
+            "2. Write 2 or 3 paragraphs in markdown.\n"
+            "3. Incorporate SEO keywords from the plan naturally.\n"
+            "4. Do not write other sections, a title, or any commentary."
+        )},
+    ]
+
+
+def _ensure_heading(text, title):
+    text = text.strip()
+    if text.lower().startswith("final answer:"):
+        text = text[len("final answer:"):].strip()
+    if not text.startswith("#"):
+        text = f"## {title}\n\n{text}"
+    return text
+
+
+def write_sections(llm, sections, topic, plan_text, persona, max_workers=4):
+    """
+    Writes every section with its own concurrent LLM call and stitches the
+    results in outline order, so the draft does not depend on which call
+    finishes first.
+    """
+    total = len(sections)
+
+    def _write(index):
+        section = sections[index]
+        messages = _section_messages(section, index, total, topic, plan_text, persona)
+        return _ensure_heading(llm.call(messages), section.title)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        bodies = list(executor.map(_write, range(total)))
+
+    return f"# {topic}\n\n" + "\n\n".join(bodies) + "\n"
@@ -0,0 +1,167 @@
+# pylint: disable=C0114
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+def render(template, inputs):
+    """
+    Fills {name} placeholders the way CrewAI interpolates task inputs,
+    leaving unknown placeholders untouched.
+    """
+    return _PLACEHOLDER.sub(
+        lambda m: str(inputs[m.group(1)]) if m.group(1) in inputs else m.group(0),
+        template or "")
+
+
+def task_cache_key(task, inputs, model):
+    """
+    Hashes everything that determines a task's output: the rendered
+    description and expected output, the agent's role and backstory, and
+    the model name.
+    """
+    agent = task.agent
+    parts = [
+        render(task.description, inputs),
+        render(task.expected_output, inputs),
+        render(agent.role, inputs),
+        render(agent.backstory, inputs),
+        model,
+    ]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class TaskOutputCache:
+    """
+    Persistent sqlite cache of task outputs with a TTL and a total size cap.
+
+    Entries older than ttl_seconds are treated as misses. When the stored
+    outputs exceed max_bytes the least recently used entries are evicted.
+    Lifetime hit/miss counts and the LLM seconds saved by hits are kept in
+    the same file, so they survive across runs.
+    """
+
+    def __init__(self, path=".cache/task_outputs.sqlite",
+                 ttl_seconds=7 * 24 * 3600, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    label TEXT,
+                    output TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    compute_seconds REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )""")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_last_access "
+                "ON entries (last_access)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stats (
+                    name TEXT PRIMARY KEY,
+                    value REAL NOT NULL
+                )""")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _bump(conn, name, amount):
+        conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount))
+
+    def get(self, key):
+        """
+        Returns the cached output for key, or None on a miss.
+        """
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT output, compute_seconds, created_at FROM entries WHERE key = ?",
+                (key,)).fetchone()
+            if row is not None and now - row[2] > self.ttl_seconds:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                self._bump(conn, "misses", 1)
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            self.seconds_saved += row[1]
+            self._bump(conn, "hits", 1)
+            self._bump(conn, "seconds_saved", row[1])
+            return row[0]
+
+    def put(self, key, output, compute_seconds=0.0, label=""):
+        """
+        Stores an output, then enforces the TTL and the size cap.
+        """
+        now = time.time()
+        size = len(output.encode("utf-8"))
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, label, output, size, compute_seconds, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, label, output, size, compute_seconds, now, now))
+            conn.execute("DELETE FROM entries WHERE created_at < ?",
+                         (now - self.ttl_seconds,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                for old_key, old_size in conn.execute(
+                        "SELECT key, size FROM entries ORDER BY last_access").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM entries WHERE key = ?", (old_key,))
+                    total -= old_size
+
+    def stats(self):
+        """
+        Returns this process's counters alongside the lifetime totals.
+        """
+        with closing(self._connect()) as conn:
+            lifetime = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "seconds_saved": self.seconds_saved,
+            "lifetime_hits": int(lifetime.get("hits", 0)),
+            "lifetime_misses": int(lifetime.get("misses", 0)),
+            "lifetime_seconds_saved": lifetime.get("seconds_saved", 0.0),
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def report(self, name="Task cache"):
+        """
+        Prints the hit/miss counters and the LLM time saved.
+        """
+        s = self.stats()
+        print(f"📦 {name}: {s['hits']} hits / {s['misses']} misses this run, "
+              f"~{s['seconds_saved']:.1f}s of LLM time saved "
+              f"(lifetime: {s['lifetime_hits']} hits / {s['lifetime_misses']} misses, "
+              f"~{s['lifetime_seconds_saved']:.1f}s saved; "
+              f"{s['entries']} entries, {s['bytes'] / 1024:.1f} KiB)")
@@ -0,0 +1,83 @@
+"""Compare prompt size and latency of scrape-the-page vs. top-k docs retrieval.
+
+For each inquiry this measures what the support agent's tool call would put
+into the prompt: the whole scraped docs page (current path) against the
+top-k chunks from the prebuilt index (`build_docs_index.py`).
+
+Usage:
+    python bench_docs_retrieval.py [--index .cache/docs_index] [--top-k 4]
+"""
+
+import argparse
+import statistics
+import time
+from utils.docs_index import DocsIndex, DocsRetrievalTool
+from utils.scrape_cache import SCRAPE_PREFIX, ScrapeCache
+
+DOCS_URL = "https://docs.crewai.com/how-to/Creating-a-Crew-and-kick-it-off/"
+
+INQUIRIES = [
+    "I need help with setting up a Crew and kicking it off, specifically "
+    "how can I add memory to my crew? Can you provide guidance?",
+    "How do I run tasks asynchronously and wait for their output?",
+    "Can an agent delegate work to another agent in the crew?",
+    "How do I give an agent a custom tool?",
+]
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # pylint: disable=broad-except
+    _ENCODING = None
+
+
+def count_tokens(text):
+    """Count tokens with tiktoken when available, else ~4 characters per token."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return max(1, len(text) // 4)
+
+
+def main():
+    """Run both paths for every inquiry and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--index", default=".cache/docs_index")
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    DocsIndex(args.index)
+    open_ms = (time.perf_counter() - start) * 1000
+
+    cache = ScrapeCache()
+    start = time.perf_counter()
+    page = SCRAPE_PREFIX + cache.get(DOCS_URL)
+    first_scrape_ms = (time.perf_counter() - start) * 1000
+    scrape_ms = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        cache.get(DOCS_URL)
+        scrape_ms.append((time.perf_counter() - start) * 1000)
+    page_tokens = count_tokens(page)
+
+    tool = DocsRetrievalTool(index_dir=args.index, top_k=args.top_k)
+    print(f"{'inquiry':48s} {'scrape tok':>10s} {'top-k tok':>10s} {'saved':>7s} {'query ms':>9s}")
+    for inquiry in INQUIRIES:
+        latencies = []
+        for _ in range(args.repeat):
+            passages = tool._run(inquiry)  # pylint: disable=protected-access
+            latencies.append(tool.last_latency * 1000)
+        tokens = count_tokens(passages)
+        print(f"{inquiry[:48]:48s} {page_tokens:10d} {tokens:10d} "
+              f"{1 - tokens / page_tokens:7.0%} {statistics.median(latencies):9.2f}")
+
+    print("\n" + "="*80)
+    print(f"index open (mmap):          {open_ms:.1f} ms")
+    print(f"scrape, first call:         {first_scrape_ms:.1f} ms")
+    print(f"scrape, cached (median):    {statistics.median(scrape_ms):.2f} ms")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Benchmark the memory-mapped vector store behind the crew memory.
+
+Inserts N synthetic support memories (embedded once with the hashing
+embedder) into a float16 and an int8 store, then measures insert
+throughput, single and batched query latency, bytes per memory, resident
+memory, and how often int8 returns the same top hit as float16.
+
+Usage:
+    python bench_vector_memory.py [--n 100000] [--dim 384] [--batch 1000]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from utils.vector_memory import VectorStore, hashing_embedder
+
+TOPICS = ["memory", "tools", "delegation", "async tasks", "hierarchical process",
+          "custom llm", "ollama", "callbacks", "planning", "training", "testing",
+          "knowledge sources", "guardrails", "structured output", "flows"]
+VERBS = ["set up", "debug", "configure", "speed up", "migrate", "disable", "share"]
+
+
+def rss_mb():
+    """Current resident set size in MB (Linux), else peak RSS."""
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def synthetic_memories(n, seed=7):
+    """n short support-resolution texts."""
+    rng = random.Random(seed)
+    return [f"customer-{rng.randrange(n // 10 + 1)} asked how to {rng.choice(VERBS)} "
+            f"{rng.choice(TOPICS)} with {rng.choice(TOPICS)}; resolved by pointing to "
+            f"the {rng.choice(TOPICS)} docs (ticket {i})" for i in range(n)]
+
+
+def bench(dtype, vectors, texts, queries, batch, repeat):
+    """Insert everything into a fresh store and time queries."""
+    with tempfile.TemporaryDirectory() as tmp:
+        before = rss_mb()
+        store = VectorStore(tmp, vectors.shape[1], dtype)
+        start = time.perf_counter()
+        for i in range(0, len(texts), batch):
+            store.add(vectors[i:i + batch], texts[i:i + batch])
+        insert_s = time.perf_counter() - start
+
+        # Reopen cold so the numbers reflect a freshly started worker
+        del store
+        opened = time.perf_counter()
+        store = VectorStore(tmp, vectors.shape[1], dtype)
+        open_ms = (time.perf_counter() - opened) * 1000
+
+        single = []
+        for _ in range(repeat):
+            for q in queries:
+                start = time.perf_counter()
+                store.search(q[None, :], top_k=3)
+                single.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            batched = store.search(queries, top_k=3)
+        batched_ms = (time.perf_counter() - start) * 1000 / (repeat * len(queries))
+
+        return {
+            "dtype": dtype,
+            "insert_per_s": len(texts) / insert_s,
+            "open_ms": open_ms,
+            "p50_ms": statistics.median(single),
+            "p95_ms": statistics.quantiles(single, n=20)[-1],
+            "batched_ms": batched_ms,
+            "bytes_per_memory": store.nbytes() / len(store),
+            "mb_per_100k": store.nbytes() / len(store) * 100_000 / 2**20,
+            "rss_delta_mb": rss_mb() - before,
+            "top1": [hits[0][1] for hits in batched],
+        }
+
+
+def main():
+    """Run the benchmark for both dtypes and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    embed = hashing_embedder(args.dim)
+    texts = synthetic_memories(args.n)
+    start = time.perf_counter()
+    vectors = embed(texts)
+    embed_s = time.perf_counter() - start
+    queries = embed(random.Random(1).sample(texts, args.queries))
+
+    results = [bench(dtype, vectors, texts, queries, args.batch, args.repeat)
+               for dtype in ("float16", "int8")]
+
+    print(f"{args.n} memories, dim {args.dim}, hashing embedder "
+          f"{args.n / embed_s:.0f} texts/s")
+    print(f"{'dtype':8s} {'insert/s':>10s} {'open ms':>8s} {'p50 ms':>8s} {'p95 ms':>8s} "
+          f"{'batched ms':>10s} {'B/mem':>7s} {'MB/100k':>8s} {'RSS +MB':>8s}")
+    for r in results:
+        print(f"{r['dtype']:8s} {r['insert_per_s']:10.0f} {r['open_ms']:8.1f} "
+              f"{r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['batched_ms']:10.3f} "
+              f"{r['bytes_per_memory']:7.0f} {r['mb_per_100k']:8.1f} {r['rss_delta_mb']:8.1f}")
+    same = sum(a == b for a, b in zip(results[0]["top1"], results[1]["top1"]))
+    print(f"\nint8 top-1 agrees with float16 on {same}/{len(queries)} queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Build the chunked BM25 docs index used by the 'Read CrewAI Docs' retrieval tool.
+
+Crawls a configured set of documentation URLs (through the on-disk scrape
+cache) and/or local files once, chunks them and writes a compact,
+memory-mappable index that `main.py --docs-index` loads at startup.
+
+Usage:
+    python build_docs_index.py
+    python build_docs_index.py --url https://docs.crewai.com/concepts/memory \
+        --path ./docs --out .cache/docs_index --embed nomic-embed-text
+"""
+
+import argparse
+import os
+import time
+from utils.docs_index import build_index, ollama_embedder
+from utils.scrape_cache import ScrapeCache, extract_text
+
+DEFAULT_DOC_URLS = [
+    "https://docs.crewai.com/how-to/Creating-a-Crew-and-kick-it-off/",
+    "https://docs.crewai.com/concepts/crews",
+    "https://docs.crewai.com/concepts/agents",
+    "https://docs.crewai.com/concepts/tasks",
+    "https://docs.crewai.com/concepts/memory",
+]
+
+
+def iter_local_documents(path):
+    """Yield (source, text) for a file or every .md/.txt/.html file under a directory."""
+    paths = [path]
+    if os.path.isdir(path):
+        paths = [os.path.join(root, name)
+                 for root, _, names in os.walk(path) for name in sorted(names)
+                 if name.endswith((".md", ".txt", ".html", ".htm"))]
+    for file_path in paths:
+        with open(file_path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        if file_path.endswith((".html", ".htm")):
+            text = extract_text(text)
+        yield file_path, text
+
+
+def main():
+    """Crawl the configured sources once and write the index."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", action="append", default=[],
+                        help="documentation URL to crawl (repeatable)")
+    parser.add_argument("--path", action="append", default=[],
+                        help="local file or directory to index (repeatable)")
+    parser.add_argument("--out", default=".cache/docs_index")
+    parser.add_argument("--chunk-words", type=int, default=180)
+    parser.add_argument("--overlap-words", type=int, default=40)
+    parser.add_argument("--embed", metavar="MODEL",
+                        help="also store embeddings from this local Ollama model")
+    args = parser.parse_args()
+
+    urls = args.url or ([] if args.path else DEFAULT_DOC_URLS)
+    start = time.perf_counter()
+
+    documents = []
+    cache = ScrapeCache()
+    for url in urls:
+        try:
+            documents.append((url, cache.get(url)))
+            print(f"📄 {url}")
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"⚠️  skipped {url}: {exc}")
+    for path in args.path:
+        for source, text in iter_local_documents(path):
+            documents.append((source, text))
+            print(f"📄 {source}")
+
+    embed = ollama_embedder(args.embed) if args.embed else None
+    chunks = build_index(documents, args.out, args.chunk_words, args.overlap_words,
+                         embed=embed, embed_model=args.embed)
+
+    size = sum(os.path.getsize(os.path.join(args.out, name)) for name in os.listdir(args.out))
+    print(f"✅ Indexed {len(documents)} documents into {chunks} chunks "
+          f"({size / 1024:.1f} KiB) at {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
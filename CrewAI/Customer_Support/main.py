@@ -3,46 +3,52 @@
 This script configures a local model (Ollama) for CrewAI, constructs a support
 agent and a support-quality-assurance agent, defines tasks that use a website
 scraping tool, runs a Crew to resolve a customer inquiry, prints the final
-output, and saves it as a timestamped Markdown file under the `outputs/`
-directory.
+output, and saves it as Markdown in a run directory of its own under
+`outputs/`, next to a manifest of the run's inputs, timings and file hashes.
 
 Usage:
-    python main.py
+    python main.py [--stream] [--docs-index .cache/docs_index]
+                   [--similarity-threshold 0.8] [--response-cache-size 10000]
+                   [--no-response-cache] [--no-qa-gate]
+                   [--memory-embedder ollama|hashing | --no-memory]
 
 Notes:
 - The script sets OPENAI_API_BASE, OPENAI_API_KEY (dummy), and OPENAI_MODEL_NAME
   to point CrewAI at a locally hosted Ollama instance.
+- With --docs-index, the support agent retrieves the top-k relevant chunks
+  from an index built by `build_docs_index.py` instead of scraping the whole
+  docs page into its prompt.
+- Near-duplicate inquiries are answered from a local cache of earlier
+  QA-approved answers, re-personalised for the new customer and person.
+- The support draft is checked locally first (references, coverage of the
+  inquiry, length, tone) and only sent to the QA agent when it fails.
+- Crew memory (short-term, entity and long-term) is kept in local memory-mapped
+  vector stores under .cache/memory, embedded with a local Ollama model
+  (`ollama pull nomic-embed-text`) or, with --memory-embedder hashing, a
+  dependency-free hashing embedder. Returning customers recall their own
+  earlier resolutions; memories are kept apart per customer.
+- With --stream, the QA agent's answer is written to stdout and to the output
+  file token by token, and time-to-first-token is reported.
 - Side effects: environment variables are set, output is written to disk, and
   the Crew is executed which may make network calls.
 """
 
+import argparse
+import time
 import warnings
 import os
-from datetime import datetime
-from crewai import Agent, Task, Crew
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool, WebsiteSearchTool
+from crewai import Agent, Task, Crew, LLM
+from utils.docs_index import DocsIndex, DocsRetrievalTool, ollama_embedder
+from utils.qa_gate import GateDecision, check_draft
+from utils.response_cache import ResponseCache
+from utils.run_outputs import RunDirectory
+from utils.scrape_cache import CachedScrapeWebsiteTool, default_scrape_cache
+from utils.streaming import StreamingMarkdownWriter
+from utils.vector_memory import VectorMemory, customer_scope, hashing_embedder
 
 
-def main():
-    
-    """Run the CrewAI workflow to handle a customer inquiry.
-
-    This function:
-    - Silences warnings.
-    - Configures environment variables to use a local Ollama model.
-    - Instantiates two Agents (support and QA), corresponding Tasks, and a Crew.
-    - Starts the Crew with sample inputs, prints the final output, and saves it
-      to a timestamped Markdown file in `outputs/`.
-
-    Returns:
-        None
-
-    Side effects:
-        - Sets environment variables used by CrewAI.
-        - Writes a Markdown file containing the final output.
-        - Prints status and final output to stdout.
-    """
-
+def configure_environment():
+    """Silence warnings and point CrewAI at the local Ollama model."""
     warnings.filterwarnings('ignore')
 
     # Use Ollama(Own llama) locally instead of OpenAI
@@ -50,6 +56,42 @@ def main():
     os.environ["OPENAI_API_KEY"] = "ollama"  # dummy value, required by CrewAI
     os.environ["OPENAI_MODEL_NAME"] = "llama3.2:3b"
 
+
+def build_streaming_llm():
+    """Return the local model configured for token streaming."""
+    return LLM(
+        model=f"openai/{os.environ['OPENAI_MODEL_NAME']}",
+        base_url=os.environ["OPENAI_API_BASE"],
+        api_key=os.environ["OPENAI_API_KEY"],
+        stream=True
+    )
+
+
+def build_memory(embedder="ollama", directory=".cache/memory"):
+    """Return the offline VectorMemory for `embedder` ("ollama" or "hashing").
+
+    Each embedder gets its own stores, since their vectors are not comparable.
+    """
+    embed = ollama_embedder() if embedder == "ollama" else hashing_embedder()
+    return VectorMemory(os.path.join(directory, embedder), embed)
+
+
+def build_crew(stream=False, docs_index=None, memory=None):
+    """Build the support and QA agents, their tasks, and the Crew.
+
+    Args:
+        stream: When True, only the QA agent's LLM streams tokens, so every
+            streamed chunk belongs to the final task.
+        docs_index: Directory of a prebuilt docs index. When given, the
+            'Read CrewAI Docs' tool returns the top-k relevant chunks
+            instead of the whole scraped page, blending in the stored
+            embeddings when the index was built with --embed.
+        memory: Optional VectorMemory backing the crew's short-term, entity
+            and long-term memory; memory is off without it.
+
+    Returns:
+        Crew: A crew expecting `customer`, `person` and `inquiry` inputs.
+    """
     support_agent = Agent(
         role="Senior Support Representative",
         goal="Be the most friendly and helpful "
@@ -81,17 +123,27 @@ def main():
             "is providing full"
             "complete answers, and make no assumptions."
         ),
+        llm=build_streaming_llm() if stream else None,
         verbose=True
     )
 
-    docs_scrape_tool = ScrapeWebsiteTool(
-        website_url="https://docs.crewai.com/how-to/Creating-a-Crew-and-kick-it-off/",
-        name="Read CrewAI Docs",
-        description=(
-            "Reads and summarizes content from the CrewAI documentation page "
-            "on creating and kicking off a crew."
+    if docs_index:
+        # Opened here so a missing or broken index fails before the first inquiry
+        index = DocsIndex(docs_index)
+        model = index.meta.get("embed_model")
+        docs_scrape_tool = DocsRetrievalTool(
+            index_dir=docs_index, index=index,
+            embed=ollama_embedder(model) if model else None)
+    else:
+        # Cached on disk: the same docs page is not re-downloaded per inquiry
+        docs_scrape_tool = CachedScrapeWebsiteTool(
+            website_url="https://docs.crewai.com/how-to/Creating-a-Crew-and-kick-it-off/",
+            name="Read CrewAI Docs",
+            description=(
+                "Reads and summarizes content from the CrewAI documentation page "
+                "on creating and kicking off a crew."
+            )
         )
-    )
 
     inquiry_resolution = Task(
         description=(
@@ -122,7 +174,7 @@ def main():
         tools=[docs_scrape_tool],
         agent=support_agent,
     )
-    
+
     quality_assurance_review = Task(
         description=(
             "Review the response drafted by the Senior Support Representative for {customer}'s inquiry. "
@@ -146,14 +198,198 @@ def main():
             "but maintain a professional and friendly tone throughout."
         ),
         agent=support_quality_assurance_agent,
+        # Explicit so the review can also run on its own after the QA gate
+        context=[inquiry_resolution],
     )
 
-    crew = Crew(
+    return Crew(
       agents=[support_agent, support_quality_assurance_agent],
       tasks=[inquiry_resolution, quality_assurance_review],
       verbose=True,
-      memory=False     # Memory not working with Ollama currently
+      **(memory.crew_memories() if memory else {"memory": False})
+    )
+
+
+def extract_output_text(result):
+    """Safely extract the final text regardless of CrewAI version."""
+    if hasattr(result, "final_output"):
+        return result.final_output
+    if hasattr(result, "output_text"):
+        return result.output_text
+    if hasattr(result, "output"):
+        return result.output
+    if isinstance(result, dict):
+        return result.get("final_output") or result.get("output") or str(result)
+    return str(result)
+
+
+def _run_tasks(crew, tasks, inputs):
+    """Kick off a crew made of only the given tasks of `crew`."""
+    partial = Crew(
+      agents=[task.agent for task in tasks],
+      tasks=tasks,
+      verbose=crew.verbose,
+      memory=crew.memory,
+      short_term_memory=crew.short_term_memory,
+      long_term_memory=crew.long_term_memory,
+      entity_memory=crew.entity_memory
     )
+    return extract_output_text(partial.kickoff(inputs=inputs))
+
+
+def kickoff_gated(crew, inputs):
+    """Draft an answer and only run the QA review when the draft fails local checks.
+
+    Args:
+        crew: Crew built by `build_crew`.
+        inputs: Dict with `customer`, `person` and `inquiry`.
+
+    Returns:
+        GateDecision: The answer, the path taken ("gate" or "qa"), the
+        problems found and the seconds spent on each step.
+    """
+    inquiry_resolution, quality_assurance_review = crew.tasks
+    start = time.perf_counter()
+    draft = _run_tasks(crew, [inquiry_resolution], inputs)
+    draft_seconds = time.perf_counter() - start
+
+    problems = check_draft(draft, inputs["inquiry"], inputs["person"])
+    if not problems:
+        return GateDecision(draft, "gate", problems, draft_seconds)
+
+    # The review reads the draft through its context
+    start = time.perf_counter()
+    output_text = _run_tasks(crew, [quality_assurance_review], inputs)
+    return GateDecision(output_text, "qa", problems, draft_seconds,
+                        time.perf_counter() - start)
+
+
+def kickoff(crew, inputs, qa_gate=True):
+    """Run the crew, through the QA gate unless `qa_gate` is False.
+
+    Crew memory is saved and recalled in the namespace of
+    `inputs["customer"]` only.
+
+    Returns:
+        GateDecision: path is "crew" when the gate is off.
+    """
+    with customer_scope(inputs["customer"]):
+        if qa_gate:
+            decision = kickoff_gated(crew, inputs)
+            decision.print()
+            return decision
+        start = time.perf_counter()
+        output_text = extract_output_text(crew.kickoff(inputs=inputs))
+        return GateDecision(output_text, "crew", [], time.perf_counter() - start)
+
+
+def run_streaming(crew, inputs, run_dir, qa_gate=True):
+    """Kick off the crew, streaming the QA agent's answer as it is produced.
+
+    Tokens go to stdout and are appended to crew_output.md in `run_dir`;
+    time-to-first-token is printed once the crew finishes. When the draft
+    passes the QA gate nothing is streamed and the draft is written out
+    instead.
+    """
+    output_file = run_dir.file("crew_output.md")
+    writer = StreamingMarkdownWriter(output_file)
+    # The QA review starts as soon as the support draft is done
+    crew.tasks[-2].callback = writer.mark_final_task_started
+
+    print("\n" + "="*80)
+    print("🧠 FINAL OUTPUT (streaming):")
+    print("="*80 + "\n")
+    with writer:
+        decision = kickoff(crew, inputs, qa_gate)
+        writer.finish(decision.output)
+    run_dir.record("crew_output.md")
+    print("\n" + "="*80)
+    writer.report()
+    print(f"✅ Output saved to: {output_file}")
+    return decision
+
+
+def resolve(inputs, run, response_cache=None):
+    """Answer one inquiry, reusing a near-duplicate's answer when possible.
+
+    Args:
+        inputs: Dict with `customer`, `person` and `inquiry`.
+        run: Callable(inputs) -> GateDecision that runs the crew on a
+            cache miss, e.g. `kickoff`.
+        response_cache: Optional ResponseCache; a miss is stored only when
+            its answer went through the QA agent, so every cache hit is a
+            QA-approved answer. Drafts passed by the local QA gate are not
+            stored.
+
+    Returns:
+        tuple: (output_text, path) where path is "cache" or the path of the
+        crew's GateDecision.
+    """
+    if response_cache is not None:
+        cached, similarity = response_cache.lookup(
+            inputs["inquiry"], inputs["customer"], inputs["person"])
+        if cached is not None:
+            print(f"♻️  Near-duplicate of an earlier inquiry (similarity {similarity:.2f}), "
+                  "reusing its QA-approved answer")
+            return cached, "cache"
+
+    decision = run(inputs)
+    if response_cache is not None and decision.path in ("qa", "crew"):
+        response_cache.store(inputs["inquiry"], inputs["customer"], inputs["person"],
+                             decision.output)
+    return decision.output, decision.path
+
+
+def main():
+
+    """Run the CrewAI workflow to handle a customer inquiry.
+
+    This function:
+    - Silences warnings.
+    - Configures environment variables to use a local Ollama model.
+    - Instantiates two Agents (support and QA), corresponding Tasks, and a Crew.
+    - Starts the Crew with sample inputs, prints the final output, and saves it
+      to Markdown in the run's own directory under `outputs/` (streaming it
+      there token by token when --stream is given).
+
+    Returns:
+        None
+
+    Side effects:
+        - Sets environment variables used by CrewAI.
+        - Writes a Markdown file containing the final output and a
+          manifest.json to a new run directory.
+        - Prints status and final output to stdout.
+    """
+    parser = argparse.ArgumentParser(
+        description="Resolve a customer inquiry with a support crew.")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream the QA agent's tokens to stdout and the "
+                             "output file as they arrive")
+    parser.add_argument("--docs-index", metavar="DIR",
+                        help="retrieve top-k chunks from this prebuilt docs "
+                             "index instead of scraping the whole page")
+    parser.add_argument("--similarity-threshold", type=float, default=0.8,
+                        help="minimum estimated Jaccard similarity for a "
+                             "cached answer to be reused (default: %(default)s)")
+    parser.add_argument("--no-response-cache", action="store_true",
+                        help="always run the crew")
+    parser.add_argument("--response-cache-size", type=int, default=10000,
+                        help="cached answers kept before the least recently "
+                             "used are evicted (default: %(default)s)")
+    parser.add_argument("--no-qa-gate", action="store_true",
+                        help="always run the QA review instead of checking "
+                             "the draft locally first")
+    parser.add_argument("--memory-embedder", choices=("ollama", "hashing"), default="ollama",
+                        help="embedding model for crew memory (default: %(default)s)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="run without crew memory")
+    args = parser.parse_args()
+
+    configure_environment()
+
+    memory = None if args.no_memory else build_memory(args.memory_embedder)
+    crew = build_crew(stream=args.stream, docs_index=args.docs_index, memory=memory)
 
     inputs = {
         "customer": "DeepLearningAI",
@@ -163,20 +399,35 @@ def main():
                    "how can I add memory to my crew? "
                    "Can you provide guidance?"
     }
-    result = crew.kickoff(inputs=inputs)
 
-    # Safely extract the final text regardless of CrewAI version
-    output_text = None
-    if hasattr(result, "final_output"):
-        output_text = result.final_output
-    elif hasattr(result, "output_text"):
-        output_text = result.output_text
-    elif hasattr(result, "output"):
-        output_text = result.output
-    elif isinstance(result, dict):
-        output_text = result.get("final_output") or result.get("output") or str(result)
-    else:
-        output_text = str(result)
+    response_cache = None if args.no_response_cache else ResponseCache(
+        threshold=args.similarity_threshold, max_entries=args.response_cache_size)
+
+    qa_gate = not args.no_qa_gate
+    # Concurrent runs on one host each get their own directory and manifest
+    with RunDirectory(inputs, root="outputs", label=inputs["customer"]) as run_dir:
+        if args.stream:
+            def run(inputs):
+                return run_streaming(crew, inputs, run_dir, qa_gate)
+        else:
+            def run(inputs):
+                return kickoff(crew, inputs, qa_gate)
+
+        with run_dir.timed("resolve"):
+            output_text, path = resolve(inputs, run, response_cache)
+        run_dir.manifest["path"] = path
+        # A streamed answer is already in the run directory
+        streamed = args.stream and path != "cache"
+        if not streamed:
+            output_file = run_dir.write("crew_output.md", output_text)
+
+    if streamed:
+        if response_cache:
+            response_cache.report()
+        if memory:
+            memory.report()
+        default_scrape_cache().report()
+        return
 
     # --- Print nicely formatted output ---
     print("\n" + "="*80)
@@ -185,18 +436,12 @@ def main():
     print(output_text)
     print("\n" + "="*80)
 
-    # --- Save output to Markdown file ---
-    output_dir = "outputs"
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Optional: create a timestamped filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = os.path.join(output_dir, f"crew_output_{timestamp}.md")
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(output_text)
-
     print(f"✅ Output saved to: {output_file}")
+    if response_cache:
+        response_cache.report()
+    if memory:
+        memory.report()
+    default_scrape_cache().report()
 
 if __name__ == "__main__":
     main()
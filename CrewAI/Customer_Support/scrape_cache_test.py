@@ -0,0 +1,63 @@
+import tempfile
+import threading
+import time
+from utils.local_http_server import LocalHTTPServer
+from utils.scrape_cache import ScrapeCache
+
+# Exercises the scrape cache against a local stand-in docs server:
+# cold miss, fresh hit, 304 revalidation, changed page, request coalescing
+# and LRU eviction. No network access needed.
+
+PAGE = "<html><body><h1>Creating a Crew</h1><p>Set memory=True on the Crew.</p></body></html>"
+
+
+def main():
+    pages = {"/docs": PAGE,
+             "/a": "<p>" + "a" * 1200 + "</p>",
+             "/b": "<p>" + "b" * 1200 + "</p>"}
+    with LocalHTTPServer(pages, delay=0.2) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        cache = ScrapeCache(tmp, ttl_seconds=1, max_bytes=1500)
+        url = server.url("/docs")
+
+        assert "memory=True" in cache.get(url)
+        assert server.requests["/docs"] == 1, "cold miss downloads once"
+
+        cache.get(url)
+        assert server.requests["/docs"] == 1, "fresh entry is served from disk"
+
+        time.sleep(1.1)
+        assert "memory=True" in cache.get(url)
+        assert server.not_modified == 1, "stale entry is revalidated with a 304"
+
+        server.set_page("/docs", PAGE.replace("memory=True", "memory=False"))
+        time.sleep(1.1)
+        assert "memory=False" in cache.get(url), "changed page is downloaded again"
+
+        time.sleep(1.1)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get(url)))
+                   for _ in range(8)]
+        before = server.requests["/docs"]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert server.requests["/docs"] == before + 1, "8 concurrent callers, 1 request"
+        assert len(set(results)) == 1
+
+        cache.get(server.url("/a"))
+        cache.get(server.url("/b"))  # pushes the total over max_bytes
+        # pylint: disable=protected-access
+        assert cache._lookup(url) is None, "least recently used page was evicted"
+        assert cache._lookup(server.url("/b")) is not None
+
+        cache.report()
+        print(f"requests served by the stand-in: {server.requests}")
+        print("✅ scrape cache behaves as expected")
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    main()
+    print(f"done in {time.perf_counter() - start:.2f}s")
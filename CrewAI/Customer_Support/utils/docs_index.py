@@ -0,0 +1,255 @@
+# pylint: disable=C0114
+import json
+import math
+import os
+import re
+import time
+from collections import Counter
+from typing import Any, Type
+
+import numpy as np
+import requests
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+_TOKEN = re.compile(r"[a-z0-9_]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from how i if in into is it "
+    "its me my of on or our so that the their them then there these this to "
+    "was we what when where which who why will with you your".split())
+
+
+def tokenize(text):
+    """
+    Lowercases, splits on non-word characters, drops stopwords and folds a
+    trailing plural 's' so "crews" matches "crew".
+    """
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def chunk_text(text, chunk_words=180, overlap_words=40):
+    """
+    Splits text into chunks of about chunk_words words along paragraph
+    boundaries, carrying overlap_words words into the next chunk.
+    """
+    if not 0 <= overlap_words < chunk_words:
+        raise ValueError(f"overlap_words must be in [0, chunk_words), got {overlap_words} "
+                         f"with chunk_words={chunk_words}")
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n|\n(?=#)", text) if p.strip()]
+    chunks, current = [], []
+    for paragraph in paragraphs:
+        words = paragraph.split()
+        while words:
+            room = chunk_words - len(current)
+            current.extend(words[:room])
+            words = words[room:]
+            if len(current) >= chunk_words:
+                chunks.append(" ".join(current))
+                current = current[-overlap_words:] if overlap_words else []
+    if current and (not chunks or len(current) > overlap_words):
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def ollama_embedder(model="nomic-embed-text", base_url="http://localhost:11434"):
+    """
+    Returns an embed(texts) -> float32 array function backed by a local
+    Ollama embedding model.
+    """
+    def embed(texts):
+        response = requests.post(f"{base_url}/api/embed",
+                                 json={"model": model, "input": list(texts)},
+                                 timeout=120)
+        response.raise_for_status()
+        vectors = np.asarray(response.json()["embeddings"], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+    return embed
+
+
+def build_index(documents, directory, chunk_words=180, overlap_words=40,
+                embed=None, k1=1.5, b=0.75, embed_model=None):
+    """
+    Chunks (source, text) documents and writes a BM25 index to directory.
+    embed_model names the Ollama model behind embed; it is kept in the meta
+    so readers can embed queries with the same model.
+
+    Layout: chunk text concatenated in chunks.bin with int64 offsets, CSR
+    postings (postings_offsets / postings_docs / postings_tf), per-chunk
+    lengths, and optionally float16 unit-norm embeddings. All arrays are
+    plain .npy files so DocsIndex can memory-map them.
+    """
+    os.makedirs(directory, exist_ok=True)
+    texts, sources = [], []
+    for source, text in documents:
+        for chunk in chunk_text(text, chunk_words, overlap_words):
+            texts.append(chunk)
+            sources.append(source)
+    if not texts:
+        raise ValueError("no text to index")
+
+    vocab, postings = {}, []
+    doc_len = np.zeros(len(texts), dtype=np.int32)
+    for doc_id, chunk in enumerate(texts):
+        counts = Counter(tokenize(chunk))
+        doc_len[doc_id] = sum(counts.values())
+        for term, tf in counts.items():
+            term_id = vocab.setdefault(term, len(vocab))
+            if term_id == len(postings):
+                postings.append([])
+            postings[term_id].append((doc_id, min(tf, 65535)))
+
+    offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(p) for p in postings])
+    docs = np.fromiter((d for p in postings for d, _ in p), dtype=np.int32, count=offsets[-1])
+    tfs = np.fromiter((t for p in postings for _, t in p), dtype=np.uint16, count=offsets[-1])
+
+    encoded = [t.encode("utf-8") for t in texts]
+    chunk_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    chunk_offsets[1:] = np.cumsum([len(e) for e in encoded])
+    with open(os.path.join(directory, "chunks.bin"), "wb") as f:
+        f.write(b"".join(encoded))
+
+    source_names = sorted(set(sources))
+    source_ids = np.array([source_names.index(s) for s in sources], dtype=np.int32)
+
+    np.save(os.path.join(directory, "chunk_offsets.npy"), chunk_offsets)
+    np.save(os.path.join(directory, "chunk_sources.npy"), source_ids)
+    np.save(os.path.join(directory, "doc_len.npy"), doc_len)
+    np.save(os.path.join(directory, "postings_offsets.npy"), offsets)
+    np.save(os.path.join(directory, "postings_docs.npy"), docs)
+    np.save(os.path.join(directory, "postings_tf.npy"), tfs)
+    if embed is not None:
+        vectors = np.vstack([embed(texts[i:i + 64]) for i in range(0, len(texts), 64)])
+        np.save(os.path.join(directory, "embeddings.npy"), vectors.astype(np.float16))
+
+    with open(os.path.join(directory, "vocab.json"), "w", encoding="utf-8") as f:
+        json.dump(vocab, f, separators=(",", ":"))
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"chunks": len(texts), "avgdl": float(doc_len.mean()),
+                   "k1": k1, "b": b, "sources": source_names,
+                   "embeddings": embed is not None, "embed_model": embed_model,
+                   "built_at": time.time()}, f, indent=2)
+    return len(texts)
+
+
+class DocsIndex:
+    """
+    Read side of build_index: every array is memory-mapped, so opening the
+    index is cheap and pages are only read when a query touches them.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(os.path.join(directory, "vocab.json"), encoding="utf-8") as f:
+            self.vocab = json.load(f)
+
+        def _load(name):
+            return np.load(os.path.join(directory, name), mmap_mode="r")
+
+        self.chunk_offsets = _load("chunk_offsets.npy")
+        self.chunk_sources = _load("chunk_sources.npy")
+        self.doc_len = _load("doc_len.npy")
+        self.postings_offsets = _load("postings_offsets.npy")
+        self.postings_docs = _load("postings_docs.npy")
+        self.postings_tf = _load("postings_tf.npy")
+        self.chunks = np.memmap(os.path.join(directory, "chunks.bin"), dtype=np.uint8, mode="r") \
+            if self.chunk_offsets[-1] else np.zeros(0, dtype=np.uint8)
+        embeddings = os.path.join(directory, "embeddings.npy")
+        self.embeddings = np.load(embeddings, mmap_mode="r") if os.path.exists(embeddings) else None
+
+    def __len__(self):
+        return int(self.meta["chunks"])
+
+    def chunk(self, doc_id):
+        """
+        Returns (source, text) of one chunk.
+        """
+        start, end = self.chunk_offsets[doc_id], self.chunk_offsets[doc_id + 1]
+        text = bytes(self.chunks[start:end]).decode("utf-8")
+        return self.meta["sources"][int(self.chunk_sources[doc_id])], text
+
+    def bm25(self, query):
+        """
+        BM25 scores of every chunk for query.
+        """
+        n = len(self)
+        k1, b, avgdl = self.meta["k1"], self.meta["b"], self.meta["avgdl"]
+        scores = np.zeros(n, dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.postings_offsets[term_id], self.postings_offsets[term_id + 1]
+            docs = self.postings_docs[start:end]
+            tf = self.postings_tf[start:end].astype(np.float32)
+            df = end - start
+            idf = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+            norm = k1 * (1.0 - b + b * self.doc_len[docs] / avgdl)
+            np.add.at(scores, docs, idf * tf * (k1 + 1.0) / (tf + norm))
+        return scores
+
+    def search(self, query, top_k=4, embed=None, alpha=0.5):
+        """
+        Returns the top_k [(score, source, text)] for query. With an embed
+        function and stored embeddings, BM25 (max-normalised) and cosine
+        similarity are blended with weight alpha.
+        """
+        scores = self.bm25(query)
+        if embed is not None and self.embeddings is not None:
+            top = scores.max()
+            lexical = scores / top if top > 0 else scores
+            dense = np.asarray(self.embeddings, dtype=np.float32) @ embed([query])[0]
+            scores = alpha * lexical + (1.0 - alpha) * dense
+        top_k = min(top_k, len(scores))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        return [(float(scores[i]), *self.chunk(int(i))) for i in best if scores[i] > 0]
+
+
+class DocsQuery(BaseModel):
+    """Input schema for DocsRetrievalTool."""
+    query: str = Field(..., description="The customer's question or the topic to look up")
+
+
+class DocsRetrievalTool(BaseTool):
+    """
+    Returns only the top-k documentation chunks relevant to a query instead
+    of a whole scraped page.
+    """
+
+    name: str = "Read CrewAI Docs"
+    description: str = (
+        "Searches the CrewAI documentation and returns the most relevant "
+        "passages with their source URLs. Pass the customer's question as the query."
+    )
+    args_schema: Type[BaseModel] = DocsQuery
+    index_dir: str = ".cache/docs_index"
+    top_k: int = 4
+    embed: Any = None
+    index: Any = None
+    last_latency: float = 0.0
+
+    def _get_index(self):
+        if self.index is None:
+            self.index = DocsIndex(self.index_dir)
+        return self.index
+
+    def _run(self, query: str) -> str:
+        start = time.perf_counter()
+        results = self._get_index().search(query, self.top_k, embed=self.embed)
+        self.last_latency = time.perf_counter() - start
+        if not results:
+            return "No relevant documentation passages found."
+        return "\n\n".join(
+            f"[{rank}] Source: {source}\n{text}"
+            for rank, (_, source, text) in enumerate(results, start=1))
@@ -0,0 +1,208 @@
+# pylint: disable=C0114
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+
+class InquiryQueue:
+    """
+    Durable sqlite queue of support inquiries plus the results store.
+
+    An inquiry moves queued -> in_flight -> done (or failed). Claiming an
+    item only leases it: if the worker dies, the lease expires and the item
+    is handed out again. An item is acked by complete(), which writes its
+    result and marks it done in the same transaction, so a crash can never
+    lose an inquiry or record it as done without its output.
+    """
+
+    def __init__(self, path=".cache/inquiries.sqlite"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS inquiries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    customer TEXT NOT NULL,
+                    person TEXT NOT NULL,
+                    inquiry TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    enqueued_at REAL NOT NULL,
+                    leased_until REAL,
+                    worker TEXT
+                )""")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS inquiries_status ON inquiries (status, id)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    inquiry_id INTEGER PRIMARY KEY REFERENCES inquiries (id),
+                    output TEXT,
+                    error TEXT,
+                    queue_wait_seconds REAL,
+                    run_seconds REAL,
+                    started_at REAL,
+                    finished_at REAL NOT NULL,
+                    path TEXT,
+                    qa_seconds REAL
+                )""")
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(results)")]
+            for column, kind in (("path", "TEXT"), ("qa_seconds", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE results ADD COLUMN {column} {kind}")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+
+    def enqueue(self, customer, person, inquiry):
+        """
+        Adds one inquiry and returns its id.
+        """
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "INSERT INTO inquiries (customer, person, inquiry, enqueued_at) "
+                "VALUES (?, ?, ?, ?)",
+                (customer, person, inquiry, time.time()))
+            return cursor.lastrowid
+
+    def enqueue_jsonl(self, path):
+        """
+        Adds every {"customer", "person", "inquiry"} line of a JSONL spool
+        file in one transaction and returns how many were added.
+        """
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    rows.append((item["customer"], item["person"], item["inquiry"], time.time()))
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO inquiries (customer, person, inquiry, enqueued_at) "
+                "VALUES (?, ?, ?, ?)", rows)
+            conn.execute("COMMIT")
+        return len(rows)
+
+    def claim(self, worker, lease_seconds=1800):
+        """
+        Leases the oldest available inquiry (queued, or in flight with an
+        expired lease) to worker. Returns a dict or None when nothing is
+        available.
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, customer, person, inquiry, enqueued_at, attempts FROM inquiries "
+                "WHERE status = 'queued' OR (status = 'in_flight' AND leased_until < ?) "
+                "ORDER BY id LIMIT 1", (now,)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE inquiries SET status = 'in_flight', attempts = attempts + 1, "
+                "leased_until = ?, worker = ? WHERE id = ?",
+                (now + lease_seconds, worker, row[0]))
+            conn.execute("COMMIT")
+        return {"id": row[0], "customer": row[1], "person": row[2], "inquiry": row[3],
+                "enqueued_at": row[4], "attempts": row[5] + 1}
+
+    def extend_lease(self, inquiry_ids, lease_seconds=1800):
+        """
+        Keeps long-running inquiries leased to their worker.
+        """
+        if not inquiry_ids:
+            return
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                "UPDATE inquiries SET leased_until = ? WHERE id = ? AND status = 'in_flight'",
+                [(time.time() + lease_seconds, i) for i in inquiry_ids])
+
+    def complete(self, item, output, started_at, path="crew", qa_seconds=None):
+        """
+        Persists the result and acks the inquiry atomically. path records
+        how the answer was produced ("cache", "gate", "qa" or "crew") and
+        qa_seconds how long the QA review took when it ran.
+        """
+        finished_at = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO results (inquiry_id, output, error, queue_wait_seconds, "
+                "run_seconds, started_at, finished_at, path, qa_seconds) "
+                "VALUES (?, ?, NULL, ?, ?, ?, ?, ?, ?)",
+                (item["id"], output, started_at - item["enqueued_at"],
+                 finished_at - started_at, started_at, finished_at, path, qa_seconds))
+            conn.execute(
+                "UPDATE inquiries SET status = 'done', leased_until = NULL WHERE id = ?",
+                (item["id"],))
+            conn.execute("COMMIT")
+
+    def fail(self, item, error, started_at, max_attempts=3):
+        """
+        Requeues a failed inquiry, or marks it failed after max_attempts.
+        """
+        finished_at = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if item["attempts"] >= max_attempts:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (inquiry_id, output, error, "
+                    "queue_wait_seconds, run_seconds, started_at, finished_at) "
+                    "VALUES (?, NULL, ?, ?, ?, ?, ?)",
+                    (item["id"], error, started_at - item["enqueued_at"],
+                     finished_at - started_at, started_at, finished_at))
+                conn.execute(
+                    "UPDATE inquiries SET status = 'failed', leased_until = NULL WHERE id = ?",
+                    (item["id"],))
+            else:
+                conn.execute(
+                    "UPDATE inquiries SET status = 'queued', leased_until = NULL WHERE id = ?",
+                    (item["id"],))
+            conn.execute("COMMIT")
+
+    def counts(self):
+        """
+        Returns {status: count}.
+        """
+        with closing(self._connect()) as conn:
+            return dict(conn.execute(
+                "SELECT status, COUNT(*) FROM inquiries GROUP BY status").fetchall())
+
+    def timings(self):
+        """
+        Returns (done, mean queue wait, mean run seconds, answered from
+        cache) over all results.
+        """
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COUNT(*), AVG(queue_wait_seconds), AVG(run_seconds), "
+                "COALESCE(SUM(path = 'cache'), 0) "
+                "FROM results WHERE error IS NULL").fetchone()
+
+    def gate_stats(self):
+        """
+        Returns (passed by the QA gate, escalated to QA, mean QA review
+        seconds) over all results.
+        """
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COALESCE(SUM(path = 'gate'), 0), COALESCE(SUM(path = 'qa'), 0), "
+                "AVG(CASE WHEN path = 'qa' THEN qa_seconds END) "
+                "FROM results WHERE error IS NULL").fetchone()
+
+    def results(self, limit=10):
+        """
+        Returns the most recent results, newest first.
+        """
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT i.id, i.customer, i.person, i.status, r.run_seconds, "
+                "r.queue_wait_seconds, r.path, r.output, r.error FROM results r "
+                "JOIN inquiries i ON i.id = r.inquiry_id "
+                "ORDER BY r.finished_at DESC LIMIT ?", (limit,)).fetchall()
@@ -0,0 +1,100 @@
+# pylint: disable=C0114
+import hashlib
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LocalHTTPServer:
+    """
+    A tiny local stand-in for a docs website, for exercising the scrape cache
+    without the network.
+
+    pages maps a path (e.g. "/docs") to its HTML. Responses carry an ETag and
+    a Last-Modified header and honour If-None-Match with a 304. Each path's
+    request count is kept in `requests`, and `delay` slows every response
+    down so concurrent callers overlap.
+
+    Usage:
+        with LocalHTTPServer({"/docs": "<p>hi</p>"}) as server:
+            requests.get(server.url("/docs"))
+    """
+
+    def __init__(self, pages, delay=0.0, max_age=None):
+        self.pages = dict(pages)
+        self.delay = delay
+        self.max_age = max_age
+        self.requests = {}
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._modified = {path: time.time() for path in self.pages}
+        self._server = None
+        self._thread = None
+
+    def set_page(self, path, html):
+        """
+        Changes a page, which also changes its ETag and Last-Modified.
+        """
+        self.pages[path] = html
+        self._modified[path] = time.time()
+
+    def url(self, path):
+        """
+        Returns the absolute URL of path on this server.
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def _make_handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # pylint: disable=invalid-name
+            def do_GET(self):
+                with stand_in._lock:  # pylint: disable=protected-access
+                    stand_in.requests[self.path] = stand_in.requests.get(self.path, 0) + 1
+                if stand_in.delay:
+                    time.sleep(stand_in.delay)
+
+                html = stand_in.pages.get(self.path)
+                if html is None:
+                    self.send_error(404)
+                    return
+                body = html.encode("utf-8")
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+                if self.headers.get("If-None-Match") == etag:
+                    with stand_in._lock:  # pylint: disable=protected-access
+                        stand_in.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", formatdate(
+                    stand_in._modified[self.path], usegmt=True))  # pylint: disable=protected-access
+                if stand_in.max_age is not None:
+                    self.send_header("Cache-Control", f"max-age={stand_in.max_age}")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):  # keep test output quiet
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
@@ -0,0 +1,119 @@
+# pylint: disable=C0114
+import re
+
+MIN_WORDS = 80
+MAX_WORDS = 900
+MIN_TERM_COVERAGE = 0.6
+
+_URL = re.compile(r"https?://\S+|\bdocs\.crewai\.com\S*")
+_REFERENCE = re.compile(r"^\s*(?:#+\s*)?(?:references?|sources?)\b", re.IGNORECASE | re.MULTILINE)
+_ARTIFACTS = re.compile(
+    r"\b(?:Thought|Action|Action Input|Observation|Final Answer)\s*:|\bas an ai\b|"
+    r"\[(?:insert|placeholder|todo)[^\]]*\]|\bTODO\b", re.IGNORECASE)
+_UNSURE = re.compile(
+    r"\bI(?:'m| am) not sure\b|\bI (?:don't|do not) know\b|\bI can(?:not|'t) help\b|"
+    r"\bunable to (?:find|access)\b", re.IGNORECASE)
+_RUDE = re.compile(r"\b(?:obviously|just read the docs|as I already said|RTFM)\b", re.IGNORECASE)
+_WORD = re.compile(r"[a-z0-9_]+")
+_STOPWORDS = frozenset(
+    "a about an and any are as at be but by can could do does for from get got "
+    "have hello help hey hi how i if in into is it its just me my need of on "
+    "or our please provide so some specifically that the their them then there "
+    "these this to us want was we what when where which who why will with would "
+    "you your guidance".split())
+
+
+def _stem(word):
+    if len(word) > 5 and word.endswith("ing"):
+        word = word[:-3]
+        # setting -> set, running -> run
+        if word[-1] == word[-2] and word[-1] not in "aeiousl":
+            word = word[:-1]
+        return word
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def key_terms(inquiry):
+    """
+    Content words of the inquiry, stemmed and in order of appearance.
+    """
+    terms = []
+    for word in _WORD.findall(inquiry.lower()):
+        term = _stem(word)
+        if word not in _STOPWORDS and len(term) > 2 and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def check_draft(draft, inquiry, person=None, min_words=MIN_WORDS, max_words=MAX_WORDS,
+                min_coverage=MIN_TERM_COVERAGE):
+    """
+    Cheap local checks for a support draft. Returns a list of problems; an
+    empty list means the draft can skip the QA agent.
+    """
+    problems = []
+    text = draft or ""
+    words = len(text.split())
+    if words < min_words:
+        problems.append(f"only {words} words, expected at least {min_words}")
+    elif words > max_words:
+        problems.append(f"{words} words, expected at most {max_words}")
+
+    if not _URL.search(text) and not _REFERENCE.search(text):
+        problems.append("no references or documentation links")
+
+    terms = key_terms(inquiry)
+    if terms:
+        present = {_stem(w) for w in _WORD.findall(text.lower())}
+        missing = [t for t in terms if t not in present]
+        coverage = 1 - len(missing) / len(terms)
+        if coverage < min_coverage:
+            problems.append(f"covers {coverage:.0%} of the inquiry's key terms "
+                            f"(missing: {', '.join(missing[:6])})")
+
+    if _ARTIFACTS.search(text):
+        problems.append("contains agent/placeholder artifacts")
+    if _UNSURE.search(text):
+        problems.append("hedges instead of answering")
+    if _RUDE.search(text):
+        problems.append("dismissive tone")
+    letters = [c for c in text if c.isalpha()]
+    if letters and sum(c.isupper() for c in letters) / len(letters) > 0.3:
+        problems.append("too much text in capitals")
+    if text.count("!") > max(3, words // 40):
+        problems.append("too many exclamation marks")
+    first_name = person.split()[0] if person and person.strip() else None
+    if first_name and first_name.lower() not in text[:400].lower():
+        problems.append(f"does not address {first_name}")
+    return problems
+
+
+class GateDecision:
+    """
+    Which path one inquiry took through the QA gate and what each step cost.
+
+    path is "gate" when the draft passed the local checks and was sent as
+    is, or "qa" when it was escalated to the QA agent.
+    """
+
+    def __init__(self, output, path, problems, draft_seconds, qa_seconds=None):
+        self.output = output
+        self.path = path
+        self.problems = problems
+        self.draft_seconds = draft_seconds
+        self.qa_seconds = qa_seconds
+
+    def print(self):
+        """
+        Prints a short summary.
+        """
+        if self.path == "gate":
+            print(f"🛂 QA gate: draft passed local checks, QA review skipped "
+                  f"(draft took {self.draft_seconds:.1f}s)")
+            return
+        print(f"🛂 QA gate: escalated to the QA agent "
+              f"(draft {self.draft_seconds:.1f}s, QA review {self.qa_seconds:.1f}s)")
+        for problem in self.problems:
+            print(f"   - {problem}")
@@ -0,0 +1,256 @@
+# pylint: disable=C0114
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import struct
+import threading
+import time
+from contextlib import closing
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_STOPWORDS = frozenset(
+    "a an and any are as at be but by can could do does for from hello help hey "
+    "hi how i if in into is it its me my of on or our please so some that the "
+    "their them then there these this to us was we what when where which who "
+    "why will with would you your".split())
+
+# Placeholders stored in cached answers instead of the original names
+_CUSTOMER = "⟦customer⟧"
+_PERSON = "⟦person⟧"
+_FIRST_NAME = "⟦first_name⟧"
+
+
+def normalize(text):
+    """
+    Lowercases, strips punctuation and filler words, and folds plurals so
+    that trivially different phrasings of a question look the same.
+    """
+    words = []
+    for word in re.findall(r"[a-z0-9_]+", text.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+def shingles(text):
+    """
+    Word unigrams and bigrams of the normalised text.
+    """
+    words = normalize(text)
+    grams = set(words)
+    grams.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return grams
+
+
+class MinHasher:
+    """
+    MinHash signatures with num_perm universal hash functions (a*x + b mod p).
+    """
+
+    def __init__(self, num_perm=128, seed=1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                        for _ in range(num_perm)]
+
+    def signature(self, grams):
+        """
+        Returns the signature as a tuple of num_perm ints.
+        """
+        if not grams:
+            return tuple([_MERSENNE_PRIME] * self.num_perm)
+        hashes = [int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "big")
+                  for g in grams]
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+                     for a, b in self._params)
+
+
+def depersonalize(answer, customer, person):
+    """
+    Replaces the customer's and person's names with placeholders.
+    """
+    first_name = person.split()[0] if person.strip() else ""
+    for value, placeholder in ((person, _PERSON), (customer, _CUSTOMER), (first_name, _FIRST_NAME)):
+        if value and len(value) > 1:
+            answer = re.sub(rf"\b{re.escape(value)}\b", placeholder, answer)
+    return answer
+
+
+def personalize(template, customer, person):
+    """
+    Fills the placeholders of a cached answer for a new customer and person.
+    """
+    first_name = person.split()[0] if person.strip() else person
+    return (template.replace(_PERSON, person)
+            .replace(_CUSTOMER, customer)
+            .replace(_FIRST_NAME, first_name))
+
+
+class ResponseCache:
+    """
+    Near-duplicate cache of QA-approved support answers.
+
+    Inquiries are compared by MinHash over word shingles; LSH banding
+    (bands x rows = num_perm) finds candidates in sqlite without scanning
+    every entry, and a candidate is a hit when its estimated Jaccard
+    similarity is at least threshold. Answers are stored with the customer
+    and person names replaced by placeholders and re-personalised on a hit.
+    Beyond max_entries the least recently used entries are evicted, and
+    entries older than ttl_seconds are ignored.
+    """
+
+    def __init__(self, path=".cache/responses.sqlite", threshold=0.8, num_perm=128,
+                 bands=32, max_entries=10000, ttl_seconds=30 * 24 * 3600):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hasher = MinHasher(num_perm)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    inquiry TEXT NOT NULL,
+                    signature BLOB NOT NULL,
+                    answer TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_hit REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )""")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bands (
+                    band INTEGER NOT NULL,
+                    bucket TEXT NOT NULL,
+                    response_id INTEGER NOT NULL REFERENCES responses (id) ON DELETE CASCADE
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS bands_lookup ON bands (band, bucket)")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_hit ON responses (last_hit)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )""")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _buckets(self, signature):
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            yield band, hashlib.blake2b(repr(rows).encode(), digest_size=8).hexdigest()
+
+    @staticmethod
+    def _pack(signature):
+        return struct.pack(f"<{len(signature)}Q", *signature)
+
+    @staticmethod
+    def _unpack(blob):
+        return struct.unpack(f"<{len(blob) // 8}Q", blob)
+
+    def _bump(self, conn, name):
+        conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+    def lookup(self, inquiry, customer, person):
+        """
+        Returns (answer, similarity) for the best cached near-duplicate, or
+        (None, best similarity seen) on a miss.
+        """
+        signature = self.hasher.signature(shingles(inquiry))
+        now = time.time()
+        best_id, best_similarity, best_answer = None, 0.0, None
+        with self._lock, closing(self._connect()) as conn, conn:
+            candidates = set()
+            for band, bucket in self._buckets(signature):
+                candidates.update(r[0] for r in conn.execute(
+                    "SELECT response_id FROM bands WHERE band = ? AND bucket = ?",
+                    (band, bucket)))
+            for response_id in candidates:
+                row = conn.execute(
+                    "SELECT signature, answer, created_at FROM responses WHERE id = ?",
+                    (response_id,)).fetchone()
+                if row is None or now - row[2] > self.ttl_seconds:
+                    continue
+                other = self._unpack(row[0])
+                similarity = sum(x == y for x, y in zip(signature, other)) / len(signature)
+                if similarity > best_similarity:
+                    best_id, best_similarity, best_answer = response_id, similarity, row[1]
+
+            if best_id is None or best_similarity < self.threshold:
+                self.misses += 1
+                self._bump(conn, "misses")
+                return None, best_similarity
+
+            conn.execute(
+                "UPDATE responses SET last_hit = ?, hit_count = hit_count + 1 WHERE id = ?",
+                (now, best_id))
+            self.hits += 1
+            self._bump(conn, "hits")
+        return personalize(best_answer, customer, person), best_similarity
+
+    def store(self, inquiry, customer, person, answer):
+        """
+        Caches a QA-approved answer, then evicts beyond max_entries.
+        """
+        signature = self.hasher.signature(shingles(inquiry))
+        template = depersonalize(answer, customer, person)
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO responses (inquiry, signature, answer, created_at, last_hit) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (inquiry, self._pack(signature), template, now, now))
+            conn.executemany(
+                "INSERT INTO bands (band, bucket, response_id) VALUES (?, ?, ?)",
+                [(band, bucket, cursor.lastrowid) for band, bucket in self._buckets(signature)])
+            conn.execute(
+                "DELETE FROM responses WHERE created_at < ? OR id IN ("
+                "SELECT id FROM responses ORDER BY last_hit DESC LIMIT -1 OFFSET ?)",
+                (now - self.ttl_seconds, self.max_entries))
+
+    def stats(self):
+        """
+        Returns this process's and the lifetime hit/miss counts and ratios.
+        """
+        with closing(self._connect()) as conn:
+            lifetime = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+            entries = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        lifetime_lookups = lifetime.get("hits", 0) + lifetime.get("misses", 0)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "lifetime_hits": lifetime.get("hits", 0),
+            "lifetime_misses": lifetime.get("misses", 0),
+            "lifetime_hit_ratio": lifetime.get("hits", 0) / lifetime_lookups if lifetime_lookups else 0.0,
+            "entries": entries,
+            "threshold": self.threshold,
+        }
+
+    def report(self):
+        """
+        Prints the hit ratio and settings.
+        """
+        s = self.stats()
+        print(f"♻️  Response cache: {s['hits']} hits / {s['misses']} misses "
+              f"({s['hit_ratio']:.0%}) this run, lifetime {s['lifetime_hit_ratio']:.0%} "
+              f"of {s['lifetime_hits'] + s['lifetime_misses']} lookups; "
+              f"{s['entries']} entries, threshold {s['threshold']:.2f}")
@@ -0,0 +1,141 @@
+# pylint: disable=C0114
+import os
+import sys
+import threading
+import time
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+_active_writer = None
+_subscribed = False
+
+
+def _subscribe_to_stream_chunks():
+    """
+    Registers a single CrewAI event-bus handler that forwards LLM stream
+    chunks to whichever StreamingMarkdownWriter is currently open.
+    """
+    global _subscribed  # pylint: disable=global-statement
+    if _subscribed:
+        return
+    try:
+        from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+    except ImportError:  # older CrewAI releases
+        from crewai.utilities.events import crewai_event_bus, LLMStreamChunkEvent
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def _on_chunk(_source, event):
+        writer = _active_writer
+        if writer is not None:
+            writer.on_chunk(event.chunk)
+
+    _subscribed = True
+
+
+class StreamingMarkdownWriter:
+    """
+    Writes the final task's tokens to stdout and appends them to a Markdown
+    file as they are produced, so the file can be followed while the answer
+    is written. Each run streams into its own run directory, so nothing
+    else writes to the file; only the manifest is written atomically.
+
+    Only the final agent's LLM should be created with stream=True so that
+    every chunk received here belongs to the last task. The agent's
+    "Thought: ..." preamble is held back until the "Final Answer:" marker
+    shows up, so the file only ever contains the answer itself.
+    """
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.kickoff_time = None
+        self.final_task_start_time = None
+        self.first_token_time = None
+        self.chars_written = 0
+        self._file = None
+        self._buffer = ""
+        self._in_answer = False
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        global _active_writer  # pylint: disable=global-statement
+        _subscribe_to_stream_chunks()
+        os.makedirs(os.path.dirname(self.output_file) or ".", exist_ok=True)
+        self._file = open(self.output_file, "w", encoding="utf-8")
+        self.kickoff_time = time.perf_counter()
+        _active_writer = self
+        return self
+
+    def __exit__(self, *exc):
+        global _active_writer  # pylint: disable=global-statement
+        _active_writer = None
+        self._file.close()
+        return False
+
+    def mark_final_task_started(self, _previous_output=None):
+        """
+        Task callback for the task *before* the streamed one.
+        """
+        self.final_task_start_time = time.perf_counter()
+
+    def on_chunk(self, chunk):
+        """
+        Handles one streamed chunk of text.
+        """
+        if not chunk:
+            return
+        with self._lock:
+            if not self._in_answer:
+                self._buffer += chunk
+                idx = self._buffer.find(FINAL_ANSWER_MARKER)
+                if idx == -1:
+                    return
+                chunk = self._buffer[idx + len(FINAL_ANSWER_MARKER):].lstrip()
+                self._buffer = ""
+                self._in_answer = True
+                if not chunk:
+                    return
+            self._emit(chunk)
+
+    def finish(self, final_text):
+        """
+        Falls back to the complete answer if nothing was streamed, e.g. when
+        the backend ignored stream=True or the model skipped the marker.
+        """
+        with self._lock:
+            if self.chars_written == 0 and final_text:
+                self._emit(final_text)
+
+    def _emit(self, text):
+        if self.first_token_time is None:
+            self.first_token_time = time.perf_counter()
+        sys.stdout.write(text)
+        sys.stdout.flush()
+        self._file.write(text)
+        self._file.flush()
+        self.chars_written += len(text)
+
+    def time_to_first_token(self):
+        """
+        Returns (seconds since kickoff, seconds since the final task started);
+        either value is None when it could not be measured.
+        """
+        if self.first_token_time is None:
+            return None, None
+        since_kickoff = self.first_token_time - self.kickoff_time
+        since_task = None
+        if self.final_task_start_time is not None:
+            since_task = self.first_token_time - self.final_task_start_time
+        return since_kickoff, since_task
+
+    def report(self):
+        """
+        Prints time-to-first-token for the streamed task.
+        """
+        since_kickoff, since_task = self.time_to_first_token()
+        if since_kickoff is None:
+            print("⏱️  No tokens were streamed.")
+            return
+        print(f"⏱️  Time to first token: {since_kickoff:.2f}s after kickoff", end="")
+        if since_task is not None:
+            print(f", {since_task:.2f}s after the final task started", end="")
+        print(f" ({self.chars_written} chars streamed)")
@@ -0,0 +1,444 @@
+# pylint: disable=C0114
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+
+import numpy as np
+
+_WORD = re.compile(r"[a-z0-9_]+")
+_local = threading.local()
+
+# Namespace of memories saved or recalled outside customer_scope()
+DEFAULT_SCOPE = "default"
+
+
+@contextmanager
+def customer_scope(customer):
+    """
+    Saves and recalls this thread's crew memories inside the block in the
+    namespace of customer only.
+    """
+    previous = getattr(_local, "scope", None)
+    _local.scope = str(customer or DEFAULT_SCOPE)
+    try:
+        yield
+    finally:
+        _local.scope = previous
+
+
+def current_scope():
+    """
+    The customer namespace set by customer_scope(), else DEFAULT_SCOPE.
+    """
+    return getattr(_local, "scope", None) or DEFAULT_SCOPE
+
+
+def _scope_dir(scope):
+    slug = re.sub(r"[^a-z0-9]+", "-", scope.lower()).strip("-")[:40] or "scope"
+    return f"{slug}-{hashlib.blake2b(scope.encode('utf-8'), digest_size=4).hexdigest()}"
+
+
+def hashing_embedder(dim=384):
+    """
+    Returns an embed(texts) -> float32 array function that hashes word
+    unigrams and bigrams into dim signed buckets. Deterministic and
+    dependency-free, for tests and benchmarks; use a real embedding model
+    (e.g. docs_index.ollama_embedder) for production recall.
+    """
+    def _bucket(gram):
+        digest = hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % dim, 1.0 if value >> 63 else -1.0
+
+    def embed(texts):
+        vectors = np.zeros((len(texts), dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD.findall(text.lower())
+            for gram in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                bucket, sign = _bucket(gram)
+                vectors[row, bucket] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+    return embed
+
+
+class VectorStore:
+    """
+    Append-only store of unit-norm vectors with their text and metadata.
+
+    Vectors live in a preallocated .npy file that is memory-mapped, so only
+    the pages a search touches are resident; capacity doubles when full.
+    dtype is "float16" (2 bytes per dimension) or "int8" (1 byte per
+    dimension plus a float32 scale per row). Text and metadata are kept in
+    sqlite, whose row count is the number of committed vectors: a vector is
+    written and flushed before its row is inserted, so a crash can leave at
+    most an unused slot. Safe to share between threads of one process.
+    """
+
+    def __init__(self, directory, dim, dtype="float16", initial_capacity=1024):
+        if dtype not in ("float16", "int8"):
+            raise ValueError("dtype must be 'float16' or 'int8'")
+        self.directory = directory
+        self.dim = dim
+        self.dtype = dtype
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._db = os.path.join(directory, "records.sqlite")
+        self._vectors_path = os.path.join(directory, "vectors.npy")
+        self._scales_path = os.path.join(directory, "scales.npy")
+
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if (meta["dim"], meta["dtype"]) != (dim, dtype):
+                raise ValueError(f"{directory} holds {meta['dtype']} vectors of dim "
+                                 f"{meta['dim']}, not {dtype} of dim {dim}")
+        else:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"dim": dim, "dtype": dtype}, f)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    id INTEGER PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )""")
+            self._count = conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+        if os.path.exists(self._vectors_path):
+            self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+            self._scales = np.load(self._scales_path, mmap_mode="r+") \
+                if dtype == "int8" else None
+        else:
+            self._allocate(max(initial_capacity, 1))
+
+    def _connect(self):
+        conn = sqlite3.connect(self._db, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _allocate(self, capacity):
+        """
+        Creates (or grows to) capacity rows, copying committed vectors.
+        """
+        paths = [self._vectors_path] + ([self._scales_path] if self.dtype == "int8" else [])
+        old = [getattr(self, "_vectors", None), getattr(self, "_scales", None)]
+        for path, dtype, shape, previous in zip(
+                paths, (self.dtype, np.float32), ((capacity, self.dim), (capacity,)), old):
+            array = np.lib.format.open_memmap(path + ".tmp", mode="w+", dtype=dtype, shape=shape)
+            if previous is not None:
+                array[:self._count] = previous[:self._count]
+            array.flush()
+            del array
+        # Drop the old mappings before swapping the files in
+        self._vectors = self._scales = None
+        del old
+        for path in paths:
+            os.replace(path + ".tmp", path)
+        self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+        if self.dtype == "int8":
+            self._scales = np.load(self._scales_path, mmap_mode="r+")
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def capacity(self):
+        """
+        Number of rows allocated on disk.
+        """
+        with self._lock:
+            return self._vectors.shape[0]
+
+    def nbytes(self):
+        """
+        Bytes used by the committed vectors (and int8 scales).
+        """
+        with self._lock:
+            itemsize, count = self._vectors.itemsize, self._count
+        return count * (self.dim * itemsize + (4 if self.dtype == "int8" else 0))
+
+    def add(self, vectors, texts, metadatas=None):
+        """
+        Appends a batch of unit-norm vectors with their texts and returns
+        their ids.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        metadatas = metadatas or [{}] * len(texts)
+        if not len(vectors) == len(texts) == len(metadatas):
+            raise ValueError("vectors, texts and metadatas must have the same length")
+        now = time.time()
+        with self._lock:
+            start, end = self._count, self._count + len(vectors)
+            if end > self._vectors.shape[0]:
+                capacity = self._vectors.shape[0]
+                while capacity < end:
+                    capacity *= 2
+                self._allocate(capacity)
+            if self.dtype == "int8":
+                scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127.0
+                self._vectors[start:end] = np.round(vectors / scales[:, None]).astype(np.int8)
+                self._scales[start:end] = scales
+                self._scales.flush()
+            else:
+                self._vectors[start:end] = vectors.astype(np.float16)
+            self._vectors.flush()
+            with closing(self._connect()) as conn, conn:
+                conn.executemany(
+                    "INSERT INTO records (id, text, metadata, created_at) VALUES (?, ?, ?, ?)",
+                    [(start + i, text, json.dumps(metadata, default=str), now)
+                     for i, (text, metadata) in enumerate(zip(texts, metadatas))])
+            self._count = end
+        return list(range(start, end))
+
+    def search(self, queries, top_k=3, block_rows=65536):
+        """
+        Batched cosine search. queries is a (q, dim) array of unit-norm
+        vectors; returns, per query, [(score, id)] best first. The store is
+        scanned in blocks of block_rows so memory stays bounded.
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        # One consistent snapshot: a concurrent add may swap in grown arrays,
+        # but the rows below count are already committed in these ones
+        with self._lock:
+            vectors, scales, count = self._vectors, self._scales, self._count
+        if count == 0 or top_k <= 0:
+            return [[] for _ in queries]
+        top_k = min(top_k, count)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, count, block_rows):
+            end = min(start + block_rows, count)
+            block = np.asarray(vectors[start:end], dtype=np.float32)
+            scores = queries @ block.T
+            if self.dtype == "int8":
+                scores *= np.asarray(scales[start:end])[None, :]
+            k = min(top_k, end - start)
+            idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.concatenate(
+                [best_scores, np.take_along_axis(scores, idx, axis=1)], axis=1)
+            best_ids = np.concatenate([best_ids, idx + start], axis=1)
+            if best_scores.shape[1] > top_k:
+                keep = np.argpartition(-best_scores, top_k - 1, axis=1)[:, :top_k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_ids = np.take_along_axis(best_ids, keep, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        return [[(float(best_scores[q, i]), int(best_ids[q, i])) for i in order[q]]
+                for q in range(len(queries))]
+
+    def records(self, ids):
+        """
+        Returns {id: (text, metadata, created_at)}.
+        """
+        if not ids:
+            return {}
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT id, text, metadata, created_at FROM records "
+                f"WHERE id IN ({','.join('?' * len(ids))})", list(ids)).fetchall()
+        return {row[0]: (row[1], json.loads(row[2]), row[3]) for row in rows}
+
+    def reset(self):
+        """
+        Deletes every vector and record.
+        """
+        with self._lock:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM records")
+            self._count = 0
+
+
+class ScopedVectorStore:
+    """
+    One VectorStore per customer namespace under directory, opened on first
+    use. Every call goes to the store of current_scope(), so pooled crews
+    serving different customers never recall each other's memories.
+    """
+
+    def __init__(self, directory, dim, dtype="float16"):
+        self.directory = directory
+        self.dim = dim
+        self.dtype = dtype
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    def store(self, scope=None):
+        """
+        The VectorStore of scope (default: the current one).
+        """
+        scope = scope or current_scope()
+        with self._lock:
+            if scope not in self._stores:
+                self._stores[scope] = VectorStore(
+                    os.path.join(self.directory, _scope_dir(scope)), self.dim, self.dtype)
+            return self._stores[scope]
+
+    def __len__(self):
+        return len(self.store())
+
+    def add(self, vectors, texts, metadatas=None):
+        """
+        Appends to the current scope's store.
+        """
+        return self.store().add(vectors, texts, metadatas)
+
+    def search(self, queries, top_k=3, block_rows=65536):
+        """
+        Searches the current scope's store only.
+        """
+        return self.store().search(queries, top_k, block_rows)
+
+    def records(self, ids):
+        """
+        Records of the current scope's store.
+        """
+        return self.store().records(ids)
+
+    def reset(self):
+        """
+        Forgets the current scope's memories.
+        """
+        self.store().reset()
+
+    def totals(self):
+        """
+        (scopes opened by this process, memories across them).
+        """
+        with self._lock:
+            stores = list(self._stores.values())
+        return len(stores), sum(len(store) for store in stores)
+
+
+class VectorRAGStorage:
+    """
+    CrewAI short-term / entity memory storage backed by a VectorStore.
+
+    Implements the save/search/reset interface CrewAI's memories call on
+    their storage, so it can replace the default Chroma-based RAGStorage.
+    """
+
+    def __init__(self, store, embed):
+        self.store = store
+        self.embed = embed
+
+    def save(self, value, metadata=None, **_):
+        """
+        Embeds and stores one memory.
+        """
+        self.store.add(self.embed([str(value)]), [str(value)], [metadata or {}])
+
+    def search(self, query, limit=3, score_threshold=0.35, **_):
+        """
+        Returns up to limit memories with cosine similarity of at least
+        score_threshold, best first.
+        """
+        hits = [(score, i) for score, i in self.store.search(self.embed([query]), limit)[0]
+                if score >= score_threshold]
+        records = self.store.records([i for _, i in hits])
+        return [{"id": str(i), "context": records[i][0], "memory": records[i][0],
+                 "metadata": records[i][1], "score": score}
+                for score, i in hits if i in records]
+
+    def reset(self):
+        """
+        Forgets everything.
+        """
+        self.store.reset()
+
+
+class VectorLTMStorage:
+    """
+    CrewAI long-term memory storage backed by a VectorStore.
+
+    CrewAI's default long-term storage only returns evaluations of a task
+    with the exact same description. Here descriptions are embedded, so a
+    returning customer's similar inquiry recalls the suggestions recorded
+    for earlier resolutions.
+    """
+
+    def __init__(self, store, embed, score_threshold=0.6):
+        self.store = store
+        self.embed = embed
+        self.score_threshold = score_threshold
+
+    def save(self, task_description, metadata, datetime, score):
+        """
+        Stores one task evaluation.
+        """
+        self.store.add(self.embed([task_description]), [task_description],
+                       [{"metadata": metadata, "datetime": datetime, "score": score}])
+
+    def load(self, task_description, latest_n=3):
+        """
+        Returns the latest_n most similar past evaluations in the shape
+        CrewAI expects, or None when there are none.
+        """
+        hits = [(score, i) for score, i in
+                self.store.search(self.embed([task_description]), latest_n)[0]
+                if score >= self.score_threshold]
+        records = self.store.records([i for _, i in hits])
+        results = [{"metadata": records[i][1]["metadata"],
+                    "datetime": records[i][1]["datetime"],
+                    "score": records[i][1]["score"]}
+                   for _, i in hits if i in records]
+        return results or None
+
+    def reset(self):
+        """
+        Forgets everything.
+        """
+        self.store.reset()
+
+
+class VectorMemory:
+    """
+    Offline crew memory: short-term, entity and long-term stores under
+    directory, sharing one embed function, each split per customer
+    (ScopedVectorStore). Run every kickoff inside customer_scope(customer)
+    so a customer only recalls their own memories.
+
+    Build it once per process and call crew_memories() for every Crew, so
+    pooled crews share the stores.
+    """
+
+    def __init__(self, directory=".cache/memory", embed=None, dim=None, dtype="float16"):
+        self.embed = embed or hashing_embedder()
+        dim = dim or self.embed(["dimension probe"]).shape[1]
+        self.short_term = VectorRAGStorage(
+            ScopedVectorStore(os.path.join(directory, "short_term"), dim, dtype), self.embed)
+        self.entities = VectorRAGStorage(
+            ScopedVectorStore(os.path.join(directory, "entities"), dim, dtype), self.embed)
+        self.long_term = VectorLTMStorage(
+            ScopedVectorStore(os.path.join(directory, "long_term"), dim, dtype), self.embed)
+
+    def crew_memories(self):
+        """
+        Returns Crew keyword arguments that plug these stores into CrewAI's
+        short-term, long-term and entity memory.
+        """
+        from crewai.memory import EntityMemory, LongTermMemory, ShortTermMemory
+        return {
+            "memory": True,
+            "short_term_memory": ShortTermMemory(storage=self.short_term),
+            "long_term_memory": LongTermMemory(storage=self.long_term),
+            "entity_memory": EntityMemory(storage=self.entities),
+        }
+
+    def report(self):
+        """
+        Prints how many memories each store holds across the customers
+        served by this process.
+        """
+        customers, short_term = self.short_term.store.totals()
+        _, entities = self.entities.store.totals()
+        _, long_term = self.long_term.store.totals()
+        print(f"🧠 Memory: {short_term} short-term, {entities} entity, {long_term} long-term "
+              f"across {customers} customers")
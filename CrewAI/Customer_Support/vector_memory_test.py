@@ -0,0 +1,103 @@
+import tempfile
+import os
+import threading
+import time
+import numpy as np
+from utils.vector_memory import VectorMemory, VectorStore, customer_scope, hashing_embedder
+
+# Checks that crew memories stay with the customer they were saved for:
+# short-term, entity and long-term recall inside one customer's scope never
+# returns another customer's memories, also when pooled crews serve two
+# customers at once. No network access or CrewAI run needed.
+
+INQUIRY = "How can I add memory to my crew and kick it off?"
+
+
+def recall(memory, query):
+    """Texts recalled by every store for query in the current scope."""
+    texts = [hit["context"] for hit in memory.short_term.search(query, limit=5, score_threshold=0)]
+    texts += [hit["context"] for hit in memory.entities.search(query, limit=5, score_threshold=0)]
+    return texts, memory.long_term.load(query) or []
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = VectorMemory(tmp, hashing_embedder())
+
+        with customer_scope("DeepLearningAI"):
+            memory.short_term.save(f"DeepLearningAI asked: {INQUIRY} Account id DLAI-42.")
+            memory.entities.save("Andrew Ng (person): contact at DeepLearningAI")
+            memory.long_term.save(INQUIRY, {"suggestions": ["link the memory docs"]},
+                                  "2024-01-01", 9)
+
+        with customer_scope("Acme Corp"):
+            texts, evaluations = recall(memory, INQUIRY)
+            assert not texts, f"Acme recalled another customer's memories: {texts}"
+            assert not evaluations, "Acme recalled another customer's task evaluations"
+            memory.short_term.save(f"Acme Corp asked: {INQUIRY} Account id ACME-7.")
+
+        with customer_scope("DeepLearningAI"):
+            texts, evaluations = recall(memory, INQUIRY)
+            assert any("DLAI-42" in text for text in texts), "returning customer recalls"
+            assert not any("ACME-7" in text for text in texts), texts
+            assert evaluations and evaluations[0]["score"] == 9
+
+        # Memories saved outside a scope are not recalled inside one
+        memory.short_term.save(f"Unscoped note about {INQUIRY}")
+        with customer_scope("Acme Corp"):
+            texts, _ = recall(memory, INQUIRY)
+            assert all("ACME-7" in text for text in texts), texts
+
+        # Two pooled crews serving different customers at the same time
+        leaks = []
+
+        def serve(customer):
+            with customer_scope(customer):
+                for i in range(50):
+                    memory.short_term.save(f"{customer} follow-up {i}: {INQUIRY}")
+                    texts, _ = recall(memory, INQUIRY)
+                    leaks.extend(t for t in texts if customer not in t)
+
+        threads = [threading.Thread(target=serve, args=(customer,))
+                   for customer in ("Globex", "Initech")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not leaks, f"concurrent customers recalled each other: {leaks[:3]}"
+
+        # Searches racing adds that grow the store's arrays
+        store = VectorStore(os.path.join(tmp, "growing"), dim=8, dtype="int8",
+                            initial_capacity=1)
+        errors, done = [], threading.Event()
+
+        def search():
+            while not done.is_set():
+                try:
+                    store.search(np.eye(8, dtype=np.float32)[:1], top_k=3)
+                    store.capacity, store.nbytes()
+                except Exception as exc:  # pylint: disable=broad-except
+                    errors.append(exc)
+
+        searcher = threading.Thread(target=search)
+        searcher.start()
+        for i in range(2000):
+            store.add(np.eye(8, dtype=np.float32)[i % 8], [f"row {i}"])
+        done.set()
+        searcher.join()
+        assert not errors, f"search during a resize failed: {errors[:3]}"
+        assert len(store) == 2000 and store.capacity == 2048
+
+        reopened = VectorMemory(tmp, hashing_embedder())
+        with customer_scope("Acme Corp"):
+            texts, _ = recall(reopened, INQUIRY)
+            assert texts and all("ACME-7" in text for text in texts), "scopes persist on disk"
+
+        memory.report()
+        print("✅ crew memory is kept apart per customer")
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    main()
+    print(f"done in {time.perf_counter() - start:.2f}s")
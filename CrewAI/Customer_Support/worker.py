@@ -0,0 +1,196 @@
+"""Long-running Customer_Support worker that drains a durable inquiry queue.
+
+Inquiries (customer, person, inquiry) are spooled into a local sqlite queue
+and processed by N pre-built crews running concurrently. A worker thread
+only claims an inquiry when it has a free crew, so the queue on disk
+absorbs bursts (backpressure) instead of memory. Every inquiry is acked
+only after its output has been written to the results store, and leases
+of in-flight items expire, so a crash never loses queued work.
+Near-duplicates of earlier inquiries are answered from the response cache
+without taking a crew, and drafts that pass the local QA gate skip the QA
+review; `status` reports how many reviews (and seconds) that saved.
+
+Usage:
+    python worker.py enqueue --customer DeepLearningAI --person "Andrew Ng" \
+        --inquiry "How can I add memory to my crew?"
+    python worker.py enqueue-jsonl inquiries.jsonl
+    python worker.py run --concurrency 2 [--drain] [--no-response-cache] [--no-qa-gate]
+        [--response-cache-size 10000]
+        [--memory-embedder ollama|hashing | --no-memory]
+    python worker.py status
+"""
+
+import argparse
+import os
+import signal
+import socket
+import threading
+import time
+from main import configure_environment, build_crew, build_memory, kickoff, resolve
+from utils.crew_pool import CrewPool
+from utils.inquiry_queue import InquiryQueue
+from utils.response_cache import ResponseCache
+from utils.scrape_cache import default_scrape_cache
+
+LEASE_SECONDS = 1800
+
+
+def process(queue, pool, item, response_cache=None, qa_gate=True):
+    """Answer one claimed inquiry (from the cache or a pooled crew) and ack it once stored."""
+    started_at = time.time()
+    inputs = {"customer": item["customer"], "person": item["person"],
+              "inquiry": item["inquiry"]}
+    decisions = []
+
+    def _kickoff(inputs):
+        with pool.crew() as crew:
+            decisions.append(kickoff(crew, inputs, qa_gate))
+        return decisions[-1]
+
+    try:
+        output_text, path = resolve(inputs, _kickoff, response_cache)
+    except Exception as exc:  # pylint: disable=broad-except
+        queue.fail(item, f"{type(exc).__name__}: {exc}", started_at)
+        print(f"❌ inquiry {item['id']} failed (attempt {item['attempts']}): {exc}")
+        return
+    qa_seconds = decisions[-1].qa_seconds if decisions else None
+    queue.complete(item, output_text, started_at, path, qa_seconds)
+    print(f"✅ inquiry {item['id']} for {item['customer']} done by {path} in "
+          f"{time.time() - started_at:.1f}s "
+          f"(waited {started_at - item['enqueued_at']:.1f}s in queue)")
+
+
+def run(queue, concurrency, drain, poll_seconds, docs_index, response_cache=None,
+        qa_gate=True, memory_embedder="ollama"):
+    """Drain the queue with `concurrency` crews until stopped (or empty with --drain)."""
+    configure_environment()
+    # One set of memory stores shared by every pooled crew
+    memory = build_memory(memory_embedder) if memory_embedder else None
+    pool = CrewPool(lambda: build_crew(docs_index=docs_index, memory=memory), concurrency)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    stop = threading.Event()
+    in_flight = set()
+    lock = threading.Lock()
+
+    def _stop(*_):
+        print("\n⏹️  Finishing in-flight inquiries, not claiming new ones...")
+        stop.set()
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    def _heartbeat():
+        while not stop.wait(LEASE_SECONDS / 3):
+            with lock:
+                ids = list(in_flight)
+            queue.extend_lease(ids, LEASE_SECONDS)
+
+    def _loop(slot):
+        while not stop.is_set():
+            item = queue.claim(f"{worker_id}/{slot}", LEASE_SECONDS)
+            if item is None:
+                if drain:
+                    return
+                stop.wait(poll_seconds)
+                continue
+            with lock:
+                in_flight.add(item["id"])
+            try:
+                process(queue, pool, item, response_cache, qa_gate)
+            finally:
+                with lock:
+                    in_flight.discard(item["id"])
+
+    start = time.perf_counter()
+    threading.Thread(target=_heartbeat, daemon=True).start()
+    threads = [threading.Thread(target=_loop, args=(slot,)) for slot in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        while thread.is_alive():
+            thread.join(0.5)
+    stop.set()
+
+    print(f"\nWorker stopped after {time.perf_counter() - start:.1f}s")
+    print_status(queue)
+    if response_cache:
+        response_cache.report()
+    if memory:
+        memory.report()
+    default_scrape_cache().report()
+
+
+def print_status(queue):
+    """Print queue counts and mean timings from the results store."""
+    counts = queue.counts()
+    done, wait, seconds, cached = queue.timings()
+    print("📊 Queue: " + ", ".join(f"{status}={n}" for status, n in sorted(counts.items()))
+          if counts else "📊 Queue: empty")
+    if done:
+        print(f"   {done} answered ({cached} from the response cache), "
+              f"mean queue wait {wait:.1f}s, mean run {seconds:.1f}s")
+    passed, escalated, qa_seconds = queue.gate_stats()
+    if passed or escalated:
+        saved = f", ~{passed * qa_seconds:.0f}s saved" if qa_seconds else ""
+        print(f"   QA gate: {passed} drafts passed locally, {escalated} escalated "
+              f"to the QA agent ({passed} QA reviews skipped{saved})")
+
+
+def main():
+    """Parse the subcommand and dispatch."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=".cache/inquiries.sqlite",
+                        help="queue and results database (default: %(default)s)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = sub.add_parser("enqueue", help="add one inquiry")
+    enqueue.add_argument("--customer", required=True)
+    enqueue.add_argument("--person", required=True)
+    enqueue.add_argument("--inquiry", required=True)
+
+    spool = sub.add_parser("enqueue-jsonl", help="add inquiries from a JSONL file")
+    spool.add_argument("path")
+
+    run_cmd = sub.add_parser("run", help="process queued inquiries")
+    run_cmd.add_argument("--concurrency", type=int,
+                         default=int(os.getenv("OLLAMA_NUM_PARALLEL", "1")))
+    run_cmd.add_argument("--drain", action="store_true",
+                         help="exit once the queue is empty")
+    run_cmd.add_argument("--poll-seconds", type=float, default=2.0)
+    run_cmd.add_argument("--docs-index", metavar="DIR")
+    run_cmd.add_argument("--similarity-threshold", type=float, default=0.8)
+    run_cmd.add_argument("--no-response-cache", action="store_true")
+    run_cmd.add_argument("--response-cache-size", type=int, default=10000,
+                         help="cached answers kept before LRU eviction")
+    run_cmd.add_argument("--no-qa-gate", action="store_true",
+                         help="always run the QA review")
+    run_cmd.add_argument("--memory-embedder", choices=("ollama", "hashing"), default="ollama")
+    run_cmd.add_argument("--no-memory", action="store_true")
+
+    results = sub.add_parser("status", help="show queue counts and recent results")
+    results.add_argument("--last", type=int, default=5)
+
+    args = parser.parse_args()
+    queue = InquiryQueue(args.db)
+
+    if args.command == "enqueue":
+        print(f"Queued inquiry {queue.enqueue(args.customer, args.person, args.inquiry)}")
+    elif args.command == "enqueue-jsonl":
+        print(f"Queued {queue.enqueue_jsonl(args.path)} inquiries")
+    elif args.command == "run":
+        response_cache = None if args.no_response_cache else ResponseCache(
+            threshold=args.similarity_threshold, max_entries=args.response_cache_size)
+        run(queue, max(1, args.concurrency), args.drain, args.poll_seconds, args.docs_index,
+            response_cache, not args.no_qa_gate,
+            None if args.no_memory else args.memory_embedder)
+    else:
+        print_status(queue)
+        for row in queue.results(args.last):
+            inquiry_id, customer, person, status, seconds, wait, path, output, error = row
+            print(f"\n#{inquiry_id} {customer} / {person} [{status}, {path or 'crew'}] "
+                  f"run {seconds or 0:.1f}s, waited {wait or 0:.1f}s")
+            print((output or error or "")[:300])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Review Event_Planning outputs waiting in the approval queue.
+
+Outputs that fail the automatic approval rules wait in a sqlite queue while
+the rest of the crew keeps running. Decide them from another terminal:
+
+Usage:
+    python approve.py list
+    python approve.py approve ID [--feedback "..."]
+    python approve.py reject ID --feedback "Find a venue with 500+ seats"
+"""
+
+import argparse
+import getpass
+import time
+from utils.approvals import ApprovalQueue
+
+
+def main():
+    """Parse the subcommand and dispatch."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=".cache/approvals.sqlite",
+                        help="approval queue database (default: %(default)s)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="show pending approvals")
+    for name in ("approve", "reject"):
+        decide = sub.add_parser(name, help=f"{name} one pending output")
+        decide.add_argument("id", type=int)
+        decide.add_argument("--feedback", required=name == "reject",
+                            help="what the agent should change")
+    args = parser.parse_args()
+    queue = ApprovalQueue(args.db)
+
+    if args.command == "list":
+        pending = queue.pending()
+        if not pending:
+            print("Nothing waiting for approval.")
+        for approval_id, task, output, reasons, submitted_at in pending:
+            print(f"\n#{approval_id} {task} (waiting {time.time() - submitted_at:.0f}s)")
+            for reason in reasons:
+                print(f"   - {reason}")
+            print(output[:500])
+        return
+
+    if queue.decide(args.id, args.command == "approve", args.feedback, getpass.getuser()):
+        print(f"#{args.id} {args.command}d")
+    else:
+        print(f"#{args.id} is not pending")
+
+
+if __name__ == "__main__":
+    main()
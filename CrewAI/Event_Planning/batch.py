@@ -0,0 +1,148 @@
+# pylint: disable=C0114
+import argparse
+import json
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from main import (APPROVAL_RULES, EVENT_DETAILS, build_venue_output, configure_environment,
+                  plan_event, seed_catalog)
+from utils import rate_limit
+from utils.approvals import DEFAULT_TIMEOUT, ApprovalPolicy, ApprovalQueue, Approver
+from utils.scrape_cache import default_scrape_cache
+from utils.search_cache import default_search_cache
+from utils.shared_tools import SharedScrapeWebsiteTool, SharedSerperDevTool, ToolMemo
+from utils.venue_catalog import VenueCatalog
+
+
+def read_events(path):
+    """
+    Reads a JSON list of event dicts; missing keys default to EVENT_DETAILS.
+    """
+    with open(path, encoding="utf-8") as f:
+        events = json.load(f)
+    if not isinstance(events, list):
+        raise ValueError(f"{path} must hold a JSON list of events")
+    return [{**EVENT_DETAILS, **event} for event in events]
+
+
+def group_key(event):
+    """
+    Events with the same city and topic share their searches and scrapes.
+    """
+    return (event["event_city"].strip().lower(), event["event_topic"].strip().lower())
+
+
+def group_events(events):
+    """
+    Returns {group key: [(index, event), ...]} in first-seen order.
+    """
+    groups = defaultdict(list)
+    for index, event in enumerate(events, start=1):
+        groups[group_key(event)].append((index, event))
+    return dict(groups)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Plan many events with a pool of crews, sharing web searches "
+                    "and scrapes between events in the same city and topic.")
+    parser.add_argument("events_file", help="JSON list of event dicts shaped like EVENT_DETAILS")
+    parser.add_argument("--concurrency", type=int, default=3,
+                        help="events planned at once (default: %(default)s)")
+    parser.add_argument("--sequential", action="store_true",
+                        help="run each event's tasks one after another, without approvals")
+    parser.add_argument("--max-workers", type=int, default=3,
+                        help="tasks run at once within an event (default: %(default)s)")
+    parser.add_argument("--approval-timeout", type=float, metavar="SECONDS",
+                        default=DEFAULT_TIMEOUT,
+                        help="seconds an output waits for a person before it expires "
+                             "(default: %(default)s)")
+    parser.add_argument("--approvals-db", default=".cache/approvals.sqlite")
+    parser.add_argument("--output-dir", default="outputs")
+    parser.add_argument("--no-sharing", action="store_true",
+                        help="give every event its own tools, for comparison")
+    args = parser.parse_args()
+
+    events = read_events(args.events_file)
+    if not events:
+        parser.error(f"no events found in {args.events_file}")
+
+    configure_environment()
+
+    catalog = VenueCatalog()
+    seed_catalog(catalog)
+    venue_output = build_venue_output()
+    approver = None if args.sequential else Approver(
+        ApprovalPolicy(APPROVAL_RULES), ApprovalQueue(args.approvals_db),
+        timeout=args.approval_timeout)
+
+    groups = group_events(events)
+    memos = {key: ToolMemo(f"{key[1]} in {key[0]}") for key in groups}
+
+    def plan(index, event):
+        memo = None if args.no_sharing else memos[group_key(event)]
+        tools = {}
+        if memo is not None:
+            tools = {"search_tool": SharedSerperDevTool(memo=memo),
+                     "scrape_tool": SharedScrapeWebsiteTool(memo=memo)}
+        planned = plan_event(event, catalog, venue_output, approver, args.sequential,
+                             args.max_workers, output_root=args.output_dir, **tools)
+        planned["index"] = index
+        return planned
+
+    results, failures = [], []
+    concurrency = max(1, min(args.concurrency, len(events)))
+    batch_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(plan, index, event): (index, event)
+            for members in groups.values() for index, event in members
+        }
+        for future in as_completed(futures):
+            index, event = futures[future]
+            try:
+                planned = future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                failures.append((index, exc))
+                print(f"❌ #{index} {event['event_topic']} in {event['event_city']}: {exc}")
+                continue
+            results.append(planned)
+            print(f"✅ #{index} {event['event_topic']} in {event['event_city']}: "
+                  f"{planned['seconds']:.1f}s -> {planned['run_dir']}")
+
+    wall = time.perf_counter() - batch_start
+
+    # --- Batch report ---
+    print("\n" + "="*80)
+    print(f"📊 BATCH REPORT ({len(events)} events in {len(groups)} groups, "
+          f"{concurrency} at once)")
+    print("="*80)
+    for planned in sorted(results, key=lambda p: p["index"]):
+        event = planned["event"]
+        print(f"#{planned['index']:<3d} {planned['seconds']:8.1f}s  "
+              f"{planned['web_searches']:3d} web searches  "
+              f"{event['event_topic']} in {event['event_city']} ({event['tentative_date']})")
+    busy = sum(p["seconds"] for p in results)
+    print("-"*80)
+    print(f"Events:          {len(results)} ok, {len(failures)} failed")
+    print(f"Wall time:       {wall:.1f}s")
+    if results:
+        print(f"Mean per event:  {busy / len(results):.1f}s")
+        print(f"Effective par.:  {busy / wall:.2f}x")
+    if not args.no_sharing:
+        for memo in memos.values():
+            memo.report()
+        calls = sum(memo.stats["calls"] for memo in memos.values())
+        shared = sum(memo.stats["shared"] for memo in memos.values())
+        print(f"Tool calls saved by sharing: {shared} of {calls}")
+    venue_output.report()
+    catalog.report()
+    default_scrape_cache().report()
+    default_search_cache().report()
+    rate_limit.report()
+    print("="*80)
+
+
+if __name__ == "__main__":
+    main()
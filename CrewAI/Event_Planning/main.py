@@ -1,49 +1,149 @@
+"""
+Event planning crew on Groq.
+
+Three agents find a venue, arrange logistics and market the event. Each
+task declares what it depends on through `context`: logistics only needs
+the event inputs, marketing needs the chosen venue. By default the tasks run
+as a dependency graph, so every task whose inputs are ready runs at once,
+and a timeline with the critical path is printed. --sequential runs the
+plain Process.sequential crew for comparison.
+
+Instead of prompting on stdin, the venue and logistics outputs go through
+approval rules (capacity, availability, budget). Outputs that pass are
+approved automatically; the rest wait in an approval queue, decided with
+`approve.py`, while unrelated tasks keep running. A request nobody decides
+within --approval-timeout (15 minutes by default) expires, and tasks that
+depend on a rejected or expired output are skipped.
+
+Validated venues accumulate in a local catalog (.cache/venues.sqlite). When
+it already has a venue in the event's city and capacity range, the venue
+agent picks from the catalog instead of searching the web for venues; it
+only searches to confirm availability on the event date when the catalog
+has not checked that date within the last day.
+
+The venue answer is turned into VenueDetails JSON by a guardrail that
+repairs and coerces it locally ("1,000 guests" -> 1000) and only falls back
+to one Groq JSON-mode call, then to re-prompting the agent, when that fails.
+
+Each run writes venue_details.json, marketing_report.md and a manifest of
+its inputs, timings and file hashes to its own directory under outputs/,
+so several events can be planned at once on one host.
+
+LLM calls are queued client-side under Groq's tokens- and requests-per-
+minute limits (utils/rate_limit.py), venue calls first, so parallel tasks
+wait for budget instead of tripping 429s and backing off.
+
+Usage:
+    python main.py [--sequential] [--max-workers 3] [--approval-timeout SECONDS]
+"""
+
+import argparse
+import time
 import warnings
 import os
 from crewai import Agent, Task, Crew, LLM
+from utils.approvals import (DEFAULT_TIMEOUT, ApprovalPolicy, ApprovalQueue, Approver,
+                             capacity_fits, output_json, under_budget, venue_available)
+from utils import rate_limit
+from utils.dag_scheduler import DagScheduler
 from utils.get_groq_api_key import get_groq_api_key
 from utils.get_serper_api_key import get_serper_api_key
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool
-from pydantic import BaseModel
+from utils.run_outputs import RunDirectory
+from utils.scrape_cache import CachedScrapeWebsiteTool, default_scrape_cache
+from utils.search_cache import CachedSerperDevTool, default_search_cache
+from utils.structured_output import StructuredOutput, response_format
+from utils.venue_catalog import VenueCatalog, VenueCatalogTool
+from pydantic import BaseModel, ValidationError
 import json
 from pprint import pprint
 
+EVENT_DETAILS = {
+    "event_topic": "Tech Innovation Conference",
+    "event_description": (
+        "A gathering of tech innovators and industry leaders "
+        "to explore future technologies."
+    ),
+    "event_city": "San Francisco",
+    "tentative_date": "2024-09-15",
+    "expected_participants": 500,
+    "budget": 20000,
+    "venue_type": "Conference Hall",
+}
 
-def main():
-    warnings.filterwarnings('ignore')
 
-    # ========================
-    # Patch SerperDevTool to accept dict safely
-    # ========================
-    # Keep a reference to the original method
-    _original_run = SerperDevTool.run
+# Task name -> rules its output must pass to be approved without a person
+APPROVAL_RULES = {
+    "venue_task": [capacity_fits, venue_available],
+    "logistics_task": [under_budget],
+}
+
 
-    def safe_run(self, search_query):
-        # Ensure the argument is always a plain string
-        if isinstance(search_query, dict):
-            search_query = search_query.get("description", str(search_query))
-        # Call the *original* method safely
-        return _original_run(self, search_query)
+class VenueDetails(BaseModel):
+    name: str
+    address: str
+    capacity: int
+    booking_status: str
 
-    SerperDevTool.run = safe_run
-    # ========================
+
+def configure_environment():
+    """Silence warnings and point CrewAI at Groq and Serper."""
+    warnings.filterwarnings('ignore')
 
     # Use Groq (OpenAI-compatible API)
     os.environ["OPENAI_API_BASE"] = "https://api.groq.com/openai/v1"
     os.environ["GROQ_API_KEY"] = get_groq_api_key()
     os.environ["SERPER_API_KEY"] = get_serper_api_key()
 
+    # Queue LLM calls under Groq's token and request limits instead of
+    # sending them into 429s; the venue task is on the critical path
+    rate_limit.install(agent_priorities={"Venue Coordinator": rate_limit.HIGH})
+
+
+def build_crew(catalog=None, venues=None, on_web_search=None, venue_output=None,
+               search_tool=None, scrape_tool=None):
+    """Build the three agents, their tasks and the crew.
+
+    Tasks declare their dependencies explicitly through `context`, which is
+    what DagScheduler schedules on.
+
+    Args:
+        catalog: VenueCatalog to pick from when `venues` is not empty.
+        venues: The catalog's venues for this event, from
+            VenueCatalog.lookup. When there are any, the venue agent picks
+            from the catalog; it also gets the web tools, for the date
+            check only, when a venue's booking_status is 'unknown'.
+        on_web_search: Optional callable run each time the venue agent
+            uses the web search tool.
+        venue_output: Optional StructuredOutput guardrail for the venue
+            task. Without one CrewAI converts the answer itself, with an
+            LLM call per failed parse.
+        search_tool: Optional search tool, e.g. one sharing its results
+            with other events; defaults to a new CachedSerperDevTool.
+        scrape_tool: Optional scrape tool; defaults to a new
+            CachedScrapeWebsiteTool.
+    """
     llm = LLM(model="groq/llama-3.3-70b-versatile")  # this model supports 12K tokens per minute
 
     # Initialize the tools
-    search_tool = SerperDevTool()
-    scrape_tool = ScrapeWebsiteTool()
+    search_tool = search_tool or CachedSerperDevTool()  # cached across runs and processes
+    scrape_tool = scrape_tool or CachedScrapeWebsiteTool()  # disk cache shared across runs
+
+    catalog_hit = bool(venues)
+    check_availability = any(v["booking_status"] == "unknown" for v in venues or [])
+
+    def _venue_step(step):
+        if on_web_search and getattr(step, "tool", None) == search_tool.name:
+            on_web_search()
 
     # Agent 1: Venue Coordinator
     venue_coordinator = Agent(
         role="Venue Coordinator",
         goal="Identify and book an appropriate venue based on event requirements",
-        tools=[search_tool, scrape_tool],
+        # On a catalog hit the web tools only confirm the date's availability
+        tools=([VenueCatalogTool(catalog=catalog)]
+               + ([search_tool, scrape_tool] if check_availability else [])
+               if catalog_hit else [search_tool, scrape_tool]),
+        step_callback=_venue_step,
         verbose=True,
         backstory=(
             "With a keen sense of space and understanding of event logistics, "
@@ -81,44 +181,58 @@ def main():
         llm=llm
     )
 
-    class VenueDetails(BaseModel):
-        name: str
-        address: str
-        capacity: int
-        booking_status: str
-
     venue_task = Task(
+        name="venue_task",
         description=(
-            "Find a venue in {event_city} that meets criteria for {event_topic}. "
+            "Pick a venue in {event_city} for {event_topic} on {tentative_date} from the "
+            "local venue catalog. Use the 'Search Venue Catalog' tool with city "
+            "{event_city}, minimum capacity {expected_participants}, venue type "
+            "{venue_type} and date {tentative_date}. Copy the booking_status the "
+            "catalog reports for that date"
+            + ("; if it is 'unknown', check the chosen venue's availability on "
+               "{tentative_date} with the search tool and report what you find. "
+               "Do not search the web for other venues." if check_availability else
+               "; no web search is needed.")
+        ) if catalog_hit else (
+            "Find a venue in {event_city} that meets criteria for {event_topic} and "
+            "check whether it is available on {tentative_date}. "
             "Use the search tool with a plain text query like "
             "'best venues in San Francisco for tech conference'."
         ),
         expected_output=(
             "All the details of a specifically chosen venue you found to accommodate the event. "
-            "Return valid JSON only, like: {\"website_url\": \"...\"}. "
-            "Return a JSON object with numeric 'capacity' (integer only) and 'booking_status' "
-            "(string: 'available' or 'unavailable')."
+            "Return valid JSON only with the keys 'name', 'address', numeric 'capacity' "
+            "(integer only) and 'booking_status' (string: 'available', 'unavailable', or "
+            "'unknown' when availability on {tentative_date} could not be confirmed)."
         ),
-        human_input=True,
-        output_json=VenueDetails,
-        output_file="venue_details.json",
+        # The guardrail leaves the canonical JSON as the raw output
+        output_json=None if venue_output else VenueDetails,
+        guardrail=venue_output,
         agent=venue_coordinator,
+        context=[],
     )
 
     logistics_task = Task(
+        name="logistics_task",
         description=(
             "Coordinate catering and equipment for an event with "
-            "{expected_participants} participants on {tentative_date}."
+            "{expected_participants} participants on {tentative_date}, "
+            "within a total budget of ${budget}. Estimate the cost of each "
+            "arrangement in US dollars."
         ),
         expected_output=(
-            "Confirmation of all logistics arrangements including catering and equipment setup."
+            "Confirmation of all logistics arrangements including catering and equipment setup, "
+            "each with its estimated cost in US dollars. End with one line of the form "
+            "'Total: $<amount>' giving the sum of those costs."
         ),
-        human_input=True,
         async_execution=False,
         agent=logistics_manager,
+        # Only needs the event inputs, so it does not wait for the venue
+        context=[],
     )
 
     marketing_task = Task(
+        name="marketing_task",
         description=(
             "Promote the {event_topic} aiming to engage at least "
             "{expected_participants} potential attendees."
@@ -127,12 +241,13 @@ def main():
             "Report on marketing activities and attendee engagement formatted as markdown."
         ),
         async_execution=True,
-        output_file="marketing_report.md",
         agent=marketing_communications_agent,
+        # Promotion needs the chosen venue
+        context=[venue_task],
     )
 
     # Define the crew with agents and tasks
-    event_management_crew = Crew(
+    return Crew(
         agents=[
             venue_coordinator,
             logistics_manager,
@@ -142,30 +257,155 @@ def main():
         verbose=True,
     )
 
-    event_details = {
-        "event_topic": "Tech Innovation Conference",
-        "event_description": (
-            "A gathering of tech innovators and industry leaders "
-            "to explore future technologies."
-        ),
-        "event_city": "San Francisco",
-        "tentative_date": "2024-09-15",
-        "expected_participants": 500,
-        "budget": 20000,
-        "venue_type": "Conference Hall",
+
+def remember_venue(catalog, output, review=None, event_details=EVENT_DETAILS):
+    """Add the chosen venue to the catalog if it is valid and was not rejected."""
+    if review is not None and not review.approved:
+        return False
+    try:
+        details = VenueDetails.model_validate(output_json(output) or {})
+    except ValidationError:
+        return False
+    return catalog.add(details.model_dump(), event_details["event_city"],
+                       event_details.get("venue_type"), source="crew",
+                       date=event_details.get("tentative_date"))
+
+
+def save_outputs(run_dir, venue_output, marketing_output):
+    """Write the venue JSON and marketing report into the run directory.
+
+    Returns:
+        tuple: (venue details dict or None, marketing report text, or None
+        when the marketing task was skipped).
+    """
+    details = output_json(venue_output)
+    run_dir.write("venue_details.json",
+                  json.dumps(details, indent=2) if details is not None else venue_output.raw)
+    if marketing_output is None:
+        return details, None
+    run_dir.write("marketing_report.md", marketing_output.raw)
+    return details, marketing_output.raw
+
+
+def build_venue_output():
+    """StructuredOutput guardrail for the venue task."""
+    # Groq offers JSON mode rather than full schema-constrained decoding
+    return StructuredOutput(VenueDetails, LLM(
+        model="groq/llama-3.3-70b-versatile",
+        response_format=response_format(VenueDetails, "json_object")))
+
+
+def seed_catalog(catalog):
+    """Seed an empty catalog from a venue_details.json left by older runs."""
+    if not len(catalog) and os.path.exists("venue_details.json"):
+        with open("venue_details.json") as f:
+            catalog.add(json.load(f), source="venue_details.json")
+
+
+def plan_event(event_details, catalog, venue_output=None, approver=None, sequential=False,
+               max_workers=3, search_tool=None, scrape_tool=None, output_root="outputs"):
+    """Plan one event into its own run directory.
+
+    Args:
+        event_details: Inputs for the crew, shaped like EVENT_DETAILS.
+        catalog: VenueCatalog consulted before any web search.
+        venue_output: Optional StructuredOutput guardrail for the venue task.
+        approver: Optional Approver for the DAG run; ignored when `sequential`.
+        sequential: Run the plain Process.sequential crew instead.
+        max_workers: Tasks run at once by the DAG scheduler.
+        search_tool: Optional search tool shared with other events.
+        scrape_tool: Optional scrape tool shared with other events.
+        output_root: Directory the run directory is created in.
+
+    Returns:
+        dict: The event, its wall-clock seconds, run directory, venue
+        details, marketing report (None when the task was skipped), web
+        searches made and the DAG ScheduleResult (None when sequential).
+    """
+    venues = catalog.lookup(event_details["event_city"], event_details["expected_participants"],
+                            event_details.get("venue_type"),
+                            date=event_details.get("tentative_date"))
+    web_searches = []
+    event_management_crew = build_crew(catalog, venues,
+                                       on_web_search=lambda: web_searches.append(1),
+                                       venue_output=venue_output, search_tool=search_tool,
+                                       scrape_tool=scrape_tool)
+    venue_task = event_management_crew.tasks[0]
+
+    review, result = None, None
+    start = time.perf_counter()
+    with RunDirectory(event_details, root=output_root,
+                      label=event_details["event_topic"]) as run_dir:
+        if sequential:
+            event_management_crew.kickoff(inputs=event_details)
+            run_dir.timing("kickoff", time.perf_counter() - start)
+            print(f"\n⏱️  Sequential crew finished in {time.perf_counter() - start:.1f}s")
+        else:
+            schedule = DagScheduler(event_management_crew, max_workers, approver)
+            result = schedule.kickoff(event_details)
+            result.report()
+            run_dir.timing("kickoff", result.wall_seconds)
+            for entry in result.timeline:
+                run_dir.timing(entry.name, entry.seconds)
+            review = next((e.review for e in result.timeline if e.task is venue_task), None)
+
+        if not venues:
+            catalog.record_web_searches(len(web_searches))
+        remember_venue(catalog, venue_task.output, review, event_details)
+
+        data, marketing_report = save_outputs(run_dir, venue_task.output,
+                                              event_management_crew.tasks[-1].output)
+
+    return {
+        "event": event_details,
+        "seconds": time.perf_counter() - start,
+        "run_dir": run_dir.path,
+        "venue": data,
+        "marketing_report": marketing_report,
+        "web_searches": len(web_searches),
+        "schedule": result,
     }
 
-    result = event_management_crew.kickoff(inputs=event_details)
 
-    # Load and print the saved venue details
-    with open("venue_details.json") as f:
-        data = json.load(f)
-    pprint(data)
+def main():
+    parser = argparse.ArgumentParser(description="Plan an event with a crew of agents.")
+    parser.add_argument("--sequential", action="store_true",
+                        help="run the tasks one after another (Process.sequential), "
+                             "without the approval step")
+    parser.add_argument("--max-workers", type=int, default=3,
+                        help="tasks run at once by the DAG scheduler (default: %(default)s)")
+    parser.add_argument("--approval-timeout", type=float, metavar="SECONDS",
+                        default=DEFAULT_TIMEOUT,
+                        help="stop waiting for a person after this long; the output "
+                             "stays unapproved and tasks depending on it are skipped "
+                             "(default: %(default)s)")
+    parser.add_argument("--approvals-db", default=".cache/approvals.sqlite")
+    args = parser.parse_args()
+
+    configure_environment()
+
+    catalog = VenueCatalog()
+    seed_catalog(catalog)
+    venue_output = build_venue_output()
+    approver = None if args.sequential else Approver(
+        ApprovalPolicy(APPROVAL_RULES), ApprovalQueue(args.approvals_db),
+        timeout=args.approval_timeout)
+
+    planned = plan_event(EVENT_DETAILS, catalog, venue_output, approver,
+                         args.sequential, args.max_workers)
 
-    # Display marketing report
-    with open("marketing_report.md", "r") as f:
-        print(f.read())
+    pprint(planned["venue"])
+    if planned["marketing_report"] is None:
+        print("⏭️  No marketing report: the venue was not approved")
+    else:
+        print(planned["marketing_report"])
+    print(f"✅ Outputs saved to: {planned['run_dir']}")
 
+    venue_output.report()
+    catalog.report()
+    default_scrape_cache().report()
+    default_search_cache().report()
+    rate_limit.report()
 
 if __name__ == "__main__":
     main()
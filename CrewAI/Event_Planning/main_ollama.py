@@ -14,7 +14,7 @@ Functions:
 Required Environment Variables:
     - OPENAI_API_KEY: API key for OpenAI services
     - SERPER_API_KEY: API key for Serper search services
-Output Files:
+Output Files (in a per-run directory under outputs/, with manifest.json):
     - venue_details.json: Contains details of the selected venue
     - marketing_report.md: Marketing activities and engagement report
 Dependencies:
@@ -31,10 +31,13 @@ Note:
     Requires valid API keys and necessary permissions for external services.
 """
 import os
-from crewai import Agent, Task, Crew
+from crewai import Agent, Task, Crew, LLM
 from utils.get_openai_api_key import get_openai_api_key
 from utils.get_serper_api_key import get_serper_api_key
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool
+from utils.run_outputs import RunDirectory
+from utils.scrape_cache import CachedScrapeWebsiteTool, default_scrape_cache
+from utils.search_cache import CachedSerperDevTool, default_search_cache
+from utils.structured_output import StructuredOutput, response_format
 from pydantic import BaseModel
 import json
 from pprint import pprint
@@ -54,7 +57,7 @@ def main():
     5. Creates a crew to manage the agents and their tasks
     6. Executes the event planning workflow with provided event details
     Returns:
-        None. Outputs are written to:
+        None. Outputs are written to a new run directory under outputs/:
         - venue_details.json: Contains details of the selected venue
         - marketing_report.md: Contains marketing activities report
     Required Environment Variables:
@@ -66,7 +69,7 @@ def main():
         - json
         - pprint
         - CrewAI framework classes (Agent, Task, Crew)
-        - Custom tools (SerperDevTool, ScrapeWebsiteTool)
+        - Custom tools (CachedSerperDevTool, CachedScrapeWebsiteTool)
     """
 
     warnings.filterwarnings('ignore')
@@ -79,8 +82,8 @@ def main():
  
 
     # Initialize the tools
-    search_tool = SerperDevTool()
-    scrape_tool = ScrapeWebsiteTool()
+    search_tool = CachedSerperDevTool()  # searches cached and shared across processes
+    scrape_tool = CachedScrapeWebsiteTool()  # disk cache shared across runs
 
     # Agent 1: Venue Coordinator
     venue_coordinator = Agent(
@@ -136,17 +139,22 @@ def main():
         capacity: int
         booking_status: str
 
+    # Small local models often wrap or mangle the JSON: repair it locally and
+    # fall back to Ollama's schema-constrained decoding, not a re-prompt
+    venue_output = StructuredOutput(VenueDetails, LLM(
+        model="openai/" + os.environ["OPENAI_MODEL_NAME"],
+        base_url=os.environ["OPENAI_API_BASE"],
+        response_format=response_format(VenueDetails)))
+
     venue_task = Task(
         description="Find a venue in {event_city} "
                     "that meets criteria for {event_topic}.",
         expected_output="All the details of a specifically chosen"
                         "venue you found to accommodate the event."
-                        "Return valid JSON only, like: {\"website_url\": \"...\"}."
-                        "Return a JSON object with numeric 'capacity' (integer only) and 'booking_status' (string: 'available' or 'unavailable').",
+                        "Return valid JSON only with the keys 'name', 'address', "
+                        "numeric 'capacity' (integer only) and 'booking_status' (string: 'available' or 'unavailable').",
         human_input=True,
-        output_json=VenueDetails,
-        output_file="venue_details.json",  
-        # Outputs the venue details as a JSON file
+        guardrail=venue_output,
         agent=venue_coordinator
     )
 
@@ -169,7 +177,6 @@ def main():
         expected_output="Report on marketing activities "
                         "and attendee engagement formatted as markdown.",
         async_execution=True,
-        output_file="marketing_report.md",  # Outputs the report as a text file
         agent=marketing_communications_agent
     )
     
@@ -198,16 +205,23 @@ def main():
         'venue_type': "Conference Hall"
     }
 
-    result = event_management_crew.kickoff(inputs=event_details)
-
-    with open('venue_details.json') as f:
-        data = json.load(f)
+    # Written to this run's own directory, atomically
+    with RunDirectory(event_details, root="outputs",
+                      label=event_details["event_topic"]) as run_dir:
+        with run_dir.timed("kickoff"):
+            result = event_management_crew.kickoff(inputs=event_details)
+        run_dir.write("venue_details.json", venue_task.output.raw)
+        run_dir.write("marketing_report.md", marketing_task.output.raw)
 
-    pprint(data)
+    pprint(json.loads(venue_task.output.raw))
     
     #Markdown("marketing_report.md")
-    with open("marketing_report.md", "r") as f:
-        print(f.read())
+    print(marketing_task.output.raw)
+    print(f"✅ Outputs saved to: {run_dir.path}")
+
+    venue_output.report()
+    default_scrape_cache().report()
+    default_search_cache().report()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,62 @@
+import time
+from pydantic import BaseModel
+from utils.structured_output import StructuredOutput, repair_json
+
+# Checks the local JSON repair on the malformed venue answers LLMs produce,
+# and that the guardrail's counters match the LLM calls it actually made.
+# No network access or CrewAI run needed.
+
+
+class VenueDetails(BaseModel):
+    name: str
+    address: str
+    capacity: int
+    booking_status: str
+
+
+class CountingLLM:
+    """Stand-in conversion LLM that records its calls."""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = 0
+
+    def call(self, messages):
+        self.calls += 1
+        return self.answer
+
+
+def main():
+    assert repair_json('{"capacity": 1,000}') == ({"capacity": 1000}, True)
+    assert repair_json('{"capacity": 1000 guests}') == ({"capacity": 1000}, True)
+    assert repair_json('{capacity: 12,500 people, "booking_status": "available"}') == (
+        {"capacity": 12500, "booking_status": "available"}, True)
+    data, _ = repair_json('{"name": "Hall: 1,000 seats", "capacity": 1,000 guests}')
+    assert data == {"name": "Hall: 1,000 seats", "capacity": 1000}, "strings are left alone"
+    assert repair_json('{"capacity": 1000}') == ({"capacity": 1000}, False)
+
+    answer = ('Here is the venue:\n```json\n{"name": "Moscone Center", '
+              '"address": "747 Howard St, San Francisco, CA 94103", '
+              '"capacity": 1,000 guests, "booking_status": "available"}\n```')
+    llm = CountingLLM('{"name": "x", "address": "y", "capacity": 1, "booking_status": "z"}')
+    guardrail = StructuredOutput(VenueDetails, llm)
+    ok, _ = guardrail(answer)
+    assert ok and llm.calls == 0, "repaired locally, no conversion call"
+
+    ok, _ = guardrail("The venue is great.")
+    assert ok and llm.calls == 1 and guardrail.stats["conversion_calls"] == 1
+
+    llm.answer = "not json"
+    ok, _ = guardrail("Still no JSON here.")
+    assert not ok and llm.calls == 2
+    assert guardrail.stats["conversion_calls"] == 2, "failed conversions are counted too"
+    assert guardrail.stats["reprompts"] == 1
+
+    guardrail.report()
+    print("✅ structured output repairs and counts as expected")
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    main()
+    print(f"done in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,293 @@
+# pylint: disable=C0114
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+
+from crewai import Task
+
+# A line of its own such as "Total: $18,500" or "- **Estimated total cost:** $18.5k"
+_TOTAL = re.compile(r"^[\s>*#_-]*(?:grand |estimated )?total\b[^\n$]{0,40}"
+                    r"\$\s?(\d[\d,]*(?:\.\d+)?)\s*(k\b)?", re.IGNORECASE | re.MULTILINE)
+
+# Seconds an output waits for a person before it expires, counting as not
+# approved, so an unattended run ends instead of blocking forever
+DEFAULT_TIMEOUT = 15 * 60
+
+# Review statuses whose output dependent tasks may use
+APPROVED = ("auto-approved", "approved")
+
+
+def output_json(output):
+    """
+    Returns the task output as a dict: its json_dict or pydantic model when
+    CrewAI parsed one, else the first JSON object in the raw text, else None.
+    """
+    if getattr(output, "json_dict", None):
+        return dict(output.json_dict)
+    if getattr(output, "pydantic", None) is not None:
+        return output.pydantic.model_dump()
+    raw = getattr(output, "raw", output) or ""
+    match = re.search(r"\{.*\}", str(raw), re.DOTALL)
+    if match:
+        try:
+            return json.loads(match.group(0))
+        except ValueError:
+            return None
+    return None
+
+
+def _amount(number, thousands):
+    value = float(number.replace(",", ""))
+    return value * 1000 if thousands else value
+
+
+def estimated_cost(text):
+    """
+    The cost a logistics plan commits to: the amount on its last "Total:
+    $..." line, else None. Other dollar amounts (line items, the quoted
+    budget) are not added up.
+    """
+    totals = _TOTAL.findall(text or "")
+    return _amount(*totals[-1]) if totals else None
+
+
+def capacity_fits(output, inputs):
+    """Venue capacity is at least the expected number of participants."""
+    data = output_json(output) or {}
+    try:
+        capacity = int(data.get("capacity"))
+    except (TypeError, ValueError):
+        return False, "venue capacity is missing"
+    needed = int(inputs["expected_participants"])
+    if capacity < needed:
+        return False, f"capacity {capacity} is below {needed} expected participants"
+    return True, f"capacity {capacity} fits {needed} participants"
+
+
+def venue_available(output, _inputs):
+    """Venue booking_status is 'available'."""
+    status = str((output_json(output) or {}).get("booking_status", "")).strip().lower()
+    if status != "available":
+        return False, f"booking status is {status or 'missing'!r}"
+    return True, "venue is available"
+
+
+def under_budget(output, inputs):
+    """Stated costs stay within the event budget."""
+    cost = estimated_cost(getattr(output, "raw", output))
+    budget = float(inputs["budget"])
+    if cost is None:
+        return False, "no 'Total: $...' line to check against the budget"
+    if cost > budget:
+        return False, f"estimated ${cost:,.0f} exceeds the ${budget:,.0f} budget"
+    return True, f"estimated ${cost:,.0f} within the ${budget:,.0f} budget"
+
+
+class ApprovalPolicy:
+    """
+    Rules a task output must pass to be approved without a person.
+
+    rules maps a task name to rule functions rule(output, inputs) ->
+    (passed, reason). Tasks with no rules are not reviewed at all; a task
+    whose rules all pass is auto-approved, anything else goes to a person.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+
+    def reviews(self, task_name):
+        """
+        Whether outputs of task_name need approval.
+        """
+        return task_name in self.rules
+
+    def evaluate(self, task_name, output, inputs):
+        """
+        Returns (approved, reasons).
+        """
+        results = [rule(output, inputs) for rule in self.rules.get(task_name, [])]
+        return all(passed for passed, _ in results), [reason for _, reason in results]
+
+
+class ApprovalQueue:
+    """
+    sqlite queue of outputs waiting for a person, decided from another
+    process with `approve.py`.
+    """
+
+    def __init__(self, path=".cache/approvals.sqlite"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS approvals (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task TEXT NOT NULL,
+                    output TEXT NOT NULL,
+                    reasons TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    feedback TEXT,
+                    reviewer TEXT,
+                    submitted_at REAL NOT NULL,
+                    decided_at REAL
+                )""")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def submit(self, task_name, output, reasons):
+        """
+        Queues an output for review and returns its id.
+        """
+        with closing(self._connect()) as conn, conn:
+            return conn.execute(
+                "INSERT INTO approvals (task, output, reasons, submitted_at) VALUES (?, ?, ?, ?)",
+                (task_name, output, json.dumps(reasons), time.time())).lastrowid
+
+    def decide(self, approval_id, approved, feedback=None, reviewer=None):
+        """
+        Records a person's decision. Returns False if the id is unknown or
+        already decided.
+        """
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE approvals SET status = ?, feedback = ?, reviewer = ?, decided_at = ? "
+                "WHERE id = ? AND status = 'pending'",
+                ("approved" if approved else "rejected", feedback, reviewer, time.time(),
+                 approval_id))
+            return cursor.rowcount == 1
+
+    def expire(self, approval_id):
+        """
+        Marks a still-pending request as expired.
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE approvals SET status = 'expired', decided_at = ? "
+                "WHERE id = ? AND status = 'pending'", (time.time(), approval_id))
+
+    def status(self, approval_id):
+        """
+        Returns (status, feedback).
+        """
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT status, feedback FROM approvals WHERE id = ?",
+                                (approval_id,)).fetchone()
+
+    def wait(self, approval_id, timeout=None, poll_seconds=2.0):
+        """
+        Blocks until the request is decided, or expires it after timeout
+        seconds. Returns (status, feedback).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status, feedback = self.status(approval_id)
+            if status != "pending":
+                return status, feedback
+            if deadline is not None and time.monotonic() >= deadline:
+                self.expire(approval_id)
+                return self.status(approval_id)
+            time.sleep(poll_seconds)
+
+    def pending(self):
+        """
+        Returns [(id, task, output, reasons, submitted_at)] oldest first.
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, task, output, reasons, submitted_at FROM approvals "
+                "WHERE status = 'pending' ORDER BY id").fetchall()
+        return [(i, task, output, json.loads(reasons), at) for i, task, output, reasons, at in rows]
+
+
+class Approver:
+    """
+    Applies an ApprovalPolicy to finished tasks and, when a rule fails,
+    waits on the ApprovalQueue for a person. A rejection with feedback
+    re-runs the task as a revision that sees its previous answer, up to
+    max_revisions times. Only the reviewed task's thread waits, so other
+    tasks keep running. A request nobody decides within timeout seconds
+    expires and the output stays unapproved; None waits indefinitely.
+    """
+
+    def __init__(self, policy, queue, timeout=DEFAULT_TIMEOUT, max_revisions=2,
+                 poll_seconds=2.0):
+        self.policy = policy
+        self.queue = queue
+        self.timeout = timeout
+        self.max_revisions = max_revisions
+        self.poll_seconds = poll_seconds
+
+    def review(self, name, task, inputs, run):
+        """
+        Reviews task.output, re-running revisions through run(task) ->
+        TaskOutput as needed. Returns a Review; task.output holds the final
+        answer.
+        """
+        review = Review(name)
+        for revision in range(self.max_revisions + 1):
+            approved, reasons = self.policy.evaluate(name, task.output, inputs)
+            if approved:
+                review.status = "auto-approved"
+                review.reasons = reasons
+                return review
+
+            approval_id = self.queue.submit(name, task.output.raw, reasons)
+            print(f"🙋 {name} needs approval #{approval_id}: {'; '.join(reasons)} "
+                  f"(python approve.py approve {approval_id})")
+            start = time.perf_counter()
+            status, feedback = self.queue.wait(approval_id, self.timeout, self.poll_seconds)
+            review.wait_seconds += time.perf_counter() - start
+            review.status, review.reasons = status, reasons
+            if status != "rejected" or revision == self.max_revisions:
+                return review
+
+            start = time.perf_counter()
+            task.output = run(self._revision(task, feedback))
+            review.compute_seconds += time.perf_counter() - start
+            review.revisions += 1
+        return review
+
+    @staticmethod
+    def _revision(task, feedback):
+        # The rejected answer reaches the agent through context
+        note = re.sub(r"[{}]", "", feedback or "Improve the answer.")
+        return Task(
+            description=(f"{task.description}\n\nA reviewer rejected the previous answer "
+                         f"(given as context). Revise it to address this feedback: {note}"),
+            expected_output=task.expected_output,
+            agent=task.agent,
+            context=[task],
+            tools=task.tools,
+            output_json=task.output_json,
+            output_pydantic=task.output_pydantic,
+            guardrail=task.guardrail,
+            output_file=task.output_file,
+        )
+
+
+class Review:
+    """
+    Outcome of reviewing one task: status is "auto-approved", "approved",
+    "rejected" or "expired".
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.status = None
+        self.reasons = []
+        self.wait_seconds = 0.0
+        self.compute_seconds = 0.0
+        self.revisions = 0
+
+    @property
+    def approved(self):
+        """
+        Whether dependent tasks may use the output.
+        """
+        return self.status in APPROVED
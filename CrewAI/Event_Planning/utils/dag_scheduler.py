@@ -0,0 +1,234 @@
+# pylint: disable=C0114
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from crewai import Crew
+
+
+def dependencies(tasks):
+    """
+    Returns, for every task by position, the positions of the tasks it
+    depends on. A task's dependencies are its explicit `context` list; a
+    task without one reads every earlier output under Process.sequential,
+    so it depends on all earlier tasks.
+    """
+    # Tasks are pydantic models and not hashable, so match by identity
+    position = {id(task): i for i, task in enumerate(tasks)}
+    deps = []
+    for i, task in enumerate(tasks):
+        if not isinstance(task.context, list):
+            deps.append(list(range(i)))
+            continue
+        if any(id(t) not in position for t in task.context):
+            raise ValueError(f"task {_name(task)!r} depends on a task outside the crew")
+        deps.append([position[id(t)] for t in task.context])
+    return deps
+
+
+def _name(task):
+    return getattr(task, "name", None) or task.agent.role
+
+
+class TimelineEntry:
+    """
+    When one task ran, relative to the start of the schedule, and how much
+    of that was spent waiting for approval rather than computing.
+    """
+
+    def __init__(self, index, task, start, end, thread, review=None):
+        self.index = index
+        self.task = task
+        self.name = _name(task)
+        self.start = start
+        self.end = end
+        self.thread = thread
+        self.review = review
+
+    @property
+    def seconds(self):
+        """
+        Wall-clock seconds the task took, approval wait included.
+        """
+        return self.end - self.start
+
+    @property
+    def wait_seconds(self):
+        """
+        Seconds spent waiting for a person to approve the output.
+        """
+        return self.review.wait_seconds if self.review else 0.0
+
+    @property
+    def compute_seconds(self):
+        """
+        Seconds spent running the task and any revisions.
+        """
+        return self.seconds - self.wait_seconds
+
+
+class ScheduleResult:
+    """
+    Outputs and timeline of one DAG run.
+    """
+
+    def __init__(self, outputs, timeline, deps, wall_seconds, skipped=None):
+        # outputs[i] is the TaskOutput of crew.tasks[i], None if it was skipped
+        self.outputs = outputs
+        self.timeline = timeline
+        self.deps = deps
+        self.wall_seconds = wall_seconds
+        # {task position: why it did not run}
+        self.skipped = skipped or {}
+
+    def critical_path(self):
+        """
+        Returns (names, seconds) of the longest chain of dependent tasks,
+        which bounds the wall time no matter how many workers there are.
+        """
+        entries = {entry.index: entry for entry in self.timeline}
+        finish, previous = {}, {}
+
+        def _finish(i):
+            if i not in finish:
+                ran = [d for d in self.deps[i] if d in entries]
+                before = max(ran, key=_finish, default=None)
+                finish[i] = (0.0 if before is None else _finish(before)) + entries[i].seconds
+                previous[i] = before
+            return finish[i]
+
+        i = max(entries, key=_finish)
+        total, path = finish[i], []
+        while i is not None:
+            path.append(entries[i].name)
+            i = previous[i]
+        return path[::-1], total
+
+    def report(self, width=50):
+        """
+        Prints a text Gantt chart, the critical path and the time saved
+        against running the same tasks one after another.
+        """
+        sequential = sum(entry.seconds for entry in self.timeline)
+        scale = width / max(self.wall_seconds, 1e-9)
+        print("\n" + "="*80)
+        print("🗓️  TASK TIMELINE (█ compute, ░ waiting for approval):")
+        print("="*80)
+        for entry in sorted(self.timeline, key=lambda e: e.start):
+            bar = (" " * int(entry.start * scale)
+                   + "█" * max(1, int(entry.compute_seconds * scale))
+                   + "░" * int(entry.wait_seconds * scale))
+            print(f"{entry.name[:28]:28s} |{bar[:width]:{width}s}| "
+                  f"{entry.start:6.1f}s → {entry.end:6.1f}s ({entry.compute_seconds:.1f}s compute"
+                  + (f", {entry.wait_seconds:.1f}s approval" if entry.review else "") + ")")
+        path, path_seconds = self.critical_path()
+        print(f"\nCritical path: {' → '.join(path)} ({path_seconds:.1f}s)")
+        saved = sequential - self.wall_seconds
+        print(f"Wall clock {self.wall_seconds:.1f}s vs {sequential:.1f}s sequential: "
+              f"{saved:.1f}s saved ({saved / max(sequential, 1e-9):.0%})")
+        reviews = [entry.review for entry in self.timeline if entry.review]
+        if reviews:
+            compute = sum(entry.compute_seconds for entry in self.timeline)
+            waited = sum(review.wait_seconds for review in reviews)
+            print(f"Compute {compute:.1f}s, approval wait {waited:.1f}s")
+            for review in reviews:
+                revised = f", {review.revisions} revision(s)" if review.revisions else ""
+                print(f"   {review.name}: {review.status}{revised} ({'; '.join(review.reasons)})")
+        for _, reason in sorted(self.skipped.items()):
+            print(f"⏭️  {reason}")
+        print("="*80)
+
+
+class DagScheduler:
+    """
+    Runs a crew's tasks as a dependency graph instead of a fixed sequence.
+
+    Every task whose dependencies are done is kicked off at once as a
+    one-task Crew on a thread pool. Because a finished task keeps its
+    output, a dependent task reads it through its `context` exactly as it
+    would inside the full crew; tasks without a dependency between them
+    never wait for each other. With an Approver, a task's dependents only
+    start once its output is approved, while unrelated tasks keep running;
+    when it is rejected or the approval expires, its dependents (and theirs)
+    are skipped and listed in ScheduleResult.skipped.
+    """
+
+    def __init__(self, crew, max_workers=None, approver=None):
+        self.crew = crew
+        self.deps = dependencies(crew.tasks)
+        self.max_workers = max_workers or len(crew.tasks)
+        self.approver = approver
+
+    def _run_one(self, task, inputs):
+        solo = Crew(agents=[task.agent], tasks=[task], verbose=self.crew.verbose)
+        solo.kickoff(inputs=inputs)
+        return task.output
+
+    def kickoff(self, inputs):
+        """
+        Runs every task once its dependencies are done and returns a
+        ScheduleResult. The first failure stops new tasks from starting;
+        running ones are allowed to finish before it is re-raised. Tasks
+        that depend on an unapproved output are skipped.
+        """
+        tasks = self.crew.tasks
+        remaining = {i: set(deps) for i, deps in enumerate(self.deps)}
+        outputs, timeline, running, skipped = [None] * len(tasks), [], {}, {}
+        start = time.perf_counter()
+
+        def _timed(i):
+            began = time.perf_counter() - start
+            output = self._run_one(tasks[i], inputs)
+            review = None
+            if self.approver and self.approver.policy.reviews(_name(tasks[i])):
+                review = self.approver.review(_name(tasks[i]), tasks[i], inputs,
+                                              lambda task: self._run_one(task, inputs))
+                output = tasks[i].output
+            timeline.append(TimelineEntry(i, tasks[i], began, time.perf_counter() - start,
+                                          threading.current_thread().name, review))
+            return output, review
+
+        error = None
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix="dag") as pool:
+            while remaining or running:
+                if error is None:
+                    for i in [i for i, deps in remaining.items() if not deps]:
+                        del remaining[i]
+                        running[pool.submit(_timed, i)] = i
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                        continue
+                    outputs[i], review = future.result()
+                    if review is not None and not review.approved:
+                        self._skip_dependents(i, review.status, remaining, skipped)
+                        continue
+                    for deps in remaining.values():
+                        deps.discard(i)
+        if error is not None:
+            raise error
+        if remaining:
+            raise ValueError("task dependencies form a cycle: "
+                             + ", ".join(_name(tasks[i]) for i in remaining))
+        return ScheduleResult(outputs, timeline, self.deps, time.perf_counter() - start,
+                              skipped)
+
+    def _skip_dependents(self, index, status, remaining, skipped):
+        """
+        Drops every task waiting on index, directly or through another
+        dropped task, from remaining and records why in skipped.
+        """
+        blocked = {index}
+        reason = f"{_name(self.crew.tasks[index])} was {status}"
+        while True:
+            dropped = [i for i, deps in remaining.items() if deps & blocked]
+            if not dropped:
+                return
+            for i in dropped:
+                del remaining[i]
+                skipped[i] = f"{_name(self.crew.tasks[i])} not run: {reason}"
+                blocked.add(i)
@@ -0,0 +1,255 @@
+# pylint: disable=C0114
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any
+
+import requests
+from bs4 import BeautifulSoup
+from crewai_tools import ScrapeWebsiteTool
+
+SCRAPE_PREFIX = "The following text is scraped website content:\n\n"
+
+
+def extract_text(html):
+    """
+    Extracts page text the same way ScrapeWebsiteTool does.
+    """
+    parsed = BeautifulSoup(html, "html.parser")
+    text = parsed.get_text(" ")
+    text = re.sub("[ \t]+", " ", text)
+    text = re.sub("\\s+\n\\s+", "\n", text)
+    return text
+
+
+def _max_age(cache_control):
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return int(match.group(1)) if match else None
+
+
+class _Flight:
+    """
+    One in-progress fetch that concurrent callers for the same URL wait on.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ScrapeCache:
+    """
+    On-disk cache of extracted page text keyed by URL.
+
+    Text lives in one file per URL next to a sqlite index holding the ETag,
+    Last-Modified, expiry and last access of every entry. Expired entries
+    are revalidated with a conditional GET, so an unchanged page costs a
+    304 instead of a download and re-parse. When the stored text exceeds
+    max_bytes the least recently used entries are evicted. Concurrent
+    callers asking for the same URL share a single fetch.
+    """
+
+    def __init__(self, directory=".cache/scrape", ttl_seconds=6 * 3600,
+                 max_bytes=64 * 1024 * 1024, timeout=15, extract=extract_text):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.extract = extract
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0,
+                      "coalesced": 0, "fetches": 0, "stale_served": 0}
+        self._flights = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    file TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )""")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)")
+
+    def _connect(self):
+        conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _lookup(self, url):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT file, etag, last_modified, expires_at FROM pages WHERE url = ?",
+                (url,)).fetchone()
+        if row is None:
+            return None
+        try:
+            with open(self._path(row[0]), encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            return None
+        return {"file": row[0], "etag": row[1], "last_modified": row[2],
+                "expires_at": row[3], "text": text}
+
+    def get(self, url, headers=None):
+        """
+        Returns the extracted text of url, fetching only when needed.
+        """
+        entry = self._lookup(url)
+        if entry and time.time() < entry["expires_at"]:
+            self._count("hits")
+            self._touch(url)
+            return entry["text"]
+
+        with self._lock:
+            flight = self._flights.get(url)
+            leader = flight is None
+            if leader:
+                flight = self._flights[url] = _Flight()
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._fetch(url, entry, headers or {})
+        except Exception as exc:  # pylint: disable=broad-except
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[url]
+            flight.done.set()
+        return flight.result
+
+    def _fetch(self, url, entry, headers):
+        request_headers = dict(headers)
+        if entry:
+            if entry["etag"]:
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        self._count("fetches")
+        try:
+            response = requests.get(url, headers=request_headers, timeout=self.timeout)
+        except requests.RequestException:
+            if entry:
+                # Better a slightly stale page than a failed tool call
+                self._count("stale_served")
+                return entry["text"]
+            raise
+
+        ttl = _max_age(response.headers.get("Cache-Control"))
+        ttl = self.ttl_seconds if ttl is None else ttl
+        now = time.time()
+
+        if response.status_code == 304 and entry:
+            self._count("revalidated")
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "UPDATE pages SET expires_at = ?, last_access = ? WHERE url = ?",
+                    (now + ttl, now, url))
+            return entry["text"]
+
+        response.raise_for_status()
+        self._count("misses")
+        response.encoding = response.apparent_encoding
+        text = self.extract(response.text)
+        self._store(url, text, response.headers, now, ttl)
+        return text
+
+    def _store(self, url, text, headers, now, ttl):
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest() + ".txt"
+        tmp = self._path(f"{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, self._path(name))
+
+        size = len(text.encode("utf-8"))
+        last_modified = headers.get("Last-Modified")
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, file, etag, last_modified, size, fetched_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, name, headers.get("ETag"), last_modified, size, now, now + ttl, now))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, name, size in conn.execute(
+                "SELECT url, file, size FROM pages ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+            total -= size
+
+    def _touch(self, url):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("UPDATE pages SET last_access = ? WHERE url = ?",
+                         (time.time(), url))
+
+    def report(self):
+        """
+        Prints the cache counters for this process.
+        """
+        s = self.stats
+        lookups = s["hits"] + s["misses"] + s["revalidated"] + s["coalesced"]
+        ratio = (lookups - s["misses"]) / lookups if lookups else 0.0
+        print(f"🗂️  Scrape cache: {s['hits']} hits, {s['revalidated']} revalidated (304), "
+              f"{s['coalesced']} coalesced, {s['misses']} downloads "
+              f"({ratio:.0%} served without a download)")
+
+
+_default_cache = None
+
+
+def default_scrape_cache():
+    """
+    Returns the process-wide cache under .cache/scrape.
+    """
+    global _default_cache  # pylint: disable=global-statement
+    if _default_cache is None:
+        _default_cache = ScrapeCache(os.getenv("SCRAPE_CACHE_DIR", ".cache/scrape"))
+    return _default_cache
+
+
+class CachedScrapeWebsiteTool(ScrapeWebsiteTool):
+    """
+    ScrapeWebsiteTool that serves pages through a ScrapeCache.
+    """
+
+    cache: Any = None
+
+    def _run(self, **kwargs):
+        website_url = kwargs.get("website_url", self.website_url)
+        cache = self.cache or default_scrape_cache()
+        return SCRAPE_PREFIX + cache.get(website_url, headers=getattr(self, "headers", None))
@@ -0,0 +1,291 @@
+# pylint: disable=C0114
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from typing import Any
+
+from crewai_tools import SerperDevTool
+from pydantic import Field
+
+# (pattern, seconds): the first pattern found in a query sets its TTL.
+# Prices and news go stale within the trading day; background facts don't.
+DEFAULT_TTL_RULES = (
+    (r"\b(news|today|latest|breaking|live|now|price|quote|earnings)\b", 15 * 60),
+    (r"\b(this week|upcoming|schedule|forecast)\b", 6 * 3600),
+)
+
+
+def coerce_query(search_query):
+    """
+    The query as a plain string. Agents sometimes pass the tool input as a
+    dict, usually {"description": ...}.
+    """
+    if isinstance(search_query, dict):
+        for key in ("description", "search_query", "query", "q"):
+            if isinstance(search_query.get(key), str):
+                return search_query[key]
+        return str(search_query)
+    return "" if search_query is None else str(search_query)
+
+
+def normalize_query(query):
+    """
+    Cache key form of a query: lowercased, whitespace collapsed, outer
+    quotes and trailing punctuation dropped.
+    """
+    query = re.sub(r"\s+", " ", coerce_query(query)).strip().lower()
+    return query.strip("'\"").rstrip("?.! ")
+
+
+class _Flight:
+    """
+    One in-progress search that concurrent callers with the same query
+    wait on.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SearchCache:
+    """
+    Persistent cache of search results keyed by normalized query.
+
+    Results live in a sqlite database that every process using the same
+    directory shares. Each entry expires after a TTL picked per query from
+    ttl_rules (news and price queries expire quickly). Identical searches
+    in flight are run once: threads of one process wait on the same call,
+    and other processes wait on a short lease held by the process making
+    the call instead of calling Serper themselves. When a call fails and an
+    expired entry exists, the stale result is served.
+    """
+
+    def __init__(self, directory=".cache/search", ttl_seconds=24 * 3600,
+                 ttl_rules=DEFAULT_TTL_RULES, lease_seconds=30, poll_seconds=0.05):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.ttl_rules = [(re.compile(pattern), seconds) for pattern, seconds in ttl_rules]
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.stats = {"lookups": 0, "hits": 0, "coalesced": 0, "waited": 0,
+                      "calls": 0, "stale_served": 0,
+                      "hit_seconds": 0.0, "wait_seconds": 0.0, "call_seconds": 0.0}
+        self._owner = uuid.uuid4().hex
+        self._flights = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS searches (
+                    key TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )""")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS leases (
+                    key TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )""")
+
+    def _connect(self):
+        conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def ttl_for(self, query, params=None):
+        """
+        Seconds a result for query stays fresh.
+        """
+        if (params or {}).get("search_type") == "news":
+            return self.ttl_rules[0][1] if self.ttl_rules else self.ttl_seconds
+        for pattern, seconds in self.ttl_rules:
+            if pattern.search(query):
+                return seconds
+        return self.ttl_seconds
+
+    @staticmethod
+    def key(query, params=None):
+        """
+        Cache key of a normalized query and the search parameters.
+        """
+        raw = json.dumps([query, params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT result, expires_at FROM searches WHERE key = ?",
+                               (key,)).fetchone()
+        return None if row is None else (json.loads(row[0]), row[1])
+
+    def get(self, query, fetch, params=None):
+        """
+        Returns the result for query, calling fetch() only when no fresh
+        result is stored or being fetched.
+        """
+        start = time.perf_counter()
+        query = normalize_query(query)
+        key = self.key(query, params)
+        self._count("lookups")
+        entry = self._lookup(key)
+        if entry and time.time() < entry[1]:
+            self._count("hits")
+            self._count("hit_seconds", time.perf_counter() - start)
+            return entry[0]
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            self._count("wait_seconds", time.perf_counter() - start)
+            return flight.result
+
+        try:
+            flight.result = self._fetch_shared(key, query, params or {}, fetch, entry)
+        except Exception as exc:  # pylint: disable=broad-except
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def _acquire(self, key):
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM leases WHERE key = ? AND expires_at < ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self._owner, now + self.lease_seconds))
+            return cursor.rowcount == 1
+
+    def _release(self, key):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self._owner))
+
+    def _fetch_shared(self, key, query, params, fetch, entry):
+        start = time.perf_counter()
+        while not self._acquire(key):
+            # Another process is calling Serper for this query
+            time.sleep(self.poll_seconds)
+            fresh = self._lookup(key)
+            if fresh and time.time() < fresh[1]:
+                self._count("waited")
+                self._count("wait_seconds", time.perf_counter() - start)
+                return fresh[0]
+        try:
+            # The lease holder may have stored the result just before releasing
+            fresh = self._lookup(key)
+            if fresh and time.time() < fresh[1]:
+                self._count("waited")
+                self._count("wait_seconds", time.perf_counter() - start)
+                return fresh[0]
+            self._count("calls")
+            try:
+                result = fetch()
+            except Exception:  # pylint: disable=broad-except
+                if entry:
+                    # Better a stale result than a failed tool call
+                    self._count("stale_served")
+                    return entry[0]
+                raise
+            finally:
+                self._count("call_seconds", time.perf_counter() - start)
+            now = time.time()
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO searches "
+                    "(key, query, params, result, fetched_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, query, json.dumps(params, sort_keys=True, default=str),
+                     json.dumps(result, default=str), now, now + self.ttl_for(query, params)))
+            return result
+        finally:
+            self._release(key)
+
+    def purge(self):
+        """
+        Deletes expired entries. Returns how many were removed.
+        """
+        with closing(self._connect()) as conn, conn:
+            return conn.execute("DELETE FROM searches WHERE expires_at < ?",
+                                (time.time(),)).rowcount
+
+    def report(self):
+        """
+        Prints hit ratio, Serper calls saved and latency for this process.
+        """
+        s = dict(self.stats)
+        served = s["lookups"] - s["calls"]
+        ratio = served / s["lookups"] if s["lookups"] else 0.0
+        waits = s["coalesced"] + s["waited"]
+        call_ms = s["call_seconds"] / s["calls"] * 1000 if s["calls"] else 0.0
+        hit_ms = s["hit_seconds"] / s["hits"] * 1000 if s["hits"] else 0.0
+        wait_ms = s["wait_seconds"] / waits * 1000 if waits else 0.0
+        print(f"🔎 Search cache: {s['lookups']} searches, {s['hits']} hits, "
+              f"{s['coalesced']} coalesced, {s['waited']} from other processes, "
+              f"{s['calls']} Serper calls ({ratio:.0%} hit ratio, {served} calls saved)")
+        print(f"   latency: {hit_ms:.1f} ms per hit, {wait_ms:.1f} ms per coalesced wait, "
+              f"{call_ms:.1f} ms per Serper call"
+              + (f", {s['stale_served']} stale results served" if s["stale_served"] else ""))
+
+
+_default_cache = None
+
+
+def default_search_cache():
+    """
+    Returns the process-wide cache under .cache/search.
+    """
+    global _default_cache  # pylint: disable=global-statement
+    if _default_cache is None:
+        _default_cache = SearchCache(os.getenv("SEARCH_CACHE_DIR", ".cache/search"))
+    return _default_cache
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """
+    SerperDevTool that accepts dict queries and serves searches through a
+    SearchCache. SERPER_BASE_URL points it at another endpoint, e.g. the
+    fake server in utils/fake_serper.py.
+    """
+
+    cache: Any = None
+    base_url: str = Field(
+        default_factory=lambda: os.getenv("SERPER_BASE_URL", "https://google.serper.dev"))
+
+    def _run(self, *args, **kwargs):
+        if args:
+            kwargs.setdefault("search_query", args[0])
+        query = coerce_query(kwargs.pop("search_query", None) or kwargs.pop("query", None))
+        kwargs["search_query"] = query
+        params = {"search_type": kwargs.get("search_type", self.search_type),
+                  "n_results": self.n_results, "country": self.country,
+                  "location": self.location, "locale": self.locale}
+        cache = self.cache or default_search_cache()
+        run = super()._run
+        return cache.get(query, lambda: run(**kwargs), params)
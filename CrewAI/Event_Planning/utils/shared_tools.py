@@ -0,0 +1,131 @@
+# pylint: disable=C0114
+import json
+import re
+import threading
+from typing import Any
+
+from utils.scrape_cache import CachedScrapeWebsiteTool
+from utils.search_cache import CachedSerperDevTool, coerce_query
+
+
+def _normalize(value):
+    """
+    A normalized copy of value for use in keys; value itself is unchanged.
+    """
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().lower()
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    return value
+
+
+class _Flight:
+    """
+    One in-progress tool call that concurrent callers with the same
+    arguments wait on.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ToolMemo:
+    """
+    Tool results shared by the events of one group (same city and topic).
+
+    The first call with given arguments runs the tool; every later call
+    with the same arguments (search queries compared ignoring case and
+    whitespace) gets the stored result. Concurrent identical calls share
+    one run. Only successful results are kept.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.stats = {"calls": 0, "runs": 0, "shared": 0}
+        self._results = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def call(self, tool_name, arguments, run, normalize=True):
+        """
+        Returns run() for (tool_name, arguments), running it at most once.
+        Only the key is normalized; run() keeps the arguments exactly as the
+        agent wrote them. normalize=False keys on the exact arguments, e.g.
+        case-sensitive URLs.
+        """
+        key_arguments = _normalize(arguments) if normalize else arguments
+        key = (tool_name, json.dumps(key_arguments, sort_keys=True, default=str))
+        with self._lock:
+            self.stats["calls"] += 1
+            if key in self._results:
+                self.stats["shared"] += 1
+                return self._results[key]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.stats["runs"] += 1
+            else:
+                self.stats["shared"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = run()
+            with self._lock:
+                self._results[key] = flight.result
+            return flight.result
+        except Exception as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def report(self):
+        """
+        Prints the tool calls made and the ones answered from the group.
+        """
+        s = dict(self.stats)
+        print(f"🔁 {self.name}: {s['calls']} tool calls, {s['runs']} run, "
+              f"{s['shared']} shared")
+
+
+class SharedSerperDevTool(CachedSerperDevTool):
+    """
+    CachedSerperDevTool whose searches are shared through a ToolMemo, on
+    top of the persistent SearchCache.
+    """
+
+    memo: Any = None
+
+    def _run(self, *args, **kwargs):
+        if args:
+            kwargs.setdefault("search_query", args[0])
+        query = kwargs.get("search_query") or kwargs.pop("query", None)
+        kwargs["search_query"] = coerce_query(query)
+        # The memo keys on a normalized copy; Serper gets the original query
+        arguments = dict(kwargs)
+        run = super()._run
+        return self.memo.call(self.name, arguments, lambda: run(**kwargs))
+
+
+class SharedScrapeWebsiteTool(CachedScrapeWebsiteTool):
+    """
+    CachedScrapeWebsiteTool whose scrapes are shared through a ToolMemo,
+    on top of the on-disk ScrapeCache.
+    """
+
+    memo: Any = None
+
+    def _run(self, **kwargs):
+        run = super()._run
+        kwargs.setdefault("website_url", self.website_url)
+        return self.memo.call(self.name, kwargs, lambda: run(**kwargs), normalize=False)
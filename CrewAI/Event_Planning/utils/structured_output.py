@@ -0,0 +1,256 @@
+# pylint: disable=C0114
+import json
+import re
+import threading
+import time
+from typing import Any, Tuple, get_args, get_origin
+
+from pydantic import ValidationError
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_UNQUOTED_KEY = re.compile(r"([{,]\s*)([A-Za-z_][\w\- ]*?)\s*:")
+# "//" comments, but not the ones in "https://"
+_LINE_COMMENT = re.compile(r"(?m)(?<![:\\])//[^\n]*$")
+# 'value' after a delimiter, so apostrophes inside words are left alone
+_SINGLE_QUOTED = re.compile(r"(?<=[\s:{,\[])'([^'\n]*)'")
+_NUMBER = re.compile(r"-?\d[\d,]*(?:\.\d+)?\s*[kK]?\b")
+# Bare value "1,000" or "1000 guests" before the next delimiter
+_BARE_NUMBER = re.compile(
+    r"(:\s*)(-?\d{1,3}(?:,\d{3})+(?:\.\d+)?|-?\d+(?:\.\d+)?)"
+    r"(?:[ \t]+[A-Za-z][A-Za-z .%/-]*?)?(?=[ \t]*[,}\]\n])")
+
+
+def _outermost_object(text):
+    """
+    The first balanced {...} in text (quotes respected), or None.
+    """
+    start = text.find("{")
+    while start != -1:
+        depth, quote, escaped = 0, None, False
+        for i in range(start, len(text)):
+            char = text[i]
+            if quote:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == quote:
+                    quote = None
+            elif char in "\"'":
+                quote = char
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    return text[start:i + 1]
+        start = text.find("{", start + 1)
+    return None
+
+
+def repair_json(text):
+    """
+    Parses the JSON object in an LLM answer, tolerating code fences, prose
+    around it, smart or single quotes, unquoted keys, trailing commas,
+    // comments, Python literals and bare numbers with thousands separators
+    or unit words ("capacity": 1,000 guests). Returns (dict, repaired) where
+    repaired says whether any fix was needed, or (None, True).
+    """
+    text = str(text or "")
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            return data, False
+    except ValueError:
+        pass
+
+    fenced = _FENCE.search(text)
+    candidate = _outermost_object(fenced.group(1) if fenced else text)
+    if candidate is None:
+        return None, True
+    fixes = [
+        lambda s: s,
+        lambda s: s.translate(str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})),
+        lambda s: _LINE_COMMENT.sub("", s),
+        lambda s: _TRAILING_COMMA.sub(r"\1", s),
+        lambda s: _UNQUOTED_KEY.sub(lambda m: f'{m.group(1)}"{m.group(2).strip()}":', s),
+        lambda s: re.sub(r"\bTrue\b", "true", re.sub(r"\bFalse\b", "false",
+                                                     re.sub(r"\bNone\b", "null", s))),
+        lambda s: _SINGLE_QUOTED.sub(lambda m: json.dumps(m.group(1)), s),
+        lambda s: _BARE_NUMBER.sub(lambda m: m.group(1) + m.group(2).replace(",", ""), s),
+    ]
+    # Apply the fixes cumulatively, trying to parse after each one
+    for fix in fixes:
+        candidate = fix(candidate)
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data, True
+    return None, True
+
+
+def response_format(model, mode="json_schema"):
+    """
+    OpenAI-style response_format for an LLM that should answer with model.
+    "json_schema" constrains decoding to the schema itself (Ollama, OpenAI);
+    "json_object" only guarantees syntactically valid JSON (Groq JSON mode).
+    """
+    if mode == "json_object":
+        return {"type": "json_object"}
+    return {"type": "json_schema",
+            "json_schema": {"name": model.__name__, "schema": model.model_json_schema()}}
+
+
+def _key(name):
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+
+def _to_number(value, kind):
+    if isinstance(value, bool):
+        raise ValueError("not a number")
+    if isinstance(value, (int, float)):
+        return kind(round(value)) if kind is int else kind(value)
+    match = _NUMBER.search(str(value))
+    if not match:
+        raise ValueError(f"no number in {value!r}")
+    token = match.group(0).replace(",", "").strip()
+    thousands = token[-1] in "kK"
+    number = float(token.rstrip("kK").strip()) * (1000 if thousands else 1)
+    return kind(round(number)) if kind is int else kind(number)
+
+
+def coerce(data, model):
+    """
+    Maps keys to model's fields ignoring case and punctuation ("Capacity",
+    "booking-status") and coerces values to the field types, e.g.
+    "1,000 guests" -> 1000 for an int field. Unknown keys are dropped.
+    """
+    by_key = {_key(k): v for k, v in data.items()}
+    coerced = {}
+    for name, field in model.model_fields.items():
+        if _key(name) not in by_key:
+            continue
+        value = by_key[_key(name)]
+        kind = field.annotation
+        if get_origin(kind) is not None:  # Optional[int] and friends
+            kind = next((a for a in get_args(kind) if a is not type(None)), kind)
+        try:
+            if kind in (int, float):
+                value = _to_number(value, kind)
+            elif kind is str and value is not None:
+                value = str(value).strip()
+            elif kind is bool and isinstance(value, str):
+                value = value.strip().lower() in ("true", "yes", "y", "1")
+        except ValueError:
+            pass  # leave it for validation to report
+        coerced[name] = value
+    return coerced
+
+
+class StructuredOutput:
+    """
+    Task guardrail that turns an agent's answer into a valid `model` JSON
+    object with as few LLM round trips as possible.
+
+    1. Tolerant local repair and type coercion of the answer (no LLM).
+    2. Otherwise one call to `llm`, which should be created with a
+       response_format (JSON schema or JSON mode) so the backend constrains
+       decoding to valid JSON.
+    3. Only if both fail is the guardrail failed, which makes CrewAI
+       re-prompt the agent with the validation error.
+
+    On success the task's raw output becomes the canonical JSON string.
+    Per-task counts and timings are kept for report().
+    """
+
+    def __init__(self, model, llm=None, name=None):
+        self.model = model
+        self.llm = llm
+        self.name = name or model.__name__
+        self.stats = {"outputs": 0, "valid": 0, "repaired": 0, "constrained": 0,
+                      "conversion_calls": 0, "reprompts": 0, "local_seconds": 0.0,
+                      "llm_seconds": 0.0}
+        self._lock = threading.Lock()
+
+    def _validate(self, data):
+        if data is None:
+            return None, "no JSON object found"
+        try:
+            return self.model.model_validate(coerce(data, self.model)), None
+        except ValidationError as exc:
+            return None, "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}"
+                                   for e in exc.errors())
+
+    def _constrained(self, raw):
+        schema = json.dumps(self.model.model_json_schema())
+        with self._lock:
+            self.stats["conversion_calls"] += 1
+        answer = self.llm.call([
+            {"role": "system", "content": (
+                "Convert the user's text into a single JSON object matching this JSON "
+                f"schema. Output JSON only.\n{schema}")},
+            {"role": "user", "content": str(raw)},
+        ])
+        return repair_json(answer)[0]
+
+    def _count(self, outcome, seconds_key=None, seconds=0.0):
+        with self._lock:
+            self.stats[outcome] += 1
+            if seconds_key:
+                self.stats[seconds_key] += seconds
+
+    def __call__(self, output) -> Tuple[bool, Any]:
+        raw = getattr(output, "raw", output)
+        with self._lock:
+            self.stats["outputs"] += 1
+        start = time.perf_counter()
+        data, repaired = repair_json(raw)
+        model, error = self._validate(data)
+        local = time.perf_counter() - start
+        if model is not None:
+            repaired = repaired or coerce(data, self.model) != data
+            self._count("repaired" if repaired else "valid", "local_seconds", local)
+            print(f"🧩 {self.name}: {'repaired locally' if repaired else 'valid JSON'} "
+                  f"in {local * 1000:.1f} ms")
+            return True, model.model_dump_json()
+
+        if self.llm is not None:
+            start = time.perf_counter()
+            try:
+                model, error = self._validate(self._constrained(raw))
+            except Exception as exc:  # pylint: disable=broad-except
+                model, error = None, f"constrained decoding failed: {exc}"
+            seconds = time.perf_counter() - start
+            if model is not None:
+                self._count("constrained", "llm_seconds", seconds)
+                print(f"🧩 {self.name}: converted with constrained decoding in {seconds:.1f}s")
+                return True, model.model_dump_json()
+            with self._lock:
+                self.stats["llm_seconds"] += seconds
+
+        self._count("reprompts")
+        print(f"🧩 {self.name}: invalid output, re-prompting the agent ({error})")
+        return False, (f"Your answer is not a valid {self.name} JSON object ({error}). "
+                       "Answer with only a JSON object matching this schema: "
+                       f"{json.dumps(self.model.model_json_schema())}")
+
+    def report(self):
+        """
+        Prints how each output was obtained, the conversion LLM calls and
+        agent re-prompts actually made, and the latency saved by local
+        repair.
+        """
+        s = dict(self.stats)
+        if not s["outputs"]:
+            return
+        calls = s["conversion_calls"]
+        per_call = s["llm_seconds"] / calls if calls else None
+        saved = (f", ~{s['repaired'] * per_call:.1f}s saved by local repair "
+                 f"({per_call:.1f}s per LLM conversion)" if per_call and s["repaired"] else "")
+        print(f"🧩 {self.name}: {s['outputs']} outputs checked: {s['valid']} valid, "
+              f"{s['repaired']} repaired locally ({s['local_seconds'] * 1000:.1f} ms), "
+              f"{s['constrained']} via constrained decoding; {calls} conversion calls, "
+              f"{s['reprompts']} re-prompts{saved}")
@@ -0,0 +1,228 @@
+# pylint: disable=C0114
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Optional, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+
+def city_from_address(address):
+    """
+    The city of a "street, city, state zip" address, or None.
+    """
+    parts = [part.strip() for part in (address or "").split(",")]
+    return parts[-2] if len(parts) >= 3 else None
+
+
+class VenueCatalog:
+    """
+    Local catalog of venues found (and validated) by earlier runs.
+
+    Venues are indexed by city, capacity and venue type so a lookup for
+    "a conference hall in San Francisco for 500 people" is a single index
+    range scan. Booking status is date-specific, so it is kept per venue
+    and event date and only reused for the same date within
+    availability_ttl seconds; other dates read as "unknown". The catalog
+    also counts its hits and misses and the web searches the venue agent
+    made on misses, to estimate the Serper calls each hit avoids.
+    """
+
+    def __init__(self, path=".cache/venues.sqlite", max_oversize=4.0,
+                 availability_ttl=24 * 3600):
+        self.path = path
+        self.max_oversize = max_oversize
+        self.availability_ttl = availability_ttl
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS venues (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL COLLATE NOCASE,
+                    address TEXT NOT NULL,
+                    city TEXT NOT NULL COLLATE NOCASE,
+                    venue_type TEXT COLLATE NOCASE,
+                    capacity INTEGER NOT NULL,
+                    source TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    UNIQUE (name, city)
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS venues_city_capacity "
+                         "ON venues (city, capacity)")
+            conn.execute("CREATE INDEX IF NOT EXISTS venues_city_type_capacity "
+                         "ON venues (city, venue_type, capacity)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS availability (
+                    venue_id INTEGER NOT NULL REFERENCES venues (id) ON DELETE CASCADE,
+                    date TEXT NOT NULL,
+                    booking_status TEXT NOT NULL,
+                    checked_at REAL NOT NULL,
+                    PRIMARY KEY (venue_id, date)
+                )""")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )""")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _bump(self, conn, name, amount=1):
+        conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, amount))
+
+    def __len__(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM venues").fetchone()[0]
+
+    def add(self, details, city=None, venue_type=None, source=None, date=None):
+        """
+        Inserts or refreshes one VenueDetails-shaped dict. city defaults to
+        the one in the address. Its booking_status is recorded for date
+        only, and not at all without one. Returns False when the venue has
+        no usable city or capacity.
+        """
+        city = city or city_from_address(details.get("address"))
+        try:
+            capacity = int(details.get("capacity"))
+        except (TypeError, ValueError):
+            return False
+        if not city or not details.get("name") or capacity <= 0:
+            return False
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO venues (name, address, city, venue_type, capacity, "
+                "source, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (name, city) DO UPDATE SET address = excluded.address, "
+                "venue_type = COALESCE(excluded.venue_type, venue_type), "
+                "capacity = excluded.capacity, "
+                "source = excluded.source, updated_at = excluded.updated_at",
+                (details["name"], details.get("address", ""), city, venue_type, capacity,
+                 source, now, now))
+            status = str(details.get("booking_status") or "").strip().lower()
+            if date and status:
+                venue_id = conn.execute("SELECT id FROM venues WHERE name = ? AND city = ?",
+                                        (details["name"], city)).fetchone()[0]
+                conn.execute(
+                    "INSERT OR REPLACE INTO availability (venue_id, date, booking_status, "
+                    "checked_at) VALUES (?, ?, ?, ?)", (venue_id, str(date), status, now))
+        return True
+
+    def find(self, city, min_capacity, venue_type=None, limit=5, date=None):
+        """
+        Venues in city seating at least min_capacity (and at most
+        max_oversize times that), smallest first. A venue_type match is
+        preferred but not required. booking_status is the one recorded for
+        date within availability_ttl, else "unknown". Returns a list of
+        dicts.
+        """
+        max_capacity = int(min_capacity * self.max_oversize)
+        checked_after = time.time() - self.availability_ttl
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT name, address, city, venue_type, capacity, "
+                "COALESCE(a.booking_status, 'unknown'), updated_at FROM venues "
+                "LEFT JOIN availability a ON a.venue_id = venues.id AND a.date = ? "
+                "AND a.checked_at >= ? "
+                "WHERE city = ? AND capacity BETWEEN ? AND ? "
+                "ORDER BY (venue_type = ?) DESC, capacity LIMIT ?",
+                (str(date) if date else None, checked_after, city, int(min_capacity),
+                 max_capacity, venue_type, limit)).fetchall()
+        keys = ("name", "address", "city", "venue_type", "capacity", "booking_status",
+                "updated_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def lookup(self, city, min_capacity, venue_type=None, limit=5, date=None):
+        """
+        find() that also counts a catalog hit or miss.
+        """
+        venues = self.find(city, min_capacity, venue_type, limit, date)
+        with self._lock, closing(self._connect()) as conn, conn:
+            self._bump(conn, "hits" if venues else "misses")
+        return venues
+
+    def record_web_searches(self, count):
+        """
+        Records how many web searches the venue agent ran on a miss.
+        """
+        with self._lock, closing(self._connect()) as conn, conn:
+            self._bump(conn, "web_searches", count)
+
+    def stats(self):
+        """
+        Returns lifetime hits, misses, hit ratio, web searches per miss and
+        the estimated Serper calls avoided by hits.
+        """
+        with closing(self._connect()) as conn:
+            counts = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+        hits, misses = counts.get("hits", 0), counts.get("misses", 0)
+        per_miss = counts.get("web_searches", 0) / misses if misses else None
+        return {
+            "venues": len(self),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "searches_per_miss": per_miss,
+            "searches_avoided": hits * per_miss if per_miss is not None else None,
+        }
+
+    def report(self):
+        """
+        Prints the hit ratio and the Serper calls avoided.
+        """
+        s = self.stats()
+        avoided = (f", ~{s['searches_avoided']:.0f} Serper calls avoided "
+                   f"({s['searches_per_miss']:.1f} per miss)"
+                   if s["searches_avoided"] is not None else "")
+        print(f"🏛️  Venue catalog: {s['venues']} venues, {s['hits']} hits / "
+              f"{s['misses']} misses ({s['hit_ratio']:.0%}){avoided}")
+
+
+class VenueQuery(BaseModel):
+    """Input schema for VenueCatalogTool."""
+    city: str = Field(..., description="City the event takes place in")
+    min_capacity: int = Field(..., description="Number of participants the venue must seat")
+    venue_type: Optional[str] = Field(None, description="Preferred venue type, e.g. 'Conference Hall'")
+    date: Optional[str] = Field(None, description="Event date (YYYY-MM-DD) to report availability for")
+
+
+class VenueCatalogTool(BaseTool):
+    """
+    Lets the venue agent pick from venues validated by earlier runs. Set
+    web_search when the agent also has a web search tool to fall back on.
+    """
+
+    name: str = "Search Venue Catalog"
+    description: str = (
+        "Looks up venues validated by earlier events, by city, minimum "
+        "capacity, venue type and event date. Returns JSON venue records; "
+        "booking_status is 'unknown' when availability on that date has not "
+        "been checked."
+    )
+    args_schema: Type[BaseModel] = VenueQuery
+    catalog: Any = None
+    web_search: bool = False
+
+    def _run(self, city: str, min_capacity: int, venue_type: Optional[str] = None,
+             date: Optional[str] = None) -> str:
+        venues = self.catalog.find(city, min_capacity, venue_type, date=date)
+        if not venues:
+            if self.web_search:
+                return "No catalog venue matches; search the web instead."
+            return ("No catalog venue matches. Retry with the event's city and "
+                    "participant count exactly as given; if nothing matches, answer "
+                    "that no catalog venue fits.")
+        for venue in venues:
+            venue.pop("updated_at", None)
+        return json.dumps(venues, indent=2)
@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import time
+from main import APPROVAL_RULES, EVENT_DETAILS, build_crew, remember_venue, seed_catalog
+from utils.approvals import ApprovalPolicy, ApprovalQueue, Approver
+from utils.venue_catalog import VenueCatalog
+
+# Checks that a venue seeded from an older venue_details.json, which carries
+# no event date, is still usable: on the catalog hit the venue agent gets the
+# web tools to confirm the date, a confirmed answer is approved without
+# waiting for a person, and the confirmed date is then served from the
+# catalog alone. No network access or LLM calls needed.
+
+SEEDED = {"name": "Moscone Center", "address": "747 Howard St, San Francisco, CA 94103",
+          "capacity": 1000, "booking_status": "available"}
+
+
+class FakeTool:
+    """Stand-in search or scrape tool; only its name is read."""
+
+    def __init__(self, name):
+        self.name = name
+
+
+class Answer:
+    """Stand-in TaskOutput holding the venue agent's final answer."""
+
+    def __init__(self, details):
+        self.raw = json.dumps(details)
+        self.json_dict = details
+        self.pydantic = None
+
+
+class VenueTask:
+    """Stand-in venue task as the DAG scheduler hands it to the Approver."""
+
+    def __init__(self, output):
+        self.output = output
+
+
+def venue_tools(crew):
+    """Names of the tools given to the venue task's agent."""
+    return [tool.name for tool in crew.tasks[0].agent.tools]
+
+
+def main():
+    search, scrape = FakeTool("Search the internet"), FakeTool("Read website content")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            with open("venue_details.json", "w") as f:
+                json.dump(SEEDED, f)
+            catalog = VenueCatalog(os.path.join(tmp, "venues.sqlite"))
+            seed_catalog(catalog)
+        finally:
+            os.chdir(cwd)
+
+        date = EVENT_DETAILS["tentative_date"]
+        venues = catalog.lookup("San Francisco", EVENT_DETAILS["expected_participants"],
+                                EVENT_DETAILS["venue_type"], date=date)
+        assert venues and venues[0]["booking_status"] == "unknown", venues
+
+        crew = build_crew(catalog, venues, search_tool=search, scrape_tool=scrape)
+        assert venue_tools(crew) == ["Search Venue Catalog", search.name, scrape.name], \
+            "a seeded hit must be able to confirm the date"
+
+        # The agent confirmed the date on the web and answered 'available'
+        queue = ApprovalQueue(os.path.join(tmp, "approvals.sqlite"))
+        approver = Approver(ApprovalPolicy(APPROVAL_RULES), queue, timeout=1, poll_seconds=0.1)
+        task = VenueTask(Answer(SEEDED))
+        review = approver.review("venue_task", task, EVENT_DETAILS, run=None)
+        assert review.status == "auto-approved", review.reasons
+        assert not queue.pending() and review.wait_seconds == 0, "sent to review"
+
+        assert remember_venue(catalog, task.output, review)
+        venues = catalog.lookup("San Francisco", EVENT_DETAILS["expected_participants"],
+                                EVENT_DETAILS["venue_type"], date=date)
+        assert venues[0]["booking_status"] == "available", venues
+        crew = build_crew(catalog, venues, search_tool=search, scrape_tool=scrape)
+        assert venue_tools(crew) == ["Search Venue Catalog"], "checked date needs no web"
+
+        catalog.report()
+        print("✅ seeded catalog hits are confirmed and approved without review")
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    main()
+    print(f"done in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,68 @@
+"""Benchmark the vectorized backtesting engine behind the 'Backtest Strategy' tool.
+
+Writes several years of synthetic minute bars to a temporary memory-mapped
+store and reports backtests per second for a single backtest (cold and with
+a warm indicator cache) and for a parameter sweep run in one process and
+across a process pool.
+
+Usage:
+    python bench_backtest.py [--years 3] [--processes 4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from utils.backtest import Strategy, _Context, backtest, parameter_grid, sweep
+from utils.market_data import OHLCVStore, synthetic_bars
+
+ENTRY = "rsi(14) < lower and close > sma(trend)"
+EXIT = "rsi(14) > upper or close crosses below ema(50)"
+RISK = "stop_loss = 1%; take_profit = 3 * atr(14); max_hold = 390; cost_bps = 1"
+GRID = {"lower": [20, 25, 30, 35], "upper": [60, 65, 70, 75], "trend": [100, 200, 400]}
+
+
+def main():
+    """Run the benchmark and print backtests per second."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=float, default=3.0)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    n = int(args.years * 252 * 390)  # regular-session minute bars
+    strategy = Strategy(ENTRY, EXIT, RISK)
+    combos = parameter_grid(GRID)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        OHLCVStore(tmp).write("BENCH", synthetic_bars(n))
+        bars = OHLCVStore(tmp).bars("BENCH")
+        params = {"lower": 30, "upper": 70, "trend": 200}
+
+        start = time.perf_counter()
+        result = backtest(bars, strategy, params)
+        cold = time.perf_counter() - start
+
+        context = _Context(bars)
+        backtest(bars, strategy, params, context)
+        start = time.perf_counter()
+        for _ in range(5):
+            backtest(bars, strategy, params, context)
+        warm = (time.perf_counter() - start) / 5
+
+        timings = {}
+        for processes in sorted({1, args.processes}):
+            start = time.perf_counter()
+            sweep(tmp, "BENCH", strategy, GRID, processes=processes)
+            timings[processes] = time.perf_counter() - start
+
+    print(f"{n} minute bars (~{args.years:g} years), {result['trades']} trades per backtest")
+    print(f"single backtest, cold:        {cold * 1000:8.1f} ms  ({1 / cold:7.1f} backtests/s)")
+    print(f"single backtest, warm cache:  {warm * 1000:8.1f} ms  ({1 / warm:7.1f} backtests/s)")
+    for processes, seconds in timings.items():
+        print(f"sweep of {len(combos)}, {processes:2d} process(es): {seconds:6.2f}s  "
+              f"({len(combos) / seconds:7.1f} backtests/s, "
+              f"{timings[1] / seconds:.2f}x vs 1 process)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Benchmark the content extraction behind the cached 'Read website content' tool.
+
+Times the old whole-page text extraction (BeautifulSoup get_text, what
+ScrapeWebsiteTool returns) against extract_main_text, which drops
+navigation, sidebars, ads and other boilerplate and keeps the main text and
+tables, then counts the tokens each leaves for the agent before and after
+the per-tool truncation budget. Pages come from a directory of saved .html
+files, or are generated news-style pages when none is given.
+
+Usage:
+    python bench_extraction.py [--pages DIR] [--budget 1500] [--repeat 5]
+"""
+
+import argparse
+import glob
+import os
+import random
+import statistics
+import time
+from utils.html_extract import extract_main_text, truncate_tokens
+from utils.rate_limit import count_tokens
+from utils.scrape_cache import extract_page, extract_text
+
+_SENTENCES = [
+    "Shares rose {p:.1f}% on Thursday after the company reported quarterly revenue of "
+    "${r:.1f} billion, ahead of analyst estimates.",
+    "Services revenue reached a record ${s:.1f} billion while gross margin widened to "
+    "{m:.1f}% on a richer product mix.",
+    "Analysts raised their price targets, citing a growing installed base and recurring "
+    "subscription income.",
+    "Some investors remain cautious about regulatory pressure and slowing hardware demand "
+    "in several regions.",
+    "Trading volume was {v:.1f} million shares, well above the 30-day average.",
+]
+
+
+def synthetic_page(seed, paragraphs=14):
+    """A news article page wrapped in typical site chrome."""
+    rng = random.Random(seed)
+
+    def sentence():
+        return rng.choice(_SENTENCES).format(p=rng.uniform(-5, 5), r=rng.uniform(50, 120),
+                                             s=rng.uniform(10, 30), m=rng.uniform(35, 50),
+                                             v=rng.uniform(20, 90))
+
+    links = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(60))
+    trending = "".join(f'<li><a href="/story/{seed}-{i}">Trending story {i} that readers '
+                       f'also clicked on today</a></li>' for i in range(30))
+    body = "".join(
+        (f"<h2>Part {i // 4 + 1}</h2>" if i % 4 == 0 else "")
+        + "<p>" + " ".join(sentence() for _ in range(rng.randint(2, 4))) + "</p>"
+        for i in range(paragraphs))
+    rows = "".join(f"<tr><td>Q{q}</td><td>{rng.uniform(80, 120):.1f}</td>"
+                   f"<td>{rng.uniform(1, 2):.2f}</td></tr>" for q in range(1, 5))
+    return f"""<!DOCTYPE html><html><head><title>Quarterly results {seed} | Markets</title>
+<style>{'.c{color:#333}' * 200}</style><script>{'var x = 1;' * 300}</script></head><body>
+<header class="site-header"><a href="/">Home</a> <a href="/login">Sign in</a></header>
+<nav><ul>{links}</ul></nav><div class="ad-slot">Advertisement</div>
+<div id="content"><div>Edit Article</div><div><a href="/history">Read History</a></div>
+<article><h1>Company beats estimates as demand rebounds</h1>{body}
+<table><tr><th>Quarter</th><th>Revenue ($B)</th><th>EPS</th></tr>{rows}</table></article></div>
+<aside class="sidebar"><ul>{trending}</ul></aside>
+<div class="related-links"><ul>{trending}</ul></div>
+<footer><p>Copyright Markets Inc. All rights reserved. Terms, privacy and cookie policy.</p>
+<ul>{links}</ul></footer>
+<div class="cookie-banner">We use cookies. <button>Accept all cookies</button></div>
+</body></html>"""
+
+
+def load_pages(directory, count):
+    """Saved .html pages from directory, or count synthetic ones."""
+    if not directory:
+        return [synthetic_page(seed) for seed in range(count)]
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.htm*"))):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages.append(f.read())
+    return pages
+
+
+def timed(fn, pages, repeat):
+    """Median pages per second of fn over every page."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            fn(page)
+        samples.append(time.perf_counter() - start)
+    return len(pages) / statistics.median(samples)
+
+
+def main():
+    """Time both extractors and print throughput and token tables."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", help="directory of saved .html pages")
+    parser.add_argument("--count", type=int, default=50, help="synthetic pages")
+    parser.add_argument("--budget", type=int, default=1500, help="tokens per scrape")
+    parser.add_argument("--scrapes-per-task", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.count)
+    if not pages:
+        parser.error(f"no .html files in {args.pages}")
+
+    rates = {
+        "get_text (before)": timed(extract_text, pages, args.repeat),
+        "extract_main_text": timed(extract_main_text, pages, args.repeat),
+        "extract_page (tool)": timed(extract_page, pages, args.repeat),
+    }
+    tokens = {"raw html": [], "get_text (before)": [], "main text": [], "truncated": []}
+    for page in pages:
+        main_text = extract_page(page)
+        tokens["raw html"].append(count_tokens(page))
+        tokens["get_text (before)"].append(count_tokens(extract_text(page)))
+        tokens["main text"].append(count_tokens(main_text))
+        tokens["truncated"].append(count_tokens(truncate_tokens(main_text, args.budget)))
+
+    print(f"{len(pages)} pages, median of {args.repeat} runs")
+    print(f"{'extractor':<22s}{'pages/s':>10s}{'ms/page':>10s}")
+    for name, rate in rates.items():
+        print(f"{name:<22s}{rate:10.1f}{1000 / rate:10.2f}")
+    print()
+    print(f"{'tokens per page':<22s}{'mean':>10s}{'max':>10s}")
+    for name, counts in tokens.items():
+        print(f"{name:<22s}{statistics.mean(counts):10,.0f}{max(counts):10,d}")
+
+    before = statistics.mean(tokens["get_text (before)"])
+    after = statistics.mean(tokens["truncated"])
+    saved = (before - after) * args.scrapes_per_task
+    print()
+    print(f"prompt tokens per task at {args.scrapes_per_task} scrapes: "
+          f"{before * args.scrapes_per_task:,.0f} -> {after * args.scrapes_per_task:,.0f} "
+          f"({saved:,.0f} saved, {1 - after / before:.0%} less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Ingest OHLCV CSV/Parquet files into the local market-data store.
+
+Each file is merged into the memory-mapped columnar store that the
+'Market Data Indicators' tool reads. The ticker is taken from the file name
+("AAPL_1min.csv" -> AAPL) unless --ticker is given.
+
+Usage:
+    python ingest_market_data.py data/AAPL.csv data/MSFT.parquet
+    python ingest_market_data.py --ticker AAPL --store .cache/market_data aapl_minute.csv
+"""
+
+import argparse
+import time
+from utils.market_data import OHLCVStore
+
+
+def main():
+    """Ingest every file given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="+", help="CSV or Parquet files with OHLCV columns")
+    parser.add_argument("--ticker", help="ticker for every file (default: from the file name)")
+    parser.add_argument("--store", default=".cache/market_data")
+    args = parser.parse_args()
+
+    store = OHLCVStore(args.store)
+    for path in args.files:
+        start = time.perf_counter()
+        bars = store.ingest(path, args.ticker)
+        print(f"📈 {path}: {bars} bars stored in {time.perf_counter() - start:.2f}s")
+    print(f"✅ Tickers in {args.store}: {', '.join(store.tickers())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,70 @@
 import warnings
 import os
+import time
 from crewai import Agent, Task, Crew, LLM, Process
 from utils.get_groq_api_key import get_groq_api_key
 from utils.get_serper_api_key import get_serper_api_key
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool
+from utils import rate_limit
+from utils.backtest import BacktestTool
+from utils.delegation_guard import DelegationGuard
+from utils.indicators import MarketDataTool
+from utils.market_data import OHLCVStore
+from utils.scrape_cache import CachedScrapeWebsiteTool, default_scrape_cache
+from utils.search_cache import CachedSerperDevTool, default_search_cache
 from langchain_openai import ChatOpenAI
 from IPython.display import Markdown
 
 
-def main():
-    warnings.filterwarnings('ignore')
+# Example data for kicking off the process
+FINANCIAL_TRADING_INPUTS = {
+    'stock_selection': 'AAPL',
+    'initial_capital': '100000',
+    'risk_tolerance': 'Medium',
+    'trading_strategy_preference': 'Day Trading',
+    'news_impact_consideration': True
+}
 
-    # ========================
-    # Patch SerperDevTool to accept dict safely
-    # ========================
-    # Keep a reference to the original method
-    _original_run = SerperDevTool.run
+# Delegation budgets per task name; other tasks get at most 4 delegations,
+# 2 hops deep. The strategy developer may consult coworkers a little more.
+DELEGATION_LIMITS = {
+    "strategy_development_task": {"max_delegations": 6},
+}
 
-    def safe_run(self, search_query):
-        # Ensure the argument is always a plain string
-        if isinstance(search_query, dict):
-            search_query = search_query.get("description", str(search_query))
-        # Call the *original* method safely
-        return _original_run(self, search_query)
+# Tokens of main page text one scrape may hand an agent; a whole news page
+# runs to several thousand and Groq allows 12K tokens per minute.
+SCRAPE_TOKEN_BUDGET = 1500
 
-    SerperDevTool.run = safe_run
-    # ========================
 
+def configure_environment():
+    """
+    Sets the API environment for Groq and Serper.
+    """
     # Use Groq (OpenAI-compatible API)
     os.environ["OPENAI_API_BASE"] = "https://api.groq.com/openai/v1"
     os.environ["GROQ_API_KEY"] = get_groq_api_key()
     os.environ["SERPER_API_KEY"] = get_serper_api_key()
 
+    # Queue LLM calls under Groq's token and request limits instead of
+    # sending them into 429s; the manager's calls gate every delegation
+    rate_limit.install(agent_priorities={"Crew Manager": rate_limit.HIGH})
+
+
+def build_crew(backtest_tool=None):
+    """
+    Builds the four-agent trading crew. Pass backtest_tool to control its
+    process count or read its history after kickoff.
+    """
     llm = LLM(model="groq/llama-3.3-70b-versatile")  # this model supports 12K tokens per minute
 
     # Initialize the tools
-    search_tool = SerperDevTool()
-    scrape_tool = ScrapeWebsiteTool()
+    search_tool = CachedSerperDevTool()  # searches cached and shared across processes
+    # Disk cache shared across runs; pages reduced to main text and truncated
+    scrape_tool = CachedScrapeWebsiteTool(max_tokens=SCRAPE_TOKEN_BUDGET)
+    # Indicators and backtests over local OHLCV history (see ingest_market_data.py)
+    market_data = OHLCVStore()
+    market_data_tool = MarketDataTool(store=market_data)
+    if backtest_tool is None:
+        backtest_tool = BacktestTool(store=market_data)
 
     # Agent 1: Data Analyst
     data_analyst_agent = Agent(
@@ -50,7 +78,7 @@ def main():
                 "informing trading decisions.",
         verbose=True,
         allow_delegation=True,
-        tools = [scrape_tool, search_tool],
+        tools = [market_data_tool, scrape_tool, search_tool],
         llm=llm
     )
 
@@ -66,7 +94,7 @@ def main():
                 "the most profitable and risk-averse options.",
         verbose=True,
         allow_delegation=True,
-        tools = [scrape_tool, search_tool],
+        tools = [backtest_tool, scrape_tool, search_tool],
         llm=llm
     )
 
@@ -104,11 +132,14 @@ def main():
 
     # Task for Data Analyst Agent: Analyze Market Data
     data_analysis_task = Task(
+        name="data_analysis_task",
         description=(
             "Continuously monitor and analyze market data for "
             "the selected stock ({stock_selection}). "
             "Use statistical modeling and machine learning to "
-            "identify trends and predict market movements."
+            "identify trends and predict market movements. "
+            "Get price history indicators from the 'Market Data Indicators' "
+            "tool; use web search only for news and sentiment."
         ),
         expected_output=(
             "Insights and alerts about significant market "
@@ -119,21 +150,27 @@ def main():
 
     # Task for Trading Strategy Agent: Develop Trading Strategies
     strategy_development_task = Task(
+        name="strategy_development_task",
         description=(
             "Develop and refine trading strategies based on "
             "the insights from the Data Analyst and "
             "user-defined risk tolerance ({risk_tolerance}). "
-            "Consider trading preferences ({trading_strategy_preference})."
+            "Consider trading preferences ({trading_strategy_preference}). "
+            "Write each strategy's entry logic, exit logic and risk rules in the "
+            "'Backtest Strategy' tool's rule syntax and backtest them, sweeping "
+            "key parameters, before recommending any."
         ),
         expected_output=(
             "A set of potential trading strategies for {stock_selection} "
-            "that align with the user's risk tolerance."
+            "that align with the user's risk tolerance, each with its "
+            "backtested Sharpe ratio, max drawdown and win rate."
         ),
         agent=trading_strategy_agent,
     )
 
     # Task for Trade Advisor Agent: Plan Trade Execution
     execution_planning_task = Task(
+        name="execution_planning_task",
         description=(
             "Analyze approved trading strategies to determine the "
             "best execution methods for {stock_selection}, "
@@ -148,6 +185,7 @@ def main():
 
     # Task for Risk Advisor Agent: Assess Trading Risks
     risk_assessment_task = Task(
+        name="risk_assessment_task",
         description=(
             "Evaluate the risks associated with the proposed trading "
             "strategies and execution plans for {stock_selection}. "
@@ -179,21 +217,51 @@ def main():
         verbose=True
     )
 
-    # Example data for kicking off the process
-    financial_trading_inputs = {
-        'stock_selection': 'AAPL',
-        'initial_capital': '100000',
-        'risk_tolerance': 'Medium',
-        'trading_strategy_preference': 'Day Trading',
-        'news_impact_consideration': True
+    return financial_trading_crew
+
+
+def run_ticker(ticker, inputs=None, backtest_processes=None):
+    """
+    Runs the crew for one ticker. Returns its report, kickoff seconds and
+    every backtest the strategy developer ran.
+    """
+    backtest_tool = BacktestTool(store=OHLCVStore(), processes=backtest_processes)
+    guard = DelegationGuard(limits=DELEGATION_LIMITS)
+    guard.install()
+    crew = build_crew(backtest_tool)
+    start = time.perf_counter()
+    result = crew.kickoff(inputs={**(inputs or FINANCIAL_TRADING_INPUTS),
+                                  "stock_selection": ticker})
+    return {
+        "ticker": ticker,
+        "seconds": time.perf_counter() - start,
+        "report": result.raw,
+        "backtests": list(backtest_tool.history),
+        "delegation": {**guard.stats, "saved": guard.saved()},
     }
 
+
+def main():
+    warnings.filterwarnings('ignore')
+    configure_environment()
+
+    # Cut delegation ping-pong between agents short
+    delegation_guard = DelegationGuard(limits=DELEGATION_LIMITS)
+    delegation_guard.install()
+
+    financial_trading_crew = build_crew()
+
     ### this execution will take some time to run
-    result = financial_trading_crew.kickoff(inputs=financial_trading_inputs)
+    result = financial_trading_crew.kickoff(inputs=FINANCIAL_TRADING_INPUTS)
 
     # Display the final result as Markdown
     Markdown(result)
 
+    delegation_guard.report()
+    default_scrape_cache().report()
+    default_search_cache().report()
+    rate_limit.report()
+
 
 if __name__ == "__main__":
     main()
@@ -1,5 +1,7 @@
+import argparse
 import warnings
 import os
+import time
 # Must be before ANY crewai import
 os.environ["CREWAI_TELEMETRY"] = "0"
 os.environ["CREWAI_TRACING"] = "0"
@@ -9,29 +11,49 @@ os.environ["OTEL_EXPORTER_OTLP_ENDPOINT"] = ""
 os.environ["OTEL_EXPORTER_OTLP_TRACES_ENDPOINT"] = ""
 from crewai import Agent, Task, Crew, LLM, Process
 from utils.get_serper_api_key import get_serper_api_key
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool
+from utils.backtest import BacktestTool
+from utils.context_compaction import ContextCompactor
+from utils.delegation_guard import DelegationGuard
+from utils.indicators import MarketDataTool
+from utils.market_data import OHLCVStore
+from utils.scrape_cache import CachedScrapeWebsiteTool, default_scrape_cache
+from utils.search_cache import CachedSerperDevTool, default_search_cache
 from IPython.display import Markdown
 
 
-def main():
-    warnings.filterwarnings('ignore')
+# Example data for kicking off the process
+FINANCIAL_TRADING_INPUTS = {
+    'stock_selection': 'AAPL',
+    'initial_capital': '100000',
+    'risk_tolerance': 'Medium',
+    'trading_strategy_preference': 'Day Trading',
+    'news_impact_consideration': True
+}
 
-    # ========================
-    # Patch SerperDevTool to accept dict safely
-    # ========================
-    # Keep a reference to the original method
-    _original_run = SerperDevTool.run
+# Delegation budgets per task name; other tasks get at most 4 delegations,
+# 2 hops deep. The strategy developer may consult coworkers a little more.
+DELEGATION_LIMITS = {
+    "strategy_development_task": {"max_delegations": 6},
+}
 
-    def safe_run(self, search_query):
-        # Ensure the argument is always a plain string
-        if isinstance(search_query, dict):
-            search_query = search_query.get("description", str(search_query))
-        # Call the *original* method safely
-        return _original_run(self, search_query)
+# Tokens of main page text one scrape may hand an agent, sized for
+# llama3.2:3b's small context window.
+SCRAPE_TOKEN_BUDGET = 800
 
-    SerperDevTool.run = safe_run
-    # ========================
+# Tokens each task's output may take up in the context of the tasks after
+# it. llama3.2:3b runs with a 2K-4K window in Ollama, and the last task
+# receives all three earlier outputs.
+CONTEXT_BUDGETS = {
+    "data_analysis_task": 400,
+    "strategy_development_task": 500,
+    "execution_planning_task": 350,
+}
 
+
+def configure_environment():
+    """
+    Sets the API environment for Ollama and Serper.
+    """
     # Critical: Remove OpenAI env vars so CrewAI won't force OpenAI mode
     for var in [
         "OPENAI_API_KEY",
@@ -47,6 +69,13 @@ def main():
     os.environ["OPENAI_API_KEY"] = "ollama"  # dummy key since Ollama runs locally
     os.environ["SERPER_API_KEY"] = get_serper_api_key()
 
+
+def build_crew(backtest_tool=None, compactor=None):
+    """
+    Builds the four-agent trading crew. Pass backtest_tool to control its
+    process count or read its history after kickoff, and compactor (a
+    ContextCompactor) to bound the context handed from task to task.
+    """
     llm = LLM(
         model="llama3.2:3b",
         base_url="http://localhost:11434/v1",
@@ -63,8 +92,14 @@ def main():
     # )
 
     # Initialize the tools
-    search_tool = SerperDevTool()
-    scrape_tool = ScrapeWebsiteTool()
+    search_tool = CachedSerperDevTool()  # searches cached and shared across processes
+    # Disk cache shared across runs; pages reduced to main text and truncated
+    scrape_tool = CachedScrapeWebsiteTool(max_tokens=SCRAPE_TOKEN_BUDGET)
+    # Indicators and backtests over local OHLCV history (see ingest_market_data.py)
+    market_data = OHLCVStore()
+    market_data_tool = MarketDataTool(store=market_data)
+    if backtest_tool is None:
+        backtest_tool = BacktestTool(store=market_data)
 
     # Agent 1: Data Analyst
     data_analyst_agent = Agent(
@@ -85,7 +120,7 @@ def main():
         ),
         verbose=True,
         allow_delegation=True,
-        tools=[scrape_tool, search_tool],
+        tools=[market_data_tool, scrape_tool, search_tool],
         llm=llm
     )
 
@@ -102,7 +137,7 @@ def main():
                 "the most profitable and risk-averse options.",
         verbose=True,
         allow_delegation=True,
-        tools = [scrape_tool, search_tool],
+        tools = [backtest_tool, scrape_tool, search_tool],
         llm=llm
     )
 
@@ -140,6 +175,7 @@ def main():
 
     # Task for Data Analyst Agent: Analyze Market Data
     data_analysis_task = Task(
+        name="data_analysis_task",
         description=(
             "You MUST produce a concise, factual market analysis. "
             "Rules:\n"
@@ -149,7 +185,10 @@ def main():
             "TASK:\n"
             "Analyze real-time and historical market data for {stock_selection}. "
             "Identify patterns, important levels, volatility changes, sentiment, "
-            "momentum shifts, and any signals relevant for trading."
+            "momentum shifts, and any signals relevant for trading. "
+            "Take trend, key levels, ATR/volatility, RSI, MACD and momentum from "
+            "the 'Market Data Indicators' tool; use web search only for news "
+            "and sentiment."
         ),
         expected_output=(
             "A structured analysis including:\n"
@@ -165,6 +204,7 @@ def main():
 
     # Task for Trading Strategy Agent: Develop Trading Strategies
     strategy_development_task = Task(
+        name="strategy_development_task",
         description=(
             "You MUST output a clean, structured set of trading strategies.\n"
             "Rules:\n"
@@ -174,7 +214,9 @@ def main():
             "TASK:\n"
             "Based on insights from the analyst and the user's parameters "
             "(risk tolerance: {risk_tolerance}, strategy preference: {trading_strategy_preference}), "
-            "develop several actionable trading strategies for {stock_selection}."
+            "develop several actionable trading strategies for {stock_selection}. "
+            "Write entry logic, exit logic and risk rules in the 'Backtest Strategy' "
+            "tool's rule syntax and backtest each strategy, sweeping key parameters."
         ),
         expected_output=(
             "A concise list of strategy options including:\n"
@@ -182,7 +224,8 @@ def main():
             "- Description\n"
             "- Entry logic\n"
             "- Exit logic\n"
-            "- Risk management rules"
+            "- Risk management rules\n"
+            "- Backtest results (Sharpe, max drawdown, win rate)"
         ),
         agent=trading_strategy_agent,
     )
@@ -190,6 +233,7 @@ def main():
 
     # Task for Trade Advisor Agent: Plan Trade Execution
     execution_planning_task = Task(
+        name="execution_planning_task",
         description=(
             "Produce a focused trade execution plan.\n"
             "Rules:\n"
@@ -215,6 +259,7 @@ def main():
 
     # Task for Risk Advisor Agent: Assess Trading Risks
     risk_assessment_task = Task(
+        name="risk_assessment_task",
         description=(
             "Provide a clear, direct risk analysis.\n"
             "Rules:\n"
@@ -239,16 +284,20 @@ def main():
 
 
     # Define the crew with agents and tasks
+    tasks = [data_analysis_task,
+             strategy_development_task,
+             execution_planning_task,
+             risk_assessment_task]
+    if compactor is not None:
+        compactor.attach(tasks)
+
     financial_trading_crew = Crew(
         agents=[data_analyst_agent, 
                 trading_strategy_agent, 
                 execution_agent, 
                 risk_management_agent],
         
-        tasks=[data_analysis_task, 
-            strategy_development_task, 
-            execution_planning_task, 
-            risk_assessment_task],
+        tasks=tasks,
         
         manager_llm = LLM(
             model="llama3.2:3b",
@@ -261,21 +310,64 @@ def main():
         verbose=True
     )
 
-    # Example data for kicking off the process
-    financial_trading_inputs = {
-        'stock_selection': 'AAPL',
-        'initial_capital': '100000',
-        'risk_tolerance': 'Medium',
-        'trading_strategy_preference': 'Day Trading',
-        'news_impact_consideration': True
+    return financial_trading_crew
+
+
+def run_ticker(ticker, inputs=None, backtest_processes=None):
+    """
+    Runs the crew for one ticker. Returns its report, kickoff seconds and
+    every backtest the strategy developer ran.
+    """
+    backtest_tool = BacktestTool(store=OHLCVStore(), processes=backtest_processes)
+    guard = DelegationGuard(limits=DELEGATION_LIMITS)
+    guard.install()
+    compactor = ContextCompactor(CONTEXT_BUDGETS)
+    crew = build_crew(backtest_tool, compactor)
+    start = time.perf_counter()
+    compactor.start()
+    result = crew.kickoff(inputs={**(inputs or FINANCIAL_TRADING_INPUTS),
+                                  "stock_selection": ticker})
+    return {
+        "ticker": ticker,
+        "seconds": time.perf_counter() - start,
+        "report": result.raw,
+        "backtests": list(backtest_tool.history),
+        "delegation": {**guard.stats, "saved": guard.saved()},
+        "compaction": compactor.log,
     }
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the trading crew on a local Ollama model.")
+    parser.add_argument("--no-compaction", action="store_true",
+                        help="pass task outputs downstream in full, still logging token "
+                             "counts and task timings for comparison")
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    configure_environment()
+
+    # Cut delegation ping-pong between agents short
+    delegation_guard = DelegationGuard(limits=DELEGATION_LIMITS)
+    delegation_guard.install()
+
+    # Keep each task's output within its budget before later tasks see it
+    compactor = ContextCompactor({} if args.no_compaction else CONTEXT_BUDGETS,
+                                 default_budget=None if args.no_compaction else 400)
+    financial_trading_crew = build_crew(compactor=compactor)
+
     ### this execution will take some time to run
-    result = financial_trading_crew.kickoff(inputs=financial_trading_inputs)
+    compactor.start()
+    result = financial_trading_crew.kickoff(inputs=FINANCIAL_TRADING_INPUTS)
 
     # Display the final result as Markdown
     Markdown(result.raw)
 
+    compactor.report()
+    delegation_guard.report()
+    default_scrape_cache().report()
+    default_search_cache().report()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,83 @@
+# pylint: disable=C0114
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from utils.fake_serper import FakeSerper
+from utils.search_cache import CachedSerperDevTool, SearchCache
+
+# Overlapping queries as agents phrase them, including dict inputs
+QUERIES = [
+    "AAPL stock news today",
+    "  aapl STOCK news today ",
+    {"description": "AAPL stock news today"},
+    "Apple quarterly earnings",
+    "apple quarterly earnings?",
+    "Apple supply chain risks",
+    {"description": "Apple supply chain risks", "type": "str"},
+    "Apple supply chain risks",
+]
+
+
+def _search_in_process(cache_dir, query):
+    CachedSerperDevTool(cache=SearchCache(cache_dir)).run(search_query=query)
+    return os.getpid()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Exercise the search cache against a local fake Serper endpoint.")
+    parser.add_argument("--delay", type=float, default=0.3,
+                        help="fake Serper latency in seconds (default: %(default)s)")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    with FakeSerper(delay=args.delay, api_key="test") as fake, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        os.environ["SERPER_BASE_URL"] = fake.url
+        os.environ["SERPER_API_KEY"] = "test"
+        cache = SearchCache(cache_dir)
+        tool = CachedSerperDevTool(cache=cache)
+        unique = 3
+
+        # 1. Concurrent threads: one Serper call per distinct query
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            results = list(pool.map(lambda q: tool.run(search_query=q), QUERIES * 2))
+        cold = time.perf_counter() - start
+        assert fake.total == unique, fake.requests
+        assert all(r["organic"] for r in results)
+        print(f"threads:   {len(QUERIES) * 2} searches, {fake.total} Serper calls, {cold:.2f}s")
+
+        # 2. Warm: everything from the cache
+        start = time.perf_counter()
+        for query in QUERIES:
+            tool.run(search_query=query)
+        warm = time.perf_counter() - start
+        assert fake.total == unique
+        print(f"warm:      {len(QUERIES)} searches, 0 Serper calls, {warm * 1000:.1f} ms")
+
+        # 3. Processes sharing the cache directory: one call for a new query
+        with ProcessPoolExecutor(args.processes) as pool:
+            pids = set(pool.map(_search_in_process, [cache_dir] * args.processes,
+                                ["Apple dividend history"] * args.processes))
+        assert fake.total == unique + 1, fake.requests
+        print(f"processes: {args.processes} searches from {len(pids)} processes, 1 Serper call")
+
+        # 4. TTL: a short-lived entry is fetched again once it expires
+        short = SearchCache(cache_dir, ttl_rules=[(r"\bnews\b", 1)])
+        CachedSerperDevTool(cache=short).run(search_query="Apple news")
+        time.sleep(1.1)
+        CachedSerperDevTool(cache=short).run(search_query="Apple news")
+        assert fake.requests["Apple news"] == 2, fake.requests
+        print("ttl:       expired entry refetched")
+
+        cache.report()
+        print("✅ search cache smoke test passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+# pylint: disable=C0114
+import ast
+import itertools
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional, Type
+
+import numpy as np
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from utils import indicators
+from utils.market_data import OHLCVStore
+
+SERIES = ("open", "high", "low", "close", "volume")
+
+_COMPARE = {ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater,
+            ast.GtE: np.greater_equal, ast.Eq: np.equal, ast.NotEq: np.not_equal}
+_BINARY = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply,
+           ast.Div: np.divide}
+_ALLOWED = (ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub,
+            ast.UAdd, ast.BinOp, ast.Compare, ast.Call, ast.Name, ast.Load, ast.Constant,
+            *_COMPARE, *_BINARY)
+
+
+def _windowed(fn, default="close"):
+    # f(n) or f(series, n)
+    def call(ctx, *args):
+        series, period = args if len(args) == 2 else (default, args[0])
+        return fn(ctx.series(series), int(period))
+    return call
+
+
+def _shift(values, bars=1):
+    out = np.full(len(values), np.nan)
+    out[bars:] = values[:-bars]
+    return out
+
+
+def _crosses(ctx, a, b, above):
+    diff = np.broadcast_to(ctx.series(a) - ctx.series(b), len(ctx.bars["close"]))
+    before = _shift(diff)
+    with np.errstate(invalid="ignore"):
+        return (before <= 0) & (diff > 0) if above else (before >= 0) & (diff < 0)
+
+
+def _macd(part):
+    def call(ctx, fast=12, slow=26, signal=9):
+        return indicators.macd(ctx.bars["close"], int(fast), int(slow), int(signal))[part]
+    return call
+
+
+# DSL functions: name -> f(context, *evaluated args)
+FUNCTIONS = {
+    "sma": _windowed(indicators.sma),
+    "ema": _windowed(indicators.ema),
+    "rsi": _windowed(indicators.rsi),
+    "roc": _windowed(indicators.rate_of_change),
+    "highest": _windowed(lambda values, n: indicators.rolling_extreme(values, n, "max"), "high"),
+    "lowest": _windowed(lambda values, n: indicators.rolling_extreme(values, n, "min"), "low"),
+    "atr": lambda ctx, n=14: indicators.atr(ctx.bars["high"], ctx.bars["low"],
+                                            ctx.bars["close"], int(n)),
+    "macd": _macd(0),
+    "macd_signal": _macd(1),
+    "macd_hist": _macd(2),
+    "prev": lambda ctx, values, bars=1: _shift(ctx.series(values), int(bars)),
+    "crosses_above": lambda ctx, a, b: _crosses(ctx, a, b, True),
+    "crosses_below": lambda ctx, a, b: _crosses(ctx, a, b, False),
+}
+
+
+def normalize_rule(text):
+    """
+    Accepts the spellings LLMs tend to use: AND/OR/NOT, &&, ||, a single
+    '=' for equality and 'x crosses above y'.
+    """
+    text = str(text or "").strip().rstrip(".")
+    text = re.sub(r"&&", " and ", text)
+    text = re.sub(r"\|\|", " or ", text)
+    text = re.sub(r"\b(AND|OR|NOT)\b", lambda m: m.group(1).lower(), text)
+    text = re.sub(r"(?<![<>=!])=(?!=)", "==", text)
+    text = re.sub(r"(\S+)\s+crosses\s+(above|below)\s+(\S+)",
+                  lambda m: f"crosses_{m.group(2)}({m.group(1)}, {m.group(3)})", text)
+    return text
+
+
+def compile_rule(text):
+    """
+    Parses one DSL expression into a validated AST. Raises ValueError on
+    syntax errors, unknown functions or disallowed constructs.
+    """
+    try:
+        tree = ast.parse(normalize_rule(text), mode="eval")
+    except SyntaxError as exc:
+        raise ValueError(f"cannot parse rule {text!r}: {exc.msg}") from exc
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED):
+            raise ValueError(f"{type(node).__name__} is not allowed in rule {text!r}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"only numbers are allowed as constants in rule {text!r}")
+        if isinstance(node, ast.Call) and (not isinstance(node.func, ast.Name)
+                                           or node.func.id not in FUNCTIONS):
+            raise ValueError(f"unknown function in rule {text!r}; "
+                             f"use {', '.join(sorted(FUNCTIONS))}")
+    return tree
+
+
+class _Context:
+    """
+    Evaluates compiled rules over one set of bars. Indicator results are
+    memoized per call and the parameters it uses, so a parameter sweep
+    recomputes only what actually changes.
+    """
+
+    def __init__(self, bars):
+        self.bars = {c: np.asarray(bars[c], dtype=np.float64) for c in SERIES}
+        self.cache = {}
+
+    def series(self, value):
+        if isinstance(value, str):
+            return self.bars[value]
+        return np.asarray(value, dtype=np.float64)
+
+    def _eval(self, node, params):
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            if node.id in SERIES:
+                return node.id  # resolved lazily so functions know the column
+            if node.id == "price":
+                return "close"
+            if node.id in params:
+                return params[node.id]
+            raise ValueError(f"unknown name {node.id!r}; add it to the parameters")
+        if isinstance(node, ast.Call):
+            names = sorted({n.id for n in ast.walk(node) if isinstance(n, ast.Name)} & set(params))
+            key = (ast.dump(node), tuple((n, params[n]) for n in names))
+            if key not in self.cache:
+                args = [self._eval(arg, params) for arg in node.args]
+                self.cache[key] = FUNCTIONS[node.func.id](self, *args)
+            return self.cache[key]
+        if isinstance(node, ast.BinOp):
+            return _BINARY[type(node.op)](self.value(node.left, params),
+                                          self.value(node.right, params))
+        if isinstance(node, ast.UnaryOp):
+            value = self.value(node.operand, params)
+            if isinstance(node.op, ast.Not):
+                return ~np.asarray(value, dtype=bool)
+            return -value if isinstance(node.op, ast.USub) else value
+        if isinstance(node, ast.Compare):
+            left, result = self.value(node.left, params), True
+            with np.errstate(invalid="ignore"):
+                for op, comparator in zip(node.ops, node.comparators):
+                    right = self.value(comparator, params)
+                    result = result & _COMPARE[type(op)](left, right)
+                    left = right
+            return result
+        if isinstance(node, ast.BoolOp):
+            values = [np.asarray(self.value(v, params), dtype=bool) for v in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return combine.reduce(values)
+        raise ValueError(f"unsupported expression {ast.dump(node)}")
+
+    def value(self, node, params):
+        value = self._eval(node, params)
+        return self.bars[value] if isinstance(value, str) else value
+
+    def signal(self, tree, params):
+        value = self.value(tree.body, params)
+        return np.broadcast_to(np.asarray(value, dtype=bool), len(self.bars["close"]))
+
+
+def parse_risk(text):
+    """
+    Parses risk rules like "stop_loss = 2%; take_profit = 3 * atr(14);
+    max_hold = 390; cost_bps = 1". Percentages ("2%") and plain fractions
+    below 1 ("0.02") are a fraction of the entry price; plain numbers of 1
+    or more are rejected as ambiguous. An expression is a price distance
+    evaluated at the entry bar. Returns {name: compiled rule or float}.
+    """
+    rules = {}
+    # Commas separate rules too, except inside function calls
+    for part in re.split(r";|\n|,(?![^()]*\))", str(text or "")):
+        if not part.strip():
+            continue
+        if "=" not in part and ":" not in part:
+            raise ValueError(f"risk rule {part.strip()!r} is not 'name = value'")
+        name, value = re.split(r"[=:]", part, maxsplit=1)
+        name = re.sub(r"[\s\-]+", "_", name.strip().lower())
+        value = value.strip()
+        if name not in ("stop_loss", "take_profit", "max_hold", "cost_bps"):
+            raise ValueError(f"unknown risk rule {name!r}; use stop_loss, take_profit, "
+                             "max_hold or cost_bps")
+        number = re.fullmatch(r"(\d+(?:\.\d+)?)\s*(%?)", value)
+        if name in ("max_hold", "cost_bps"):
+            rules[name] = float(value)
+        elif number and number.group(2):
+            rules[name] = float(number.group(1)) / 100.0
+        elif number:
+            fraction = float(number.group(1))
+            if fraction >= 1:
+                raise ValueError(f"{name} = {value} is ambiguous; write a percentage "
+                                 f"like {value}% or a fraction of the price like 0.02")
+            rules[name] = fraction
+        else:
+            rules[name] = compile_rule(value)
+    return rules
+
+
+class Strategy:
+    """
+    Entry logic, exit logic and risk rules in the rule DSL.
+
+    Rules are Python-like boolean expressions over the bar columns (open,
+    high, low, close, volume) and the functions in FUNCTIONS, e.g.
+    "rsi(14) < lower and close > sma(200)". Any other name is a parameter
+    looked up in the params given to run(), which is what a sweep varies.
+    """
+
+    def __init__(self, entry, exit=None, risk=None, name=None):  # pylint: disable=redefined-builtin
+        self.name = name or "strategy"
+        self.entry_text, self.exit_text, self.risk_text = entry, exit, risk
+        self.entry = compile_rule(entry)
+        self.exit = compile_rule(exit) if exit else None
+        self.risk = parse_risk(risk)
+
+    def to_dict(self):
+        return {"name": self.name, "entry": self.entry_text, "exit": self.exit_text,
+                "risk": self.risk_text}
+
+
+def _distance(ctx, rule, params, price):
+    """
+    Stop/target distance per bar: a fraction of price, or a price
+    distance expression.
+    """
+    if rule is None:
+        return None
+    if isinstance(rule, float):
+        return price * rule
+    return np.broadcast_to(np.asarray(ctx.value(rule.body, params), dtype=np.float64),
+                           price.shape)
+
+
+def simulate(ctx, strategy, params=None):
+    """
+    Runs a long-only backtest and returns (per-bar strategy returns,
+    trade returns). Entries and signal exits fill at the signal bar's
+    close; stops and targets fill at their level, or at the open when the
+    bar gaps through them. Only one position is open at a time.
+    """
+    params = params or {}
+    bars = ctx.bars
+    close, high, low, open_ = bars["close"], bars["high"], bars["low"], bars["open"]
+    n = len(close)
+    entries = np.flatnonzero(ctx.signal(strategy.entry, params))
+    exits = (np.flatnonzero(ctx.signal(strategy.exit, params)) if strategy.exit is not None
+             else np.empty(0, dtype=np.int64))
+    stop = _distance(ctx, strategy.risk.get("stop_loss"), params, close)
+    target = _distance(ctx, strategy.risk.get("take_profit"), params, close)
+    max_hold = int(strategy.risk.get("max_hold", 0)) or None
+    cost = strategy.risk.get("cost_bps", 0.0) / 10_000
+
+    returns = np.zeros(n)
+    trades = []
+    i = entries[0] if len(entries) else n
+    while i < n - 1:
+        entry_price = close[i]
+        # Last bar the trade may run to: the next exit signal or max_hold
+        k = np.searchsorted(exits, i, "right")
+        end = int(exits[k]) if k < len(exits) else n - 1
+        if max_hold:
+            end = min(end, i + max_hold)
+        exit_at, exit_price = end, close[end]
+        segment = slice(i + 1, end + 1)
+        hits = []
+        if stop is not None and np.isfinite(stop[i]):
+            level = entry_price - stop[i]
+            hit = np.flatnonzero(low[segment] <= level)
+            if len(hit):
+                at = i + 1 + hit[0]
+                hits.append((at, min(level, open_[at])))
+        if target is not None and np.isfinite(target[i]):
+            level = entry_price + target[i]
+            hit = np.flatnonzero(high[segment] >= level)
+            if len(hit):
+                at = i + 1 + hit[0]
+                hits.append((at, max(level, open_[at])))
+        if hits:
+            # The stop wins a tie: the worse fill is the conservative one
+            exit_at, exit_price = min(hits, key=lambda h: (h[0], h[1]))
+
+        held = slice(i + 1, exit_at + 1)
+        returns[held] = close[held] / close[i:exit_at] - 1.0
+        returns[exit_at] = exit_price / close[exit_at - 1] - 1.0
+        returns[i + 1] -= cost
+        returns[exit_at] -= cost
+        trades.append(exit_price / entry_price * (1 - cost) ** 2 - 1.0)
+
+        k = np.searchsorted(entries, exit_at, "right")
+        i = int(entries[k]) if k < len(entries) else n
+    return returns, np.asarray(trades)
+
+
+def metrics(returns, trades, periods_per_year):
+    """
+    Sharpe, max drawdown, win rate and friends from simulate()'s output.
+    """
+    equity = np.cumprod(1.0 + returns)
+    peak = np.maximum.accumulate(equity)
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    wins, losses = trades[trades > 0], trades[trades <= 0]
+    return {
+        "total_return_pct": round(float(equity[-1] - 1.0) * 100, 3) if len(equity) else 0.0,
+        "sharpe": round(float(returns.mean() / std * np.sqrt(periods_per_year)), 3)
+        if std > 0 else 0.0,
+        "max_drawdown_pct": round(float((equity / peak - 1.0).min()) * 100, 3)
+        if len(equity) else 0.0,
+        "win_rate_pct": round(len(wins) / len(trades) * 100, 2) if len(trades) else 0.0,
+        "trades": int(len(trades)),
+        "avg_trade_pct": round(float(trades.mean()) * 100, 4) if len(trades) else 0.0,
+        "profit_factor": round(float(wins.sum() / -losses.sum()), 3)
+        if len(losses) and losses.sum() < 0 else None,
+        "exposure_pct": round(float(np.mean(returns != 0)) * 100, 2) if len(returns) else 0.0,
+    }
+
+
+def backtest(bars, strategy, params=None, context=None):
+    """
+    One backtest of strategy over bars ({column: array}). Pass the same
+    context to reuse indicator results across calls.
+    """
+    if not len(bars["close"]):
+        raise ValueError("no bars in the requested date range")
+    ctx = context or _Context(bars)
+    returns, trades = simulate(ctx, strategy, params)
+    result = metrics(returns, trades, indicators.bars_per_year(np.asarray(bars["timestamp"])))
+    return {"params": dict(params or {}), **result}
+
+
+def parameter_grid(grid):
+    """
+    {"lower": [20, 30], "n": [10, 20]} -> every combination as a dict.
+    """
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+# Per worker process: bars loaded once from the memory-mapped store
+_worker = {}
+
+
+def _init_worker(store_dir, ticker, start, end, strategy_fields):
+    bars = OHLCVStore(store_dir).bars(ticker, start, end)
+    _worker["bars"] = bars
+    _worker["context"] = _Context(bars)
+    _worker["strategy"] = Strategy(**strategy_fields)
+
+
+def _run_chunk(param_sets):
+    return [backtest(_worker["bars"], _worker["strategy"], params, _worker["context"])
+            for params in param_sets]
+
+
+def sweep(store_dir, ticker, strategy, grid, start=None, end=None, processes=None,
+          rank_by="sharpe"):
+    """
+    Backtests every parameter combination in grid across a process pool.
+    Each worker opens the memory-mapped bars once and keeps its indicator
+    cache between combinations. Returns results sorted best first.
+    """
+    combos = parameter_grid(grid)
+    processes = max(1, min(processes or os.cpu_count() or 1, len(combos)))
+    if processes == 1:
+        _init_worker(store_dir, ticker, start, end, strategy.to_dict())
+        results = _run_chunk(combos)
+    else:
+        # A few chunks per worker balances load without per-combo overhead
+        size = max(1, len(combos) // (processes * 4))
+        chunks = [combos[i:i + size] for i in range(0, len(combos), size)]
+        with ProcessPoolExecutor(processes, initializer=_init_worker,
+                                 initargs=(store_dir, ticker, start, end,
+                                           strategy.to_dict())) as pool:
+            results = [r for chunk in pool.map(_run_chunk, chunks) for r in chunk]
+    return sorted(results, key=lambda r: (r[rank_by] is not None, r[rank_by]), reverse=True)
+
+
+class BacktestQuery(BaseModel):
+    """Input schema for BacktestTool."""
+    ticker: str = Field(..., description="Ticker symbol with local market data, e.g. 'AAPL'")
+    entry: str = Field(..., description="Entry rule, e.g. 'rsi(14) < lower and close > sma(200)'")
+    exit: Optional[str] = Field(None, description="Exit rule, e.g. 'rsi(14) > 70'")
+    risk: Optional[str] = Field(None, description="Risk rules, e.g. "
+                                "'stop_loss = 2%; take_profit = 3 * atr(14); max_hold = 390'")
+    params: Optional[str] = Field(None, description="JSON object of parameter values, or of "
+                                  "lists of values to sweep, e.g. '{\"lower\": [20, 25, 30]}'")
+    start: Optional[str] = Field(None, description="Optional first date, e.g. '2021-01-01'")
+    end: Optional[str] = Field(None, description="Optional last date")
+
+
+class BacktestTool(BaseTool):
+    """
+    Lets the strategy developer test entry/exit/risk rules on local history.
+    """
+
+    name: str = "Backtest Strategy"
+    description: str = (
+        "Backtests a long-only strategy on local OHLCV history and returns "
+        "Sharpe, max drawdown, win rate, trades and return as JSON. Rules are "
+        "expressions over open/high/low/close/volume with sma(n), ema(n), "
+        "rsi(n), atr(n), macd(), macd_signal(), macd_hist(), roc(n), "
+        "highest(n), lowest(n), prev(x, k), crosses_above(a, b) and "
+        "crosses_below(a, b), combined with and/or/not. Unknown names are "
+        "parameters; give lists of values in params to run a sweep."
+    )
+    args_schema: Type[BaseModel] = BacktestQuery
+    store: Any = None
+    processes: Optional[int] = None
+    top: int = 5
+    # Best result of every successful backtest call, for reports after kickoff
+    history: list = Field(default_factory=list)
+
+    def _run(self, ticker: str, entry: str, exit: Optional[str] = None,  # pylint: disable=redefined-builtin
+             risk: Optional[str] = None, params: Optional[str] = None,
+             start: Optional[str] = None, end: Optional[str] = None) -> str:
+        store = self.store or OHLCVStore()
+        if store.bars(ticker) is None:
+            return f"No local market data for {ticker}; known tickers: " \
+                   f"{', '.join(store.tickers()) or 'none'}."
+        try:
+            strategy = Strategy(entry, exit, risk)
+            values = json.loads(params) if params else {}
+            grid = {k: v if isinstance(v, list) else [v] for k, v in values.items()}
+            results = sweep(store.directory, ticker.upper(), strategy, grid, start, end,
+                            self.processes)
+        except (ValueError, KeyError, TypeError) as exc:
+            return f"Backtest failed: {exc}"
+        if results:
+            self.history.append({"ticker": ticker.upper(), "strategy": strategy.to_dict(),
+                                 "combinations": len(results), "best": results[0]})
+        return json.dumps({"ticker": ticker.upper(), "strategy": strategy.to_dict(),
+                           "combinations": len(results), "best": results[:self.top]}, indent=2)
@@ -0,0 +1,200 @@
+# pylint: disable=C0114
+import re
+import time
+
+from utils.rate_limit import count_tokens
+
+# Lines that cost tokens downstream without carrying analysis
+_FILLER = re.compile(
+    r"(not (financial|investment) advice|disclaimer|consult (a|your) (financial|licensed)|"
+    r"past performance|in conclusion|in summary|overall,|it is important to note|"
+    r"please note|as an ai|i hope this helps|let me know)", re.I)
+_BULLET = re.compile(r"^\s*([-*•]|\d+[.)])\s+")
+_HEADING = re.compile(r"^\s*(#{1,6}\s+|\*\*[^*]+\*\*:?\s*$|[A-Z][\w /&()-]{2,60}:\s*$)")
+_NUMBER = re.compile(r"\d")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+(?=[A-Z(])")
+_WORD = re.compile(r"[a-z]{4,}")
+
+
+def expected_sections(expected_output):
+    """
+    The bullet items of a task's expected_output, e.g. "- Trend direction"
+    -> ["trend direction"].
+    """
+    return [_BULLET.sub("", line).strip().lower()
+            for line in str(expected_output or "").splitlines() if _BULLET.match(line)]
+
+
+def _units(text):
+    """
+    Lines of text, with long prose lines split into sentences.
+    """
+    units = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if _BULLET.match(line) or _HEADING.match(line) or count_tokens(line) <= 60:
+            units.append(line.rstrip())
+        else:
+            units.extend(s.strip() for s in _SENTENCE.split(line.strip()) if s.strip())
+    return units
+
+
+def _section_of(unit, sections):
+    words = set(_WORD.findall(unit.lower()))
+    best, overlap = None, 0
+    for index, section in enumerate(sections):
+        shared = len(words & set(_WORD.findall(section)))
+        if shared > overlap:
+            best, overlap = index, shared
+    return best
+
+
+def _score(unit, section):
+    score = 1.0
+    if _HEADING.match(unit):
+        score += 3
+    if _BULLET.match(unit):
+        score += 1
+    if _NUMBER.search(unit):
+        score += 1.5
+    if section is not None:
+        score += 4
+    if _FILLER.search(unit):
+        score -= 4
+    return score
+
+
+def _truncate(unit, budget):
+    words = unit.split()
+    while words and count_tokens(" ".join(words) + " …") > budget:
+        words = words[:max(1, len(words) * 3 // 4)] if len(words) > 1 else []
+    return " ".join(words) + " …" if words else ""
+
+
+def compact(text, budget, sections=()):
+    """
+    Extractive compaction of text to at most about budget tokens.
+
+    Keeps, in their original order: the first line of each expected
+    section (headings and bullets that name it), then the highest scoring
+    remaining lines - headings, bullets, lines with numbers - and drops
+    filler such as disclaimers first. Nothing is rewritten; only the last
+    kept line may be cut short. Text within budget is returned unchanged.
+    """
+    if count_tokens(text) <= budget:
+        return text
+    units = _units(text)
+    section_of = [_section_of(unit, sections) for unit in units]
+    scores = [_score(unit, section) for unit, section in zip(units, section_of)]
+
+    # Every expected section first, by its best-scoring line
+    first_pass = {}
+    for index, section in enumerate(section_of):
+        if section is not None and (section not in first_pass
+                                    or scores[index] > scores[first_pass[section]]):
+            first_pass[section] = index
+    order = sorted(first_pass.values(), key=lambda i: -scores[i])
+    order += sorted((i for i in range(len(units)) if i not in first_pass.values()),
+                    key=lambda i: (-scores[i], i))
+
+    kept, used = {}, 0
+    for index in order:
+        if scores[index] <= 0:
+            continue
+        cost = count_tokens(units[index]) + 1
+        if used + cost <= budget:
+            kept[index] = units[index]
+            used += cost
+        elif budget - used > 12:
+            kept[index] = _truncate(units[index], budget - used - 1)
+            used = budget
+        if used >= budget:
+            break
+    return "\n".join(kept[i] for i in sorted(kept) if kept[i])
+
+
+class ContextCompactor:
+    """
+    Bounds what each task hands to the tasks after it.
+
+    CrewAI's sequential process passes every earlier task's raw output to
+    each later task. attach() gives each task a callback that compacts its
+    output (compact(), guided by the task's expected_output bullets) to the
+    task's token budget before the next task starts; the full text stays
+    in `originals`. Budgets map task names to tokens; tasks without one
+    use default_budget, and None turns compaction off while still logging
+    token counts and task timings for comparison.
+    """
+
+    def __init__(self, budgets=None, default_budget=400):
+        self.budgets = budgets or {}
+        self.default_budget = default_budget
+        self.originals = {}
+        self.log = []
+        self._started = None
+
+    def budget_for(self, name):
+        """
+        Token budget of the task's output, or None for no compaction.
+        """
+        return self.budgets.get(name, self.default_budget)
+
+    def attach(self, tasks):
+        """
+        Sets the callbacks on every task but the last, whose output is the
+        crew's answer. Existing callbacks still run, after compaction.
+        """
+        for task in tasks:
+            downstream = task is not tasks[-1]
+            task.callback = self._callback(task, task.callback, downstream)
+        return tasks
+
+    def start(self):
+        """
+        Marks kickoff, so the first task's duration can be measured.
+        """
+        self._started = time.perf_counter()
+
+    def _callback(self, task, previous, downstream):
+        name = getattr(task, "name", None) or "task"
+        sections = expected_sections(task.expected_output)
+
+        def compact_output(output):
+            now = time.perf_counter()
+            started = self.log[-1]["finished"] if self.log else self._started
+            raw = output.raw or ""
+            before = count_tokens(raw)
+            budget = self.budget_for(name) if downstream else None
+            start = time.perf_counter()
+            if budget is not None and before > budget:
+                self.originals[name] = raw
+                output.raw = compact(raw, budget, sections)
+            after = count_tokens(output.raw or "")
+            entry = {"task": name, "tokens_before": before, "tokens_after": after,
+                     "compaction_ms": (time.perf_counter() - start) * 1000,
+                     "seconds": now - started if started else None, "finished": now,
+                     "context_tokens": sum(e["tokens_after"] for e in self.log)}
+            self.log.append(entry)
+            if downstream:
+                print(f"🗜️  {name}: {before:,} -> {after:,} tokens passed downstream "
+                      f"({entry['compaction_ms']:.1f} ms)")
+            if previous:
+                previous(output)
+
+        return compact_output
+
+    def report(self):
+        """
+        Prints per task: the upstream context it received, its own output
+        before and after compaction, and how long it took.
+        """
+        print("🗜️  Context compaction (context in = tokens of earlier outputs received)")
+        for entry in self.log:
+            seconds = "-" if entry["seconds"] is None else f"{entry['seconds']:.1f}s"
+            print(f"   {entry['task']:<28s} context in {entry['context_tokens']:6,d}  "
+                  f"output {entry['tokens_before']:6,d} -> {entry['tokens_after']:6,d}  "
+                  f"{seconds:>8s}")
+        full = sum(sum(e["tokens_before"] for e in self.log[:i]) for i in range(len(self.log)))
+        sent = sum(e["context_tokens"] for e in self.log)
+        print(f"   context tokens across tasks: {full:,} uncompacted, {sent:,} sent")
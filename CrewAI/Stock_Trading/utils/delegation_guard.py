@@ -0,0 +1,221 @@
+# pylint: disable=C0114
+import functools
+import re
+import threading
+import time
+
+# The guard whose limits the patched methods apply; set by install()
+_active = None
+_local = threading.local()
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _llm_calls():
+    return getattr(_local, "llm_calls", 0)
+
+
+def _role(name):
+    return " ".join(str(name or "").split()).replace('"', "").casefold()
+
+
+def task_label(task):
+    """
+    Task name, or the start of its description for unnamed tasks.
+    """
+    name = getattr(task, "name", None)
+    if name:
+        return name
+    description = " ".join(str(getattr(task, "description", "")).split())
+    return description[:60] or "task"
+
+
+class DelegationGuard:
+    """
+    Delegation graph and budget per task for allow_delegation=True crews.
+
+    Each top-level task gets its own graph of delegations (caller role ->
+    coworker role, with depth, seconds and LLM calls). A delegation is cut
+    off instead of run when it would:
+
+    - go back to an agent already waiting further up the chain (a cycle,
+      e.g. analyst -> risk advisor -> analyst),
+    - go deeper than max_depth hops from the task's agent,
+    - exceed max_delegations for the task, or
+    - repeat a question the same coworker already answered in this task.
+
+    The delegating agent then gets the best answer so far (the coworker's
+    previous answer, else the latest answer in the task) and is told to
+    finish without delegating. limits overrides both budgets per task name.
+    """
+
+    def __init__(self, max_depth=2, max_delegations=4, limits=None):
+        self.max_depth = max_depth
+        self.max_delegations = max_delegations
+        self.limits = limits or {}
+        self.graphs = {}
+        self.stats = {"delegations": 0, "cycles": 0, "too_deep": 0, "over_budget": 0,
+                      "repeats": 0, "seconds": 0.0, "llm_calls": 0}
+        self._answers = {}
+        self._lock = threading.Lock()
+
+    def budget(self, task_name):
+        """
+        (max depth, max delegations) for a task.
+        """
+        limits = self.limits.get(task_name, {})
+        return (limits.get("max_depth", self.max_depth),
+                limits.get("max_delegations", self.max_delegations))
+
+    def install(self, agent_class=None, tool_class=None, llm_class=None):
+        """
+        Patches Agent.execute_task, BaseAgentTool._execute and LLM.call
+        (crewai's by default) so delegations go through this guard. Later
+        calls only switch which guard is active.
+        """
+        global _active  # pylint: disable=global-statement
+        _active = self
+        if agent_class is None:
+            from crewai import Agent as agent_class  # pylint: disable=import-outside-toplevel
+        if tool_class is None:
+            from crewai.tools.agent_tools.base_agent_tools import (  # pylint: disable=import-outside-toplevel
+                BaseAgentTool as tool_class)
+        if llm_class is None:
+            from crewai import LLM as llm_class  # pylint: disable=import-outside-toplevel
+
+        if not getattr(agent_class.execute_task, "_delegation_guarded", False):
+            execute_task = agent_class.execute_task
+
+            @functools.wraps(execute_task)
+            def guarded_execute_task(agent, task, *args, **kwargs):
+                stack = _stack()
+                root = stack[0][1] if stack else task_label(task)
+                stack.append((_role(agent.role), root))
+                try:
+                    return execute_task(agent, task, *args, **kwargs)
+                finally:
+                    stack.pop()
+
+            guarded_execute_task._delegation_guarded = True  # pylint: disable=protected-access
+            agent_class.execute_task = guarded_execute_task
+
+        if not getattr(tool_class._execute, "_delegation_guarded", False):  # pylint: disable=protected-access
+            delegate = tool_class._execute  # pylint: disable=protected-access
+
+            @functools.wraps(delegate)
+            def guarded_delegate(tool, agent_name, task, context=None):
+                if _active is None:
+                    return delegate(tool, agent_name, task, context)
+                return _active.delegate(lambda: delegate(tool, agent_name, task, context),
+                                        agent_name, task)
+
+            guarded_delegate._delegation_guarded = True  # pylint: disable=protected-access
+            tool_class._execute = guarded_delegate  # pylint: disable=protected-access
+
+        if not getattr(llm_class.call, "_delegation_counted", False):
+            call = llm_class.call
+
+            @functools.wraps(call)
+            def counted_call(llm, *args, **kwargs):
+                _local.llm_calls = _llm_calls() + 1
+                return call(llm, *args, **kwargs)
+
+            counted_call._delegation_counted = True  # pylint: disable=protected-access
+            llm_class.call = counted_call
+
+    def delegate(self, run, agent_name, question):
+        """
+        Runs one delegation (run()) unless the task's budget or a cycle
+        cuts it off.
+        """
+        stack = _stack()
+        caller, root = stack[-1] if stack else ("", "task")
+        callee = _role(agent_name)
+        depth = len(stack)
+        max_depth, max_delegations = self.budget(root)
+        asked = (root, callee, re.sub(r"\W+", " ", str(question).lower()).strip())
+
+        with self._lock:
+            graph = self.graphs.setdefault(root, [])
+            ran = sum(1 for edge in graph if edge["status"] == "ran")
+            if callee in (role for role, _ in stack):
+                status = "cycles"
+            elif asked in self._answers:
+                status = "repeats"
+            elif depth > max_depth:
+                status = "too_deep"
+            elif ran >= max_delegations:
+                status = "over_budget"
+            else:
+                status = "ran"
+            edge = {"from": caller, "to": callee, "depth": depth, "status": status,
+                    "seconds": 0.0, "llm_calls": 0}
+            graph.append(edge)
+            if status != "ran":
+                self.stats[status] += 1
+                return self._cut_off(root, callee, status, asked)
+            self.stats["delegations"] += 1
+
+        start, calls = time.perf_counter(), _llm_calls()
+        answer = run()
+        edge["seconds"] = time.perf_counter() - start
+        edge["llm_calls"] = _llm_calls() - calls
+        with self._lock:
+            if depth == 1:
+                # Nested delegations are already inside their parent's cost
+                self.stats["seconds"] += edge["seconds"]
+                self.stats["llm_calls"] += edge["llm_calls"]
+            self._answers[asked] = answer
+            self._answers[(root, callee)] = answer
+            self._answers[root] = answer
+        return answer
+
+    def _cut_off(self, root, callee, status, asked):
+        reason = {
+            "cycles": f"{callee} is already working on this task further up the chain",
+            "repeats": f"{callee} already answered this question",
+            "too_deep": "the delegation chain for this task is already at its maximum depth",
+            "over_budget": "this task has used its delegation budget",
+        }[status]
+        best = (self._answers.get(asked) or self._answers.get((root, callee))
+                or self._answers.get(root))
+        message = (f"Delegation not run: {reason}. Do not delegate again; "
+                   f"give your final answer now with the information you already have.")
+        if best:
+            message += f"\n\nBest answer so far:\n{best}"
+        return message
+
+    def saved(self):
+        """
+        Estimated (LLM calls, seconds) saved: every cut-off delegation
+        valued at the mean cost of the delegations that ran.
+        """
+        s = self.stats
+        cut = s["cycles"] + s["too_deep"] + s["over_budget"] + s["repeats"]
+        ran = [edge for graph in self.graphs.values() for edge in graph
+               if edge["status"] == "ran"]
+        if not ran:
+            return 0, 0.0
+        return (round(cut * sum(e["llm_calls"] for e in ran) / len(ran)),
+                cut * sum(e["seconds"] for e in ran) / len(ran))
+
+    def report(self):
+        """
+        Prints each task's delegation graph and what the budget saved.
+        """
+        for root, graph in self.graphs.items():
+            print(f"🧭 {root}: {len(graph)} delegation requests")
+            for edge in graph:
+                cost = (f"{edge['seconds']:.1f}s, {edge['llm_calls']} LLM calls"
+                        if edge["status"] == "ran" else edge["status"].replace("_", " "))
+                print(f"   {'  ' * (edge['depth'] - 1)}{edge['from']} -> {edge['to']} ({cost})")
+        s = self.stats
+        calls, seconds = self.saved()
+        print(f"🧭 Delegation: {s['delegations']} run ({s['llm_calls']} LLM calls, "
+              f"{s['seconds']:.1f}s); cut off {s['cycles']} cycles, {s['too_deep']} too deep, "
+              f"{s['over_budget']} over budget, {s['repeats']} repeats; "
+              f"saved ~{calls} LLM calls, ~{seconds:.1f}s")
@@ -0,0 +1,129 @@
+# pylint: disable=C0114
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_results(query, search_type="search", num=10):
+    """
+    Deterministic Serper-shaped results for query.
+    """
+    digest = hashlib.sha256(query.encode("utf-8")).hexdigest()
+    if search_type == "news":
+        return {"searchParameters": {"q": query, "type": "news"}, "credits": 1,
+                "news": [{"title": f"{query} headline {i}", "link": f"https://news.test/{digest[:8]}/{i}",
+                          "snippet": f"News about {query}.", "date": "1 hour ago",
+                          "source": "Fake Wire", "imageUrl": ""} for i in range(1, num + 1)]}
+    return {"searchParameters": {"q": query, "type": "search"}, "credits": 1,
+            "organic": [{"title": f"{query} result {i}", "link": f"https://example.test/{digest[:8]}/{i}",
+                         "snippet": f"Snippet {i} for {query}.", "position": i}
+                        for i in range(1, num + 1)]}
+
+
+class FakeSerper:
+    """
+    Local stand-in for google.serper.dev, for tests and smoke runs.
+
+    Answers POST /search and /news with deterministic results after
+    `delay` seconds and counts requests per query. Use as a context
+    manager and point SerperDevTool at `url` (e.g. SERPER_BASE_URL).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, delay=0.0, api_key=None):
+        self.delay = delay
+        self.api_key = api_key
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def total(self):
+        """
+        Requests answered so far.
+        """
+        with self._lock:
+            return sum(self.requests.values())
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):  # pylint: disable=missing-class-docstring
+            def do_POST(self):  # pylint: disable=invalid-name
+                search_type = self.path.strip("/").split("?")[0]
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    payload = {}
+                if search_type not in ("search", "news") or not payload.get("q"):
+                    return self._reply(400, {"message": "expected POST /search or /news with q"})
+                if fake.api_key and self.headers.get("X-API-KEY") != fake.api_key:
+                    return self._reply(403, {"message": "invalid API key"})
+                with fake._lock:  # pylint: disable=protected-access
+                    fake.requests[payload["q"]] += 1
+                time.sleep(fake.delay)
+                return self._reply(200, fake_results(payload["q"], search_type,
+                                                     int(payload.get("num") or 10)))
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                pass
+
+        return Handler
+
+    def start(self):
+        """
+        Serves in a daemon thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops serving and closes the socket.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Serper endpoint.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.3,
+                        help="seconds before each answer (default: %(default)s)")
+    args = parser.parse_args()
+    with FakeSerper(port=args.port, delay=args.delay) as fake:
+        print(f"Fake Serper at {fake.url} (export SERPER_BASE_URL={fake.url})")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+# pylint: disable=C0114
+import re
+from html import unescape
+from html.parser import HTMLParser
+
+from utils.rate_limit import count_tokens
+
+# Subtrees never holding main content
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "canvas",
+              "nav", "header", "footer", "aside", "form", "button", "select", "menu"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+              "meta", "param", "source", "track", "wbr"}
+# Tags that start a new text block
+_BLOCK_TAGS = {"p", "div", "section", "article", "main", "li", "ul", "ol", "dl", "dt", "dd",
+               "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "br", "hr",
+               "table", "tr", "figcaption", "caption", "body"}
+_HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+# Tags whose markup never marks them as chrome, whatever their class or role
+_CONTENT_TAGS = {"body", "main", "article"}
+# Whole class/id tokens marking page chrome
+_BOILERPLATE_TOKENS = {
+    "nav", "navbar", "navigation", "menu", "footer", "header", "site-header", "site-footer",
+    "sidebar", "side-bar", "breadcrumb", "breadcrumbs", "comments", "comment-list",
+    "share", "share-buttons", "social", "social-share", "ad", "ads", "ad-slot",
+    "ad-container", "advert", "advertisement", "banner", "cookie-banner", "promo",
+    "related", "related-links", "related-articles", "related-posts", "related-stories",
+    "subscribe", "newsletter", "toolbar", "popup", "modal", "masthead", "skip-link",
+    "sponsor", "sponsored", "widget", "mw-editsection", "navbox", "catlinks",
+    "printfooter", "toc"}
+# Token prefixes ("nav-main", "sidebar_left") that are always chrome
+_BOILERPLATE_PREFIX = re.compile(
+    r"^(nav|navbar|sidebar|footer|breadcrumbs?|cookie|advert|masthead|toolbar|popup|"
+    r"newsletter)([_-]|$)", re.I)
+_BOILERPLATE_ROLES = {"navigation", "banner", "contentinfo", "complementary", "search",
+                      "menu", "menubar", "dialog"}
+# Chrome phrases that survive markup heuristics
+_CHROME = re.compile(
+    r"^(edit( article| source)?|read|view (history|source)|read history|talk|sign in|"
+    r"log ?in|register|subscribe|share|tweet|print|jump to (navigation|search)|"
+    r"skip to (main )?content|cookie|accept( all)?( cookies)?|advertisement|menu|search|"
+    r"main page|contents|related articles|see also|more from|follow us)\b.{0,40}$", re.I)
+_WS = re.compile(r"\s+")
+
+
+def _is_boilerplate(marker):
+    """
+    Whether any whole class/id token in marker names page chrome.
+    """
+    return any(token in _BOILERPLATE_TOKENS or _BOILERPLATE_PREFIX.match(token)
+               for token in marker.lower().split())
+
+
+class _Block:
+    __slots__ = ("words", "link_words", "text", "heading", "table_row")
+
+    def __init__(self):
+        self.words = []
+        self.link_words = 0
+        self.text = ""
+        self.heading = False
+        self.table_row = None
+
+
+class _Segmenter(HTMLParser):
+    """
+    Splits a page into text blocks with their link word counts, skipping
+    boilerplate subtrees; table rows become blocks of cells.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []
+        self.title = ""
+        self._block = _Block()
+        self._skip = 0
+        self._links = 0
+        self._in_title = False
+        self._heading = 0
+        self._row = None
+        self._cell = None
+        self._stack = []
+
+    def _flush(self):
+        block = self._block
+        if block.words or block.table_row:
+            block.text = " ".join(block.words)
+            self.blocks.append(block)
+        self._block = _Block()
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            if tag in ("br", "hr") and not self._skip and self._cell is None:
+                self._flush()
+            return
+        attrs = dict(attrs)
+        marker = " ".join(filter(None, (attrs.get("class"), attrs.get("id"))))
+        skip = tag in _SKIP_TAGS or (
+            tag not in _CONTENT_TAGS
+            and (attrs.get("role") in _BOILERPLATE_ROLES
+                 or attrs.get("aria-hidden") == "true" or "hidden" in attrs
+                 or _is_boilerplate(marker)))
+        self._stack.append((tag, bool(skip)))
+        if skip:
+            self._skip += 1
+            return
+        if self._skip:
+            return
+        if tag == "title":
+            self._in_title = True
+        elif tag == "a":
+            self._links += 1
+        elif tag == "tr":
+            self._flush()
+            self._row = []
+        elif tag in ("td", "th") and self._row is not None:
+            self._cell = []
+        elif tag in _BLOCK_TAGS and self._cell is None:
+            self._flush()
+            if tag in _HEADINGS:
+                self._heading += 1
+
+    def handle_endtag(self, tag):
+        if tag in _VOID_TAGS or all(open_tag != tag for open_tag, _ in self._stack):
+            return
+        # Pop to the matching start tag, closing tags left unclosed inside it
+        while self._stack:
+            open_tag, skipped = self._stack.pop()
+            if skipped:
+                self._skip -= 1
+            if not self._skip:
+                self._close(open_tag)
+            if open_tag == tag:
+                break
+
+    def _close(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "a":
+            self._links = max(0, self._links - 1)
+        elif tag in ("td", "th") and self._cell is not None:
+            self._row.append(" ".join(self._cell))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            if any(self._row):
+                block = _Block()
+                block.table_row = self._row
+                block.words = " ".join(self._row).split()
+                block.text = " | ".join(self._row)
+                self.blocks.append(block)
+            self._row = None
+        elif tag in _BLOCK_TAGS and self._cell is None:
+            heading = tag in _HEADINGS
+            if heading:
+                self._block.heading = True
+            self._flush()
+            if heading:
+                self._heading = max(0, self._heading - 1)
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._in_title:
+            self.title += data
+            return
+        words = data.split()
+        if not words:
+            return
+        if self._cell is not None:
+            self._cell.extend(words)
+            return
+        self._block.words.extend(words)
+        if self._links:
+            self._block.link_words += len(words)
+        if self._heading:
+            self._block.heading = True
+
+
+def _classify(blocks):
+    """
+    jusText-style labels from text and link density: long, link-poor blocks
+    are content, link-heavy or chrome blocks are boilerplate, and short
+    blocks and headings follow the nearest long block.
+    """
+    labels = []
+    for block in blocks:
+        words = len(block.words)
+        density = block.link_words / words if words else 1.0
+        if block.table_row is not None:
+            labels.append("table")
+        elif density > 0.5 or _CHROME.match(block.text) or not words:
+            labels.append("bad")
+        elif words >= 20 and density < 0.25:
+            labels.append("good")
+        elif block.heading:
+            labels.append("heading")
+        else:
+            labels.append("short" if words < 8 else "medium")
+
+    def nearest_good(index, step):
+        index += step
+        while 0 <= index < len(labels):
+            if labels[index] == "good":
+                return True
+            if labels[index] == "bad":
+                return False
+            index += step
+        return False
+
+    final = []
+    for index, label in enumerate(labels):
+        if label in ("short", "medium", "heading"):
+            keep = nearest_good(index, 1) if label == "heading" else (
+                nearest_good(index, -1) and (label == "medium" or nearest_good(index, 1)))
+            label = "good" if keep else "bad"
+        final.append(label)
+    return final
+
+
+def _tables(blocks, labels):
+    """
+    Keeps runs of two or more table rows that aren't mostly links.
+    """
+    keep = [False] * len(blocks)
+    start = None
+    for index in range(len(blocks) + 1):
+        in_table = index < len(blocks) and labels[index] == "table"
+        if in_table and start is None:
+            start = index
+        elif not in_table and start is not None:
+            run = blocks[start:index]
+            words = sum(len(b.words) for b in run)
+            links = sum(b.link_words for b in run)
+            if len(run) >= 2 and words and links / words < 0.5:
+                keep[start:index] = [True] * len(run)
+            start = None
+    return keep
+
+
+def extract_main_text(html):
+    """
+    Main text and tables of a page as plain text: headings and paragraphs
+    one per line, table rows as "cell | cell". Navigation, headers,
+    footers, sidebars, ads and edit/history chrome are dropped by markup
+    and link-density heuristics.
+    """
+    parser = _Segmenter()
+    try:
+        parser.feed(html)
+        parser.close()
+    except AssertionError:  # malformed markup deep in html.parser
+        pass
+    parser._flush()  # pylint: disable=protected-access
+    blocks = parser.blocks
+    labels = _classify(blocks)
+    tables = _tables(blocks, labels)
+    lines, seen = [], set()
+    title = _WS.sub(" ", unescape(parser.title)).strip()
+    if title:
+        lines.append(f"# {title}")
+    for block, label, table in zip(blocks, labels, tables):
+        if not (label == "good" or table):
+            continue
+        text = block.text
+        if text in seen and not table:
+            continue
+        seen.add(text)
+        lines.append(f"## {text}" if block.heading else text)
+    return "\n".join(lines)
+
+
+def truncate_tokens(text, budget):
+    """
+    text cut to at most about budget tokens at a line or sentence
+    boundary, with a note of how much was left out.
+    """
+    total = count_tokens(text)
+    if budget is None or total <= budget:
+        return text
+    kept, used = [], 0
+    for line in text.split("\n"):
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            room = budget - used
+            sentences = re.split(r"(?<=[.!?])\s+", line)
+            partial = []
+            for sentence in sentences:
+                room -= count_tokens(sentence) + 1
+                if room < 0:
+                    break
+                partial.append(sentence)
+            if partial:
+                kept.append(" ".join(partial))
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept) + f"\n[... truncated: showing ~{budget:,} of {total:,} tokens]"
@@ -0,0 +1,296 @@
+# pylint: disable=C0114
+import json
+from typing import Any, Optional, Type
+
+import numpy as np
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+# Largest power of 1/(1 - alpha) kept in one block of the closed-form EWM
+_MAX_SCALE = np.log(1e250)
+
+
+def ewm(values, alpha):
+    """
+    Exponentially weighted mean y[t] = alpha * x[t] + (1 - alpha) * y[t-1],
+    y[0] = x[0], computed in closed form over blocks instead of a Python
+    loop. Blocks are short enough that the (1 - alpha)^-k weights cannot
+    overflow. NaNs in values are not supported.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    out = np.empty_like(x)
+    if not len(x):
+        return out
+    decay = 1.0 - alpha
+    if decay <= 0:
+        out[:] = x
+        return out
+    block = max(1, min(len(x), int(_MAX_SCALE / -np.log(decay))))
+    k = np.arange(block, dtype=np.float64)
+    grow = decay ** -k          # (1 - alpha)^-k
+    shrink = decay ** (k + 1)   # (1 - alpha)^(k+1)
+    previous = x[0]             # y[-1] chosen so that y[0] = x[0]
+    for lo in range(0, len(x), block):
+        chunk = x[lo:lo + block]
+        n = len(chunk)
+        # y[t] = decay^(t+1) y[-1] + alpha * decay^t * sum_{j<=t} decay^-j x[j]
+        acc = np.cumsum(chunk * grow[:n])
+        out[lo:lo + n] = shrink[:n] * previous + alpha * acc * (shrink[:n] / decay)
+        previous = out[lo + n - 1]
+    return out
+
+
+def ema(values, span):
+    """
+    Exponential moving average with alpha = 2 / (span + 1).
+    """
+    return ewm(values, 2.0 / (span + 1))
+
+
+def wilder(values, period):
+    """
+    Wilder's smoothing (alpha = 1 / period), used by RSI and ATR.
+    """
+    return ewm(values, 1.0 / period)
+
+
+def sma(values, window):
+    """
+    Simple moving average; the first window - 1 values are NaN.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    out = np.full_like(x, np.nan)
+    if len(x) >= window:
+        csum = np.cumsum(np.concatenate([[0.0], x]))
+        out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def true_range(high, low, close):
+    """
+    max(high - low, |high - previous close|, |low - previous close|).
+    """
+    previous = np.concatenate([[close[0]], close[:-1]])
+    return np.maximum(high - low, np.maximum(np.abs(high - previous), np.abs(low - previous)))
+
+
+def atr(high, low, close, period=14):
+    """
+    Average true range.
+    """
+    return wilder(true_range(high, low, close), period)
+
+
+def rsi(close, period=14):
+    """
+    Relative strength index (Wilder), 0-100.
+    """
+    change = np.diff(close, prepend=close[0])
+    gain = wilder(np.clip(change, 0, None), period)
+    loss = wilder(np.clip(-change, 0, None), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100.0 - 100.0 / (1.0 + gain / loss)
+    return np.where(loss == 0, np.where(gain == 0, 50.0, 100.0), value)
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """
+    Returns (macd line, signal line, histogram).
+    """
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def rate_of_change(close, bars):
+    """
+    Percentage change over the last `bars` bars; NaN where undefined.
+    """
+    out = np.full(len(close), np.nan)
+    if len(close) > bars:
+        out[bars:] = (close[bars:] / close[:-bars] - 1.0) * 100.0
+    return out
+
+
+def rolling_extreme(values, window, kind="max"):
+    """
+    Rolling max or min over window bars; the first window - 1 values are NaN.
+
+    Uses the van Herk/Gil-Werman scheme: running extremes within fixed
+    blocks of window bars, forwards and backwards, so each output is the
+    extreme of one suffix and one prefix, O(n) whatever the window.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    ufunc = np.maximum if kind == "max" else np.minimum
+    fill = -np.inf if kind == "max" else np.inf
+    blocks = -(-n // window)
+    padded = np.full(blocks * window, fill)
+    padded[:n] = x
+    padded = padded.reshape(blocks, window)
+    prefix = ufunc.accumulate(padded, axis=1).ravel()
+    suffix = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    out[window - 1:] = ufunc(suffix[:n - window + 1], prefix[window - 1:n])
+    return out
+
+
+def realized_volatility(close, window=20, periods_per_year=252):
+    """
+    Annualized standard deviation of log returns over the last window bars
+    and over the full history, as (recent, full).
+    """
+    returns = np.diff(np.log(close))
+    if len(returns) < 2:
+        return float("nan"), float("nan")
+    scale = np.sqrt(periods_per_year)
+    recent = returns[-window:]
+    return float(recent.std(ddof=1) * scale), float(returns.std(ddof=1) * scale)
+
+
+def trend_slope(close, window=50):
+    """
+    Least-squares slope of the last window closes, in percent of the last
+    close per bar.
+    """
+    y = np.asarray(close[-window:], dtype=np.float64)
+    if len(y) < 2:
+        return 0.0
+    x = np.arange(len(y), dtype=np.float64)
+    slope = np.polyfit(x, y, 1)[0]
+    return float(slope / y[-1] * 100.0)
+
+
+def bars_per_year(timestamps):
+    """
+    Estimates bars per year from the median spacing of the timestamps:
+    252 for daily bars, 252 * 390 for regular-session minute bars.
+    """
+    if len(timestamps) < 3:
+        return 252
+    spacing = float(np.median(np.diff(timestamps[-1000:])))
+    if spacing >= 20 * 3600:
+        return int(round(252 * 86400 / max(spacing, 86400)))
+    return int(252 * 6.5 * 3600 / max(spacing, 1))
+
+
+def compute_indicators(bars):
+    """
+    Every indicator series over the full history of bars ({column: array}).
+    """
+    high, low = np.asarray(bars["high"]), np.asarray(bars["low"])
+    close = np.asarray(bars["close"])
+    line, signal_line, hist = macd(close)
+    return {
+        "sma_50": sma(close, 50),
+        "sma_200": sma(close, 200),
+        "ema_20": ema(close, 20),
+        "atr_14": atr(high, low, close, 14),
+        "rsi_14": rsi(close, 14),
+        "macd": line,
+        "macd_signal": signal_line,
+        "macd_hist": hist,
+        "roc_10": rate_of_change(close, 10),
+        "roc_60": rate_of_change(close, 60),
+        "high_20": rolling_extreme(high, 20, "max"),
+        "low_20": rolling_extreme(low, 20, "min"),
+    }
+
+
+def _last(values):
+    value = float(values[-1]) if len(values) else float("nan")
+    return None if np.isnan(value) else round(value, 4)
+
+
+def summarize(bars):
+    """
+    Latest trend, key levels, volatility and momentum readings as a dict.
+    """
+    close = np.asarray(bars["close"])
+    if len(close) < 2:
+        return {"error": "not enough bars"}
+    ind = compute_indicators(bars)
+    per_year = bars_per_year(np.asarray(bars["timestamp"]))
+    recent_vol, full_vol = realized_volatility(close, 20, per_year)
+    last = float(close[-1])
+    sma_50, sma_200 = _last(ind["sma_50"]), _last(ind["sma_200"])
+    if sma_50 is not None and sma_200 is not None:
+        trend = ("uptrend" if last > sma_50 > sma_200 else
+                 "downtrend" if last < sma_50 < sma_200 else "sideways")
+    else:
+        trend = "uptrend" if trend_slope(close) > 0 else "downtrend"
+    window = min(len(close), per_year)
+    previous = -2 if len(close) > 1 else -1
+    pivot = (bars["high"][previous] + bars["low"][previous] + close[previous]) / 3
+    hist = ind["macd_hist"]
+    atr = _last(ind["atr_14"])
+    return {
+        "bars": int(len(close)),
+        "from": str(np.datetime64(int(bars["timestamp"][0]), "s")),
+        "to": str(np.datetime64(int(bars["timestamp"][-1]), "s")),
+        "last_close": round(last, 4),
+        "trend": {
+            "direction": trend,
+            "sma_50": sma_50,
+            "sma_200": sma_200,
+            "ema_20": _last(ind["ema_20"]),
+            "slope_pct_per_bar_50": round(trend_slope(close, 50), 4),
+        },
+        "key_levels": {
+            "resistance_20": _last(ind["high_20"]),
+            "support_20": _last(ind["low_20"]),
+            "high_1y": round(float(np.max(bars["high"][-window:])), 4),
+            "low_1y": round(float(np.min(bars["low"][-window:])), 4),
+            "pivot": round(float(pivot), 4),
+            "r1": round(float(2 * pivot - bars["low"][previous]), 4),
+            "s1": round(float(2 * pivot - bars["high"][previous]), 4),
+        },
+        "volatility": {
+            "atr_14": atr,
+            "atr_pct": round(atr / last * 100, 3) if atr is not None and last else None,
+            "realized_vol_20": round(recent_vol, 4),
+            "realized_vol_full": round(full_vol, 4),
+        },
+        "momentum": {
+            "rsi_14": _last(ind["rsi_14"]),
+            "macd": _last(ind["macd"]),
+            "macd_signal": _last(ind["macd_signal"]),
+            "macd_hist": _last(hist),
+            "macd_cross": ("bullish" if len(hist) > 1 and hist[-2] <= 0 < hist[-1] else
+                           "bearish" if len(hist) > 1 and hist[-2] >= 0 > hist[-1] else "none"),
+            "roc_10_pct": _last(ind["roc_10"]),
+            "roc_60_pct": _last(ind["roc_60"]),
+        },
+    }
+
+
+class MarketDataQuery(BaseModel):
+    """Input schema for MarketDataTool."""
+    ticker: str = Field(..., description="Ticker symbol, e.g. 'AAPL'")
+    start: Optional[str] = Field(None, description="Optional first date, e.g. '2023-01-01'")
+    end: Optional[str] = Field(None, description="Optional last date, e.g. '2024-06-30'")
+
+
+class MarketDataTool(BaseTool):
+    """
+    Gives the analyst computed indicators over local OHLCV history instead
+    of web pages.
+    """
+
+    name: str = "Market Data Indicators"
+    description: str = (
+        "Computes trend, key price levels, ATR/volatility, RSI, MACD and "
+        "momentum for a ticker from the local historical OHLCV store. "
+        "Returns JSON. Use this before any web search for price data."
+    )
+    args_schema: Type[BaseModel] = MarketDataQuery
+    store: Any = None
+
+    def _run(self, ticker: str, start: Optional[str] = None, end: Optional[str] = None) -> str:
+        bars = self.store.bars(ticker, start, end)
+        if bars is None:
+            return (f"No local market data for {ticker}; known tickers: "
+                    f"{', '.join(self.store.tickers()) or 'none'}.")
+        return json.dumps({"ticker": ticker.upper(), **summarize(bars)}, indent=2)
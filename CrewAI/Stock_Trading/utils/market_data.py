@@ -0,0 +1,232 @@
+# pylint: disable=C0114
+import csv
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+# Accepted header spellings, compared lowercased without spaces or underscores
+_ALIASES = {
+    "timestamp": ("timestamp", "date", "datetime", "time", "ts"),
+    "open": ("open", "o"),
+    "high": ("high", "h"),
+    "low": ("low", "l"),
+    "close": ("close", "c", "adjclose", "last", "price"),
+    "volume": ("volume", "vol", "v"),
+}
+
+
+def _header_map(names):
+    keys = [re.sub(r"[\s_]", "", str(name).lower()) for name in names]
+    mapping = {}
+    for column, aliases in _ALIASES.items():
+        for alias in aliases:
+            if alias in keys:
+                mapping[column] = keys.index(alias)
+                break
+    missing = [c for c in COLUMNS if c not in mapping and c != "volume"]
+    if missing:
+        raise ValueError(f"no {', '.join(missing)} column in {list(names)}")
+    return mapping
+
+
+def _timestamps(values):
+    """
+    Epoch seconds (int64) from ISO dates/datetimes or epoch numbers
+    (seconds or milliseconds).
+    """
+    values = np.asarray(values)
+    try:
+        numbers = values.astype(np.float64)
+    except ValueError:
+        text = np.char.replace(np.char.strip(values.astype(str)), " ", "T")
+        text = np.char.rstrip(text, "Z")
+        return text.astype("datetime64[s]").astype(np.int64)
+    # Millisecond epochs are 1000x larger than any plausible second epoch
+    return (numbers // 1000 if numbers.size and numbers.max() > 1e11 else numbers).astype(np.int64)
+
+
+def read_csv(path):
+    """
+    Reads an OHLCV CSV into {column: ndarray}. Volume defaults to 0.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = csv.reader(f)
+        header = next(rows)
+        mapping = _header_map(header)
+        data = [row for row in rows if row]
+    table = np.array(data, dtype=object).reshape(len(data), len(header))
+    columns = {"timestamp": _timestamps(table[:, mapping["timestamp"]])}
+    for column in COLUMNS[1:]:
+        if column in mapping:
+            raw = table[:, mapping[column]].astype(str)
+            columns[column] = np.where(raw == "", "nan", raw).astype(np.float64)
+        else:
+            columns[column] = np.zeros(len(data))
+    return columns
+
+
+def clean_bars(columns):
+    """
+    Drops bars without a close and fills a missing open, high or low with
+    the bar's close and a missing volume with 0, so one empty cell does not
+    turn every rolling indicator after it into NaN.
+    """
+    keep = np.isfinite(np.asarray(columns["close"], dtype=np.float64))
+    cleaned = {c: np.asarray(columns[c])[keep] for c in COLUMNS}
+    close = cleaned["close"].astype(np.float64)
+    for column in ("open", "high", "low"):
+        values = cleaned[column].astype(np.float64)
+        cleaned[column] = np.where(np.isfinite(values), values, close)
+    volume = cleaned["volume"].astype(np.float64)
+    cleaned["volume"] = np.where(np.isfinite(volume), volume, 0.0)
+    return cleaned
+
+
+def read_parquet(path):
+    """
+    Reads an OHLCV Parquet file into {column: ndarray}. Needs pyarrow.
+    """
+    try:
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+    except ImportError as exc:
+        raise ImportError("reading Parquet files needs pyarrow (pip install pyarrow)") from exc
+    table = pq.read_table(path)
+    mapping = _header_map(table.column_names)
+    ts = table.column(mapping["timestamp"]).to_numpy()
+    if np.issubdtype(ts.dtype, np.datetime64):
+        ts = ts.astype("datetime64[s]").astype(np.int64)
+    else:
+        ts = _timestamps(ts)
+    columns = {"timestamp": ts}
+    for column in COLUMNS[1:]:
+        columns[column] = (table.column(mapping[column]).to_numpy().astype(np.float64)
+                           if column in mapping else np.zeros(len(ts)))
+    return columns
+
+
+def ticker_from_path(path):
+    """
+    "data/AAPL_1min.csv" -> "AAPL".
+    """
+    return re.split(r"[_\-. ]", os.path.basename(path))[0].upper()
+
+
+class OHLCVStore:
+    """
+    Local columnar store of OHLCV bars, one directory per ticker.
+
+    Each column is a .npy file opened memory-mapped, so reading the full
+    history of a ticker costs no parsing and pages in only what the
+    indicators touch. Bars are kept sorted by timestamp (epoch seconds)
+    with duplicates resolved in favour of the latest ingest; a window is
+    sliced with a binary search on the timestamp column.
+    """
+
+    def __init__(self, directory=".cache/market_data"):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _dir(self, ticker):
+        return os.path.join(self.directory, ticker.upper())
+
+    def tickers(self):
+        """
+        Tickers with stored bars.
+        """
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.exists(os.path.join(self.directory, name, "meta.json")))
+
+    def ingest(self, path, ticker=None):
+        """
+        Merges a CSV or Parquet file into the ticker's bars. Returns the
+        number of bars stored for the ticker afterwards.
+        """
+        ticker = (ticker or ticker_from_path(path)).upper()
+        reader = read_parquet if path.lower().endswith((".parquet", ".pq")) else read_csv
+        return self.write(ticker, reader(path))
+
+    def write(self, ticker, columns):
+        """
+        Merges {column: array} bars into the ticker's store. Bars are
+        cleaned with clean_bars first.
+        """
+        with self._lock:
+            existing = self.bars(ticker) if ticker.upper() in self.tickers() else None
+            if existing:
+                columns = {c: np.concatenate([existing[c], columns[c]]) for c in COLUMNS}
+            columns = clean_bars(columns)
+            ts = np.asarray(columns["timestamp"], dtype=np.int64)
+            # Stable sort, then keep the last bar of each timestamp (newest ingest)
+            order = np.argsort(ts, kind="stable")
+            ts = ts[order]
+            keep = np.ones(len(ts), dtype=bool)
+            keep[:-1] = ts[1:] != ts[:-1]
+            directory = self._dir(ticker)
+            os.makedirs(directory, exist_ok=True)
+            for column in COLUMNS:
+                dtype = np.int64 if column == "timestamp" else np.float64
+                values = np.asarray(columns[column], dtype=dtype)[order][keep]
+                tmp = os.path.join(directory, f"{column}.tmp.npy")
+                np.save(tmp, values)
+                os.replace(tmp, os.path.join(directory, f"{column}.npy"))
+            count = int(keep.sum())
+            meta = {"ticker": ticker.upper(), "bars": count,
+                    "first": int(ts[keep][0]) if count else None,
+                    "last": int(ts[keep][-1]) if count else None,
+                    "updated_at": time.time()}
+            with open(os.path.join(directory, "meta.json.tmp"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(os.path.join(directory, "meta.json.tmp"),
+                       os.path.join(directory, "meta.json"))
+            return count
+
+    def bars(self, ticker, start=None, end=None):
+        """
+        Returns {column: memory-mapped array} for bars with start <= timestamp
+        <= end (epoch seconds or anything numpy.datetime64 accepts), or None
+        when the ticker is unknown.
+        """
+        directory = self._dir(ticker)
+        if not os.path.exists(os.path.join(directory, "meta.json")):
+            return None
+        columns = {c: np.load(os.path.join(directory, f"{c}.npy"), mmap_mode="r")
+                   for c in COLUMNS}
+        if start is None and end is None:
+            return columns
+        ts = columns["timestamp"]
+        lo = 0 if start is None else int(np.searchsorted(ts, _epoch(start), "left"))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, _epoch(end), "right"))
+        return {c: values[lo:hi] for c, values in columns.items()}
+
+
+def _epoch(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(np.datetime64(str(value).replace(" ", "T"), "s").astype(np.int64))
+
+
+def synthetic_bars(n, step_seconds=60, start="2019-01-02T14:30", seed=7, drift=0.0,
+                   volatility=0.0005):
+    """
+    n random-walk OHLCV bars spaced step_seconds apart, for benchmarks and
+    demos without market data.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(drift, volatility, n)))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    spread = np.abs(rng.normal(0, volatility, n)) * close
+    return {
+        "timestamp": _epoch(start) + step_seconds * np.arange(n, dtype=np.int64),
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": rng.integers(100, 10_000, n).astype(np.float64),
+    }
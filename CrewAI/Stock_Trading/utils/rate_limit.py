@@ -0,0 +1,304 @@
+# pylint: disable=C0114
+import functools
+import heapq
+import itertools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Published limits per model: (tokens per minute, requests per minute).
+# Groq's free tier for llama-3.3-70b-versatile allows 12K TPM and 30 RPM.
+LIMITS = {
+    "groq/llama-3.3-70b-versatile": (12_000, 30),
+    "groq/llama-3.1-8b-instant": (6_000, 30),
+}
+
+# Completion tokens reserved when the LLM sets no max_tokens; the
+# reservation is settled against the real answer afterwards.
+DEFAULT_COMPLETION_TOKENS = 1024
+
+# Lower runs first. Agents without an entry get NORMAL.
+HIGH, NORMAL, LOW = 0, 5, 9
+
+_encoding = None
+
+
+def count_tokens(text):
+    """
+    Tokens in text by tiktoken's cl100k_base encoding, or roughly one per
+    four characters when tiktoken is not installed. Llama tokenizers give
+    similar counts for English; the scheduler adds a margin on top.
+    """
+    global _encoding  # pylint: disable=global-statement
+    if _encoding is None:
+        try:
+            import tiktoken  # pylint: disable=import-outside-toplevel
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except ImportError:
+            _encoding = False
+    if not _encoding:
+        return len(text) // 4 + 1
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def message_tokens(messages):
+    """
+    Prompt tokens of a string or a list of chat messages, counting the
+    per-message overhead of the chat format.
+    """
+    if isinstance(messages, str):
+        return count_tokens(messages) + 4
+    total = 3
+    for message in messages or []:
+        content = message.get("content") if isinstance(message, dict) else message
+        if not isinstance(content, str):
+            content = json.dumps(content, default=str)
+        total += count_tokens(content) + 4
+    return total
+
+
+class TokenBucket:
+    """
+    capacity units refilled continuously at capacity / period seconds.
+    """
+
+    def __init__(self, capacity, period=60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now=None):
+        """
+        Brings the level up to date.
+        """
+        now = time.monotonic() if now is None else now
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """
+        Seconds until amount is available (0 when it already is).
+        """
+        self.refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+
+class _Waiter:
+    def __init__(self, priority, seq, tokens):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RateScheduler:
+    """
+    Client-side token and request buckets for one provider model.
+
+    Every call reserves its estimated prompt plus completion tokens and one
+    request before it is sent. Calls that don't fit wait in a priority
+    queue (lower priority value first, then arrival order) instead of
+    being sent to fail with a 429; only the head of the queue may take
+    from the buckets, so a large call is never starved by small ones.
+    After the call the reservation is settled against the tokens actually
+    used. `margin` over-reserves to cover estimation error.
+    """
+
+    def __init__(self, name, tokens_per_minute, requests_per_minute, margin=1.1):
+        self.name = name
+        self.margin = margin
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.requests = TokenBucket(requests_per_minute)
+        self.stats = {"calls": 0, "queued": 0, "rate_limited": 0,
+                      "tokens_reserved": 0, "tokens_used": 0,
+                      "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+        self._waits = []
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def acquire(self, tokens, priority=NORMAL):
+        """
+        Blocks until tokens and one request fit the buckets and this call
+        is first in line. Returns (reserved tokens, seconds waited).
+        """
+        tokens = min(int(tokens * self.margin), int(self.tokens.capacity))
+        start = time.monotonic()
+        waiter = _Waiter(priority, next(self._seq), tokens)
+        with self._cond:
+            heapq.heappush(self._queue, waiter)
+            while True:
+                if self._queue[0] is waiter:
+                    delay = max(self.tokens.wait_time(tokens), self.requests.wait_time(1))
+                    if delay <= 0:
+                        break
+                else:
+                    delay = None
+                self._cond.wait(delay)
+            heapq.heappop(self._queue)
+            self.tokens.level -= tokens
+            self.requests.level -= 1
+            waited = time.monotonic() - start
+            self.stats["calls"] += 1
+            self.stats["tokens_reserved"] += tokens
+            self.stats["wait_seconds"] += waited
+            self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], waited)
+            if waited > 0.01:
+                self.stats["queued"] += 1
+            self._waits.append(waited)
+            self._cond.notify_all()
+        return tokens, waited
+
+    def settle(self, reserved, used):
+        """
+        Returns unused reserved tokens to the bucket, or takes the overrun.
+        """
+        with self._cond:
+            self.tokens.refill()
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + reserved - used)
+            self.stats["tokens_used"] += used
+            self._cond.notify_all()
+
+    def throttled(self):
+        """
+        The provider answered 429 anyway: empty the buckets so queued calls
+        back off until they refill.
+        """
+        with self._cond:
+            self.tokens.refill()
+            self.tokens.level = min(self.tokens.level, 0.0)
+            self.requests.level = min(self.requests.level, 0.0)
+            self.stats["rate_limited"] += 1
+            self._cond.notify_all()
+
+    def report(self):
+        """
+        Prints calls, tokens and queue wait times.
+        """
+        s = dict(self.stats)
+        waits = sorted(self._waits)
+        p95 = waits[int(0.95 * (len(waits) - 1))] if waits else 0.0
+        mean = s["wait_seconds"] / s["calls"] if s["calls"] else 0.0
+        print(f"⏱️  {self.name}: {s['calls']} calls, {s['tokens_used']:,} tokens used "
+              f"({s['tokens_reserved']:,} reserved), {s['queued']} queued; wait mean "
+              f"{mean:.1f}s, p95 {p95:.1f}s, max {s['max_wait_seconds']:.1f}s; "
+              f"{s['rate_limited']} provider 429s")
+
+
+_schedulers = {}
+_registry_lock = threading.Lock()
+_share = 1.0
+_agent_priorities = {}
+_local = threading.local()
+
+
+def scheduler_for(model):
+    """
+    The shared RateScheduler of model, or None when it has no known limits.
+    """
+    if model not in LIMITS:
+        return None
+    with _registry_lock:
+        if model not in _schedulers:
+            tpm, rpm = LIMITS[model]
+            _schedulers[model] = RateScheduler(model, tpm * _share, max(1.0, rpm * _share))
+        return _schedulers[model]
+
+
+@contextmanager
+def priority(level):
+    """
+    Runs LLM calls made by this thread inside the block at level.
+    """
+    previous = getattr(_local, "priority", None)
+    _local.priority = level
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+def _call_priority(kwargs):
+    level = getattr(_local, "priority", None)
+    if level is not None:
+        return level
+    agent = kwargs.get("from_agent")
+    return _agent_priorities.get(getattr(agent, "role", None), NORMAL)
+
+
+def _is_rate_limit(exc):
+    return (getattr(exc, "status_code", None) == 429
+            or "ratelimit" in type(exc).__name__.lower()
+            or "rate limit" in str(exc).lower())
+
+
+def install(llm_class=None, share=1.0, agent_priorities=None, retries=3):
+    """
+    Routes every llm_class.call (crewai.LLM by default) through the
+    scheduler of its model. share scales the limits when several processes
+    use the same API key, e.g. 1 / workers. agent_priorities maps agent
+    roles to priority levels. Safe to call more than once.
+    """
+    global _share  # pylint: disable=global-statement
+    if llm_class is None:
+        from crewai import LLM as llm_class  # pylint: disable=import-outside-toplevel
+    with _registry_lock:
+        if share != _share:
+            _share = share
+            _schedulers.clear()
+    _agent_priorities.update(agent_priorities or {})
+    if getattr(llm_class.call, "_rate_scheduled", False):
+        return
+
+    original = llm_class.call
+
+    @functools.wraps(original)
+    def call(self, messages, *args, **kwargs):
+        scheduler = scheduler_for(getattr(self, "model", None))
+        if scheduler is None:
+            return original(self, messages, *args, **kwargs)
+        completion = getattr(self, "max_tokens", None) or DEFAULT_COMPLETION_TOKENS
+        estimate = message_tokens(messages) + completion
+        level = _call_priority(kwargs)
+        for attempt in range(retries + 1):
+            reserved, waited = scheduler.acquire(estimate, level)
+            if waited > 1:
+                print(f"⏳ {scheduler.name}: waited {waited:.1f}s for ~{estimate:,} tokens "
+                      f"(priority {level})")
+            try:
+                answer = original(self, messages, *args, **kwargs)
+            except Exception as exc:  # pylint: disable=broad-except
+                if _is_rate_limit(exc) and attempt < retries:
+                    scheduler.settle(reserved, reserved)
+                    scheduler.throttled()
+                    continue
+                scheduler.settle(reserved, estimate - completion)
+                raise
+            used = estimate - completion + count_tokens(answer if isinstance(answer, str)
+                                                        else json.dumps(answer, default=str))
+            scheduler.settle(reserved, used)
+            return answer
+        return None  # unreachable: the last attempt returns or raises
+
+    call._rate_scheduled = True  # pylint: disable=protected-access
+    llm_class.call = call
+
+
+def wait_seconds():
+    """
+    Total seconds LLM calls of this process have spent queued.
+    """
+    return sum(s.stats["wait_seconds"] for s in list(_schedulers.values()))
+
+
+def report():
+    """
+    Prints every scheduler's counters.
+    """
+    for scheduler in list(_schedulers.values()):
+        scheduler.report()
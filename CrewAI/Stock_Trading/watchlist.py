@@ -0,0 +1,224 @@
+# pylint: disable=C0114
+import argparse
+import importlib
+import multiprocessing
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from utils import rate_limit
+
+# Crew module per backend, the env var holding its concurrency limit and
+# the default limit (Groq's free tier allows ~12K tokens per minute)
+BACKENDS = {
+    "groq": ("main", "GROQ_MAX_CONCURRENCY", 2),
+    "ollama": ("main_ollama", "OLLAMA_NUM_PARALLEL", 1),
+}
+
+# Per worker process: the crew module, imported and configured once
+_crew_module = None
+
+
+def _init_worker(module_name, workers=1):
+    global _crew_module  # pylint: disable=global-statement
+    warnings.filterwarnings("ignore")
+    _crew_module = importlib.import_module(module_name)
+    _crew_module.configure_environment()
+    # Workers share one API key, so each gets its part of the rate limits
+    rate_limit.install(share=1.0 / workers)
+
+
+def _run_ticker(ticker, inputs):
+    # One crew per process already; sweeps stay in-process instead of
+    # starting a nested pool per backtest call
+    waited = rate_limit.wait_seconds()
+    result = _crew_module.run_ticker(ticker, inputs, backtest_processes=1)
+    result["llm_wait_seconds"] = rate_limit.wait_seconds() - waited
+    return result
+
+
+def read_watchlist(path):
+    """
+    Reads tickers separated by whitespace or commas, skipping '#' comments.
+    """
+    tickers = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            tickers += [t.strip().upper() for t in line.replace(",", " ").split() if t.strip()]
+    return tickers
+
+
+def pool_size(tickers, llm_concurrency, processes=None):
+    """
+    Workers to start: no more than the cores, the LLM backend's concurrent
+    requests or the tickers.
+    """
+    cores = processes or os.cpu_count() or 1
+    return max(1, min(cores, llm_concurrency, len(tickers)))
+
+
+def best_backtest(result):
+    """
+    Highest-Sharpe backtest the crew ran for the ticker, or None.
+    """
+    runs = [b["best"] for b in result["backtests"]
+            if b["ticker"] == result["ticker"] and b["best"].get("sharpe") is not None]
+    return max(runs, key=lambda r: r["sharpe"]) if runs else None
+
+
+def rank(results):
+    """
+    Orders results by their best backtested Sharpe; tickers without a
+    backtest go last, alphabetically.
+    """
+    def key(result):
+        best = best_backtest(result)
+        return (best is None, -(best["sharpe"] if best else 0.0), result["ticker"])
+    return sorted(results, key=key)
+
+
+def _fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def summary_markdown(results, failures, wall, workers, backend):
+    """
+    One ranked report: a table of every ticker, then each crew's report.
+    """
+    busy = sum(r["seconds"] for r in results)
+    lines = [
+        f"# Watchlist summary ({datetime.now():%Y-%m-%d %H:%M})",
+        "",
+        f"{len(results)} tickers ok, {len(failures)} failed; backend {backend}, "
+        f"{workers} worker processes, wall time {wall:.1f}s, "
+        f"speedup over a serial loop {busy / wall if wall else 0:.2f}x.",
+        "",
+        "| Rank | Ticker | Sharpe | Max DD % | Win % | Trades | Return % | Crew time |",
+        "|---:|---|---:|---:|---:|---:|---:|---:|",
+    ]
+    ranked = rank(results)
+    for position, result in enumerate(ranked, start=1):
+        best = best_backtest(result) or {}
+        lines.append(
+            f"| {position} | {result['ticker']} | {_fmt(best.get('sharpe'), '.2f')} | "
+            f"{_fmt(best.get('max_drawdown_pct'), '.1f')} | "
+            f"{_fmt(best.get('win_rate_pct'), '.1f')} | {_fmt(best.get('trades'), 'd')} | "
+            f"{_fmt(best.get('total_return_pct'), '.1f')} | {result['seconds']:.1f}s |")
+    for ticker, error in failures:
+        lines.append(f"| - | {ticker} | failed: {error} | | | | | |")
+    for result in ranked:
+        lines += ["", f"## {result['ticker']}", "", result["report"].strip()]
+    return "\n".join(lines) + "\n"
+
+
+def _write(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the trading crew for every ticker of a watchlist, one worker "
+                    "process per ticker, and combine the reports into a ranked summary.")
+    parser.add_argument("tickers", nargs="*", help="tickers, e.g. AAPL MSFT NVDA")
+    parser.add_argument("--watchlist", help="file of tickers (whitespace or comma separated)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="groq")
+    parser.add_argument("--processes", type=int,
+                        help="upper bound on worker processes (default: CPU count)")
+    parser.add_argument("--llm-concurrency", type=int,
+                        help="concurrent LLM requests the backend accepts (default: "
+                             "$GROQ_MAX_CONCURRENCY or 2 for groq, $OLLAMA_NUM_PARALLEL "
+                             "or 1 for ollama)")
+    parser.add_argument("--serial", action="store_true",
+                        help="run the tickers one after another in this process, "
+                             "as a baseline")
+    parser.add_argument("--risk-tolerance", default="Medium")
+    parser.add_argument("--strategy-preference", default="Day Trading")
+    parser.add_argument("--capital", default="100000")
+    parser.add_argument("--output-dir", default="outputs")
+    args = parser.parse_args()
+
+    tickers = [t.upper() for t in args.tickers]
+    if args.watchlist:
+        tickers += read_watchlist(args.watchlist)
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        parser.error("give tickers or --watchlist")
+
+    module_name, env_var, default_limit = BACKENDS[args.backend]
+    llm_concurrency = args.llm_concurrency or int(os.getenv(env_var, str(default_limit)))
+    workers = 1 if args.serial else pool_size(tickers, llm_concurrency, args.processes)
+    inputs = {
+        "initial_capital": args.capital,
+        "risk_tolerance": args.risk_tolerance,
+        "trading_strategy_preference": args.strategy_preference,
+        "news_impact_consideration": True,
+    }
+
+    results, failures = [], []
+    start = time.perf_counter()
+
+    def collect(ticker, run):
+        try:
+            result = run()
+        except Exception as exc:  # pylint: disable=broad-except
+            failures.append((ticker, exc))
+            print(f"❌ {ticker}: {exc}")
+            return
+        results.append(result)
+        print(f"✅ {ticker}: {result['seconds']:.1f}s")
+
+    if args.serial:
+        _init_worker(module_name)
+        for ticker in tickers:
+            collect(ticker, lambda t=ticker: _run_ticker(t, inputs))
+    else:
+        # Spawned workers import crewai fresh instead of forking its threads
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(module_name, workers)) as pool:
+            futures = {pool.submit(_run_ticker, ticker, inputs): ticker for ticker in tickers}
+            for future in as_completed(futures):
+                collect(futures[future], future.result)
+
+    wall = time.perf_counter() - start
+
+    run_dir = os.path.join(args.output_dir, f"watchlist_{datetime.now():%Y%m%d_%H%M%S}")
+    os.makedirs(run_dir, exist_ok=True)
+    for result in results:
+        _write(os.path.join(run_dir, f"{result['ticker']}.md"), result["report"])
+    summary_path = os.path.join(run_dir, "summary.md")
+    _write(summary_path, summary_markdown(results, failures, wall, workers, args.backend))
+
+    # --- Watchlist report ---
+    busy = sum(r["seconds"] for r in results)
+    print("\n" + "="*80)
+    print(f"📊 WATCHLIST REPORT ({len(tickers)} tickers, {workers} worker processes, "
+          f"LLM concurrency {llm_concurrency})")
+    print("="*80)
+    for position, result in enumerate(rank(results), start=1):
+        best = best_backtest(result) or {}
+        print(f"{position:>3d}. {result['ticker']:<8s} {result['seconds']:8.1f}s  "
+              f"(LLM queue {result['llm_wait_seconds']:5.1f}s)  "
+              f"Sharpe {_fmt(best.get('sharpe'), '6.2f')}  "
+              f"max DD {_fmt(best.get('max_drawdown_pct'), '5.1f')}%")
+    print("-"*80)
+    print(f"Tickers:         {len(results)} ok, {len(failures)} failed")
+    print(f"Wall time:       {wall:.1f}s")
+    if results and not args.serial:
+        print(f"Serial estimate: {busy:.1f}s (sum of per-ticker times)")
+        print(f"Speedup:         {busy / wall:.2f}x over a serial loop")
+    if results:
+        calls = sum(r["delegation"]["saved"][0] for r in results)
+        seconds = sum(r["delegation"]["saved"][1] for r in results)
+        print(f"Delegation cut:  ~{calls} LLM calls, ~{seconds:.1f}s saved by the budgets")
+    print(f"Summary:         {summary_path}")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    main()